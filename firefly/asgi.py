@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "firefly.settings")
+os.environ.setdefault("NOTIFICATION_STREAM_ENABLED", "True")
+os.environ.setdefault("TASK_UPDATES_STREAM_ENABLED", "True")
 
 application = get_asgi_application()
+
+if settings.WARMUP_ON_STARTUP:
+    from task_manager.warmup import warm_up
+
+    warm_up()
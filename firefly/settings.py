@@ -68,8 +68,18 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # compiled templates are kept for the worker's lifetime,
+            # in DEBUG mode they are reloaded when changed
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -97,6 +107,27 @@ env_db = dj_database_url.config(conn_max_age=500)
 DATABASES["default"].update(env_db)
 
 
+# Cache
+# Cached team memberships, rosters and page versions are invalidated
+# by bumping their versions, which reaches the other worker processes only
+# through a shared cache. LocMemCache is kept by each process, so it's
+# suitable for a single worker only: set DJANGO_CACHE_URL (redis://...)
+# when several processes serve the project
+
+CACHE_URL = os.environ.get("DJANGO_CACHE_URL")
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+        if CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    ),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -145,6 +176,80 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Notifications retention policy used by the purge_notifications command
+
+NOTIFICATION_RETENTION = {
+    "READ_DAYS": int(os.environ.get("NOTIFICATION_READ_DAYS", 30)),
+    "COMPLETED_TASK_DAYS": int(
+        os.environ.get("NOTIFICATION_COMPLETED_TASK_DAYS", 90)
+    ),
+    "BATCH_SIZE": 1000,
+}
+
+# Live notifications are streamed only when the project is served by ASGI
+# (firefly/asgi.py turns them on). The in-process broker delivers messages
+# within one process, for several processes use
+# "task_manager.broker.RedisBroker" with {"url": ...} options
+
+NOTIFICATION_STREAM_ENABLED = (
+    os.environ.get("NOTIFICATION_STREAM_ENABLED", "") == "True"
+)
+
+# Changes of the task cards are pushed to the open board, member tasks and
+# task pages of the project through the same broker, also only under ASGI
+
+TASK_UPDATES_STREAM_ENABLED = (
+    os.environ.get("TASK_UPDATES_STREAM_ENABLED", "") == "True"
+)
+
+# E-mail digests of notifications, sent by the send_notification_digests
+# command
+
+EMAIL_BACKEND = os.environ.get(
+    "DJANGO_EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+
+EMAIL_HOST = os.environ.get("DJANGO_EMAIL_HOST", "localhost")
+
+EMAIL_PORT = int(os.environ.get("DJANGO_EMAIL_PORT", 25))
+
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DJANGO_DEFAULT_FROM_EMAIL", "notifications@firefly-task-manager.com"
+)
+
+NOTIFICATION_EMAIL = {
+    "BATCH_SIZE": 50,
+    "MAX_MESSAGES_PER_RUN": int(
+        os.environ.get("NOTIFICATION_EMAIL_MAX_MESSAGES_PER_RUN", 1000)
+    ),
+    "MESSAGES_PER_SECOND": 10,
+}
+
+LIVE_UPDATES_BROKER = {
+    "BACKEND": os.environ.get(
+        "LIVE_UPDATES_BROKER", "task_manager.broker.InProcessBroker"
+    ),
+    "OPTIONS": (
+        {"url": os.environ["LIVE_UPDATES_BROKER_URL"]}
+        if "LIVE_UPDATES_BROKER_URL" in os.environ else {}
+    ),
+}
+
+# Landing page stats are counted at most once per this number of seconds,
+# the refresh_site_stats command may refresh them periodically instead
+
+SITE_STATS_REFRESH_INTERVAL = 60 * 10
+
+# Templates are compiled when a worker loads firefly/wsgi.py or
+# firefly/asgi.py, before it accepts requests. With WARMUP_QUERIES
+# the worker also connects to the database and fills the stats cache
+
+WARMUP_ON_STARTUP = (
+    os.environ.get("WARMUP_ON_STARTUP", str(not DEBUG)) == "True"
+)
+
+WARMUP_QUERIES = os.environ.get("WARMUP_QUERIES", "") == "True"
+
 if DEBUG:
     MIDDLEWARE += [
         'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -24,12 +24,17 @@ from task_manager.views import (
     UserProfileDetailView,
     UserProfileEditView,
     UserDeleteView,
+    NotificationEmailPreferenceView,
     IndexView
 )
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("management/", include("task_manager.urls", namespace="task_manager")),
+    path(
+        "api/v1/",
+        include("task_manager.api_urls", namespace="api_v1")
+    ),
     path("", IndexView.as_view(), name="index"),
     path("accounts/", include("django.contrib.auth.urls")),
     path("accounts/register/", UserRegisterView.as_view(), name="register"),
@@ -48,6 +53,11 @@ urlpatterns = [
         UserProfileEditView.as_view(),
         name="profile-edit"
     ),
+    path(
+        "accounts/profile/notifications/",
+        NotificationEmailPreferenceView.as_view(),
+        name="profile-notifications"
+    ),
     path(
         "accounts/profile/delete/",
         UserDeleteView.as_view(),
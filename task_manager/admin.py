@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db import connection
+from django.db.models.expressions import RawSQL
 
 from task_manager.models import (
     Position,
@@ -9,7 +11,13 @@ from task_manager.models import (
     TaskType,
     Task,
     NotificationType,
-    Notification
+    Notification,
+    NotificationEvent
+)
+from task_manager.search import (
+    INDEXED_VENDORS,
+    get_matches_sql,
+    parse_search_words,
 )
 
 admin.site.register(Position)
@@ -62,9 +70,25 @@ class TaskAdmin(admin.ModelAdmin):
                    "requester", "assignees")
     search_fields = ("name",)
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Searches names, descriptions and tags using the full-text index
+        """
+        words = parse_search_words(search_term)
+        if not words or connection.vendor not in INDEXED_VENDORS:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        matches, params = get_matches_sql(words, None)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT id FROM ({matches}) AS matches", params)
+        ), False
+
 
 @admin.register(NotificationType)
 class NotificationTypeAdmin(admin.ModelAdmin):
+    list_display = ("name", "delivery",)
+    list_filter = ("delivery",)
     search_fields = ("name",)
 
 
@@ -72,3 +96,9 @@ class NotificationTypeAdmin(admin.ModelAdmin):
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ("notification_type", "task", "sent_at", "user", "is_read")
     list_filter = ("user", "notification_type", "task")
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    list_display = ("notification_type", "task", "sent_at", "project")
+    list_filter = ("notification_type", "team", "project")
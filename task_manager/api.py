@@ -0,0 +1,569 @@
+import json
+from abc import abstractmethod
+from collections import defaultdict
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BooleanField, F, Max, Value
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views import generic
+
+from task_manager.batch import TaskBatchError, save_task_batch
+from task_manager.memberships import get_accessible_team_ids
+from task_manager.mixins import (
+    ConditionalPageMixin,
+    MemberOrFounderLoginRequiredMixin,
+)
+from task_manager.models import (
+    Team,
+    Project,
+    Task,
+    NotificationEvent,
+    NotificationReadState,
+)
+from task_manager.pagination import (
+    NEXT,
+    TASK_SORT_ORDERINGS,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+# rows serialized between the queries loading relations of the next rows
+API_BATCH_SIZE = 100
+
+
+class ApiError(Exception):
+    """
+    Invalid parameters of an API request, answered with 400
+    """
+
+
+def iter_batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_team_members(team_ids) -> dict:
+    """
+    :returns: {team_id: [username, ...]}
+    """
+    members = defaultdict(list)
+    for team_id, username in Team.members.through.objects.filter(
+            team_id__in=team_ids
+    ).order_by("worker__username").values_list(
+        "team_id", "worker__username"
+    ):
+        members[team_id].append(username)
+    return members
+
+
+def get_task_tags(task_ids) -> dict:
+    """
+    :returns: {task_id: [tag name, ...]}
+    """
+    tags = defaultdict(list)
+    for task_id, tag in Task.tags.through.objects.filter(
+            content_type=ContentType.objects.get_for_model(Task),
+            object_id__in=task_ids
+    ).order_by("tag__name").values_list("object_id", "tag__name"):
+        tags[task_id].append(tag)
+    return tags
+
+
+def get_task_assignees(task_ids) -> dict:
+    """
+    :returns: {task_id: [username, ...]}
+    """
+    assignees = defaultdict(list)
+    for task_id, username in Task.assignees.through.objects.filter(
+            task_id__in=task_ids
+    ).order_by("worker__username").values_list(
+        "task_id", "worker__username"
+    ):
+        assignees[task_id].append(username)
+    return assignees
+
+
+class ApiErrorsMixin:
+    """
+    Answers errors with JSON documents and anonymous users with 401
+    instead of the login redirect.
+    Must precede the permission mixins, which errors it answers
+    """
+
+    def handle_no_permission(self):
+        if self.request.user.is_authenticated:
+            raise PermissionDenied
+        return JsonResponse(
+            {"detail": "Authentication required"}, status=401
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return JsonResponse({"detail": "Not found"}, status=404)
+        except PermissionDenied:
+            return JsonResponse({"detail": "Access denied"}, status=403)
+        except ApiError as error:
+            return JsonResponse({"detail": str(error)}, status=400)
+
+
+class ApiMixin(ApiErrorsMixin):
+    """
+    JSON resource serialized from values() querysets
+    """
+
+    # {api field: values() lookup}
+    fields = {}
+    # {api field: function returning {id: [value, ...]} of the row ids}
+    relations = {}
+
+    @abstractmethod
+    def get_queryset(self):
+        pass
+
+    def get_fields(self) -> list:
+        """
+        :returns: fields requested by the fields parameter,
+        all fields by default
+        """
+        available = [*self.fields, *self.relations]
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return available
+        fields = list(dict.fromkeys(requested.split(",")))
+        unknown = [field for field in fields if field not in available]
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+    def get_lookups(self, fields: list, ordering: tuple = ()) -> list:
+        """
+        :returns: values() lookups of the fields, the primary key
+        and the ordering fields
+        """
+        lookups = [
+            self.fields[field] for field in fields if field in self.fields
+        ]
+        lookups += ["id", *(field.lstrip("-") for field in ordering)]
+        return list(dict.fromkeys(lookups))
+
+    def serialize(self, rows, fields: list):
+        """
+        Yields (row, data) of the rows with the requested fields,
+        loading relations by one query per batch of rows
+        """
+        relations = [field for field in fields if field in self.relations]
+        for batch in iter_batches(rows, API_BATCH_SIZE):
+            ids = [row["id"] for row in batch]
+            values = {
+                field: self.relations[field](ids) for field in relations
+            }
+            for row in batch:
+                yield row, {
+                    field: (
+                        values[field].get(row["id"], [])
+                        if field in values else row[self.fields[field]]
+                    )
+                    for field in fields
+                }
+
+
+class ApiListMixin(ApiMixin):
+    """
+    Page of the resources following the cursor of the previous page:
+    {"results": [...], "next": cursor or null}.
+    The results are streamed while rows are read from the database
+    """
+
+    ordering = ("id",)
+
+    def get_ordering(self) -> tuple:
+        return self.ordering
+
+    def get_limit(self) -> int:
+        limit = self.request.GET.get("limit", API_PAGE_SIZE)
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ApiError("limit must be a number")
+        if not 1 <= limit <= API_MAX_PAGE_SIZE:
+            raise ApiError(f"limit must be from 1 to {API_MAX_PAGE_SIZE}")
+        return limit
+
+    def get_position(self, ordering: tuple):
+        """
+        :returns: ordering values of the last row of the previous page
+        or None for the first page
+        """
+        cursor = self.request.GET.get("cursor")
+        if not cursor:
+            return None
+        position = decode_cursor(cursor, ordering)
+        if position is None or position[0] != NEXT:
+            raise ApiError("Invalid cursor")
+        return position[1]
+
+    def filter_position(self, queryset, ordering: tuple, position):
+        if position is None:
+            return queryset
+        try:
+            return queryset.filter(keyset_filter(ordering, position))
+        except (ValidationError, ValueError, TypeError):
+            raise ApiError("Invalid cursor")
+
+    def get_rows(self, lookups: list, ordering: tuple, position, limit: int):
+        """
+        :returns: iterator of the rows of the page and of the next row
+        """
+        queryset = self.filter_position(
+            self.get_queryset(), ordering, position
+        )
+        return queryset.order_by(*ordering).values(*lookups)[
+            :limit + 1
+        ].iterator(chunk_size=API_BATCH_SIZE)
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        ordering = self.get_ordering()
+        limit = self.get_limit()
+        rows = self.get_rows(
+            self.get_lookups(fields, ordering),
+            ordering,
+            self.get_position(ordering),
+            limit
+        )
+        return StreamingHttpResponse(
+            self.stream(rows, fields, ordering, limit),
+            content_type="application/json"
+        )
+
+    def stream(self, rows, fields: list, ordering: tuple, limit: int):
+        yield '{"results": ['
+        last_row = None
+        next_cursor = None
+        for index, (row, data) in enumerate(self.serialize(rows, fields)):
+            if index == limit:
+                next_cursor = encode_cursor(
+                    NEXT,
+                    ordering,
+                    [last_row[field.lstrip("-")] for field in ordering]
+                )
+                break
+            separator = ", " if index else ""
+            yield separator + json.dumps(data, cls=DjangoJSONEncoder)
+            last_row = row
+        yield '], "next": ' + json.dumps(next_cursor) + "}"
+
+
+class ApiDetailMixin(ApiMixin):
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        rows = self.get_queryset().values(*self.get_lookups(fields))
+        for _, data in self.serialize(rows, fields):
+            return JsonResponse(data)
+        raise Http404
+
+
+class TeamApiMixin:
+    team = None
+
+    def get_team(self) -> Team:
+        if self.team is None:
+            self.team = get_object_or_404(
+                Team, slug=self.kwargs.get("team_slug")
+            )
+        return self.team
+
+
+class ProjectApiMixin:
+    project = None
+
+    def get_project(self) -> Project:
+        if self.project is None:
+            self.project = get_object_or_404(
+                Project.objects.select_related("working_team"),
+                slug=self.kwargs.get("project_slug"),
+                working_team__slug=self.kwargs.get("team_slug")
+            )
+        return self.project
+
+    def get_team(self) -> Team:
+        return self.get_project().working_team
+
+
+TEAM_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "slug": "slug",
+    "founder": "founder__username",
+    "updated_at": "updated_at",
+}
+PROJECT_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "slug": "slug",
+    "description": "description",
+    "team": "working_team__slug",
+    "updated_at": "updated_at",
+}
+TASK_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "description": "description",
+    "deadline": "deadline",
+    "is_completed": "is_completed",
+    "priority": "priority",
+    "task_type": "task_type__name",
+    "project": "project__slug",
+    "requester": "requester__username",
+    "updated_at": "updated_at",
+}
+NOTIFICATION_FIELDS = {
+    "id": "id",
+    "kind": "kind",
+    "type": "notification_type__name",
+    "task": "task_id",
+    "team": "team_id",
+    "project": "project_id",
+    "sent_at": "sent_at",
+    "is_read": "read",
+}
+
+
+class TeamListApiView(
+    ApiListMixin,
+    LoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    """
+    Teams the user is a member or the founder of
+    """
+
+    fields = TEAM_FIELDS
+    relations = {"members": get_team_members}
+    ordering = ("name", "id")
+
+    def get_queryset(self):
+        return Team.objects.filter(
+            id__in=get_accessible_team_ids(self.request.user.id)
+        )
+
+    def get_updated_at(self):
+        return self.get_queryset().aggregate(
+            updated_at=Max("updated_at")
+        )["updated_at"]
+
+
+class TeamDetailApiView(
+    ApiDetailMixin,
+    TeamApiMixin,
+    MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    fields = TEAM_FIELDS
+    relations = {"members": get_team_members}
+
+    def get_queryset(self):
+        return Team.objects.filter(pk=self.get_team().pk)
+
+    def get_updated_at(self):
+        return self.get_team().updated_at
+
+
+class ProjectListApiView(
+    ApiListMixin,
+    TeamApiMixin,
+    MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    fields = PROJECT_FIELDS
+    ordering = ("name", "id")
+
+    def get_queryset(self):
+        return Project.objects.filter(working_team=self.get_team())
+
+    def get_updated_at(self):
+        # the team is updated by changes of its projects
+        return self.get_team().updated_at
+
+
+class ProjectDetailApiView(
+    ApiDetailMixin,
+    ProjectApiMixin,
+    MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    fields = PROJECT_FIELDS
+
+    def get_queryset(self):
+        return Project.objects.filter(pk=self.get_project().pk)
+
+    def get_updated_at(self):
+        return self.get_project().updated_at
+
+
+class TaskListApiView(
+    ApiListMixin,
+    ProjectApiMixin,
+    MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    """
+    Tasks of the project in the sort orders of the member tasks page,
+    which are served by the project indexes
+    """
+
+    fields = TASK_FIELDS
+    relations = {"tags": get_task_tags, "assignees": get_task_assignees}
+
+    def get_ordering(self) -> tuple:
+        sort = self.request.GET.get("sort", "priority")
+        if sort not in TASK_SORT_ORDERINGS:
+            raise ApiError(
+                f"sort must be one of: {', '.join(TASK_SORT_ORDERINGS)}"
+            )
+        return TASK_SORT_ORDERINGS[sort]
+
+    def get_queryset(self):
+        return Task.objects.filter(project=self.get_project())
+
+    def get_updated_at(self):
+        # the project is updated by changes of its tasks
+        return self.get_project().updated_at
+
+
+class TaskBatchApiView(
+    ApiErrorsMixin,
+    ProjectApiMixin,
+    MemberOrFounderLoginRequiredMixin,
+    generic.View
+):
+    """
+    Creates and updates many tasks of the project in one transaction.
+    Accepts {"tasks": [{field: value, ...}, ...]}, where the tasks
+    with an id are updated, and answers with the ids of the tasks
+    in the same order, or with the errors of the invalid tasks
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            raise ApiError("Invalid JSON")
+        if not isinstance(data, dict):
+            raise ApiError("Expected an object with the tasks")
+        try:
+            task_ids = save_task_batch(
+                self.get_project(), request.user, data.get("tasks")
+            )
+        except TaskBatchError as error:
+            return JsonResponse(
+                {"detail": str(error), "errors": error.errors}, status=400
+            )
+        return JsonResponse({"ids": task_ids})
+
+
+class TaskDetailApiView(
+    ApiDetailMixin,
+    ProjectApiMixin,
+    MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    fields = TASK_FIELDS
+    relations = {"tags": get_task_tags, "assignees": get_task_assignees}
+    task = None
+
+    def get_task(self) -> Task:
+        if self.task is None:
+            self.task = get_object_or_404(
+                Task.objects.only("id", "updated_at"),
+                id=self.kwargs.get("task_id"),
+                project=self.get_project()
+            )
+        return self.task
+
+    def get_queryset(self):
+        return Task.objects.filter(pk=self.get_task().pk)
+
+    def get_updated_at(self):
+        return self.get_task().updated_at
+
+
+class NotificationListApiView(
+    ApiListMixin,
+    LoginRequiredMixin,
+    ConditionalPageMixin,
+    generic.View
+):
+    """
+    Per-user notifications merged with the broadcast notification events
+    of the user, newest first
+    """
+
+    fields = NOTIFICATION_FIELDS
+    ordering = ("-sent_at", "-id", "kind")
+
+    def get_querysets(self) -> tuple:
+        """
+        :returns: notifications and events with the same columns,
+        which may be combined
+        """
+        user = self.request.user
+        return (
+            user.notifications.annotate(
+                kind=Value("notification"), read=F("is_read")
+            ),
+            NotificationEvent.objects.for_user(user).annotate(
+                kind=Value("event"),
+                read=Value(False, output_field=BooleanField())
+            ),
+        )
+
+    def get_queryset(self):
+        notifications, events = self.get_querysets()
+        return notifications.values("sent_at").order_by().union(
+            events.values("sent_at").order_by(), all=True
+        )
+
+    def get_updated_at(self):
+        # reading notifications changes their version, which is a part
+        # of the ETag as well
+        return self.get_queryset().order_by("-sent_at").values_list(
+            "sent_at", flat=True
+        ).first()
+
+    def get_rows(self, lookups: list, ordering: tuple, position, limit: int):
+        notifications, events = (
+            self.filter_position(queryset, ordering, position).values(
+                *NOTIFICATION_FIELDS.values()
+            ).order_by()
+            for queryset in self.get_querysets()
+        )
+        rows = notifications.union(events, all=True).order_by(
+            *ordering
+        )[:limit + 1]
+        read_state = NotificationReadState.for_user(self.request.user)
+        for row in rows:
+            if row["kind"] == "event":
+                row["read"] = read_state.is_event_read(row["id"])
+            yield row
@@ -0,0 +1,54 @@
+from django.urls import path
+
+from task_manager.api import (
+    TeamListApiView,
+    TeamDetailApiView,
+    ProjectListApiView,
+    ProjectDetailApiView,
+    TaskListApiView,
+    TaskBatchApiView,
+    TaskDetailApiView,
+    NotificationListApiView,
+)
+
+urlpatterns = [
+    path("teams/", TeamListApiView.as_view(), name="team-list"),
+    path(
+        "teams/<str:team_slug>/",
+        TeamDetailApiView.as_view(),
+        name="team-detail"
+    ),
+    path(
+        "teams/<str:team_slug>/projects/",
+        ProjectListApiView.as_view(),
+        name="project-list"
+    ),
+    path(
+        "teams/<str:team_slug>/projects/<str:project_slug>/",
+        ProjectDetailApiView.as_view(),
+        name="project-detail"
+    ),
+    path(
+        "teams/<str:team_slug>/projects/<str:project_slug>/tasks/",
+        TaskListApiView.as_view(),
+        name="task-list"
+    ),
+    path(
+        "teams/<str:team_slug>/projects/<str:project_slug>/tasks/batch/",
+        TaskBatchApiView.as_view(),
+        name="task-batch"
+    ),
+    path(
+        "teams/<str:team_slug>/projects/<str:project_slug>/tasks/"
+        "<int:task_id>/",
+        TaskDetailApiView.as_view(),
+        name="task-detail"
+    ),
+    path(
+        "notifications/",
+        NotificationListApiView.as_view(),
+        name="notification-list"
+    ),
+]
+
+app_name = "api_v1"
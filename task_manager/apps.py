@@ -6,5 +6,6 @@ class TaskManagerConfig(AppConfig):
     name = "task_manager"
 
     def ready(self):
+        from . import checks
         from . import signals
         from . import handlers
@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.db.models import Q
+
+from task_manager.caching import (
+    versioned_key,
+    bump_versions,
+    team_page_version,
+)
+from task_manager.models import Team, Worker, WorkerSearchToken
+
+# version of the search over all workers, team searches and rosters
+# follow the versions of their teams
+WORKER_SEARCH_VERSION = "worker-search"
+# terms matching more workers are not cached for reuse by longer terms
+MAX_CACHED_CANDIDATES = 500
+CACHE_TIMEOUT = 60 * 10
+
+
+def team_members_version(team_id: int) -> str:
+    return f"team-members:{team_id}"
+
+
+def normalize_words(text: str) -> list:
+    return [
+        word[:WorkerSearchToken.TOKEN_MAX_LENGTH]
+        for word in text.lower().split()
+    ]
+
+
+def update_worker_search_tokens(worker_ids):
+    """
+    Rebuilds search tokens of the workers from their names,
+    usernames and positions and invalidates the caches of the teams
+    the workers are members or founders of
+    """
+    workers = Worker.objects.filter(pk__in=worker_ids).values_list(
+        "id", "first_name", "last_name", "username", "position__name"
+    )
+    tokens = []
+    for worker_id, *fields in workers:
+        words = set(normalize_words(" ".join(filter(None, fields))))
+        tokens += [
+            WorkerSearchToken(worker_id=worker_id, token=word)
+            for word in words
+        ]
+    WorkerSearchToken.objects.filter(worker_id__in=worker_ids).delete()
+    WorkerSearchToken.objects.bulk_create(tokens)
+    teams = Team.objects.filter(
+        Q(members__in=worker_ids) | Q(founder_id__in=worker_ids)
+    ).values_list("id", "slug").distinct()
+    versions = [WORKER_SEARCH_VERSION]
+    for team_id, team_slug in teams:
+        versions += [
+            team_members_version(team_id), team_page_version(team_slug)
+        ]
+    bump_versions(*versions)
+
+
+def match_tokens(words: list, tokens: list) -> bool:
+    return all(
+        any(token.startswith(word) for token in tokens) for word in words
+    )
+
+
+def query_candidates(words: list, team_id: int = None) -> list:
+    """
+    Finds workers which tokens start with every word using
+    prefix scans of the tokens index
+    :returns: [(worker_id, [token, ...]), ...]
+    """
+    workers = Worker.objects.all()
+    for word in words:
+        workers = workers.filter(pk__in=WorkerSearchToken.objects.filter(
+            token__startswith=word
+        ).values("worker_id"))
+    if team_id is not None:
+        workers = workers.filter(teams=team_id)
+    worker_ids = list(
+        workers.order_by().values_list("pk", flat=True)[
+            :MAX_CACHED_CANDIDATES + 1
+        ]
+    )
+    candidates = {worker_id: [] for worker_id in worker_ids}
+    for worker_id, token in WorkerSearchToken.objects.filter(
+            worker_id__in=worker_ids
+    ).values_list("worker_id", "token"):
+        candidates[worker_id].append(token)
+    return list(candidates.items())
+
+
+def search_worker_ids(term: str, team_id: int = None):
+    """
+    Returns ids of the workers matching the autocomplete term
+    within the team (or all workers), or None for an empty term.
+    Results are cached per scope and term; a cached complete result
+    of a shorter prefix of the term is filtered in memory instead
+    of querying the database
+    """
+    words = normalize_words(term)
+    if not words:
+        return None
+    term = " ".join(words)
+    if team_id is None:
+        versions = (WORKER_SEARCH_VERSION,)
+    else:
+        versions = (team_members_version(team_id),)
+    base_key = versioned_key(versions, "worker-autocomplete", team_id)
+    prefix_keys = [
+        f"{base_key}:{term[:length]}" for length in range(len(term), 0, -1)
+    ]
+    cached = cache.get_many(prefix_keys)
+    prefix_candidates = next(
+        (cached[key] for key in prefix_keys if cached.get(key) is not None),
+        None
+    )
+    if prefix_candidates is not None:
+        candidates = [
+            candidate for candidate in prefix_candidates
+            if match_tokens(words, candidate[1])
+        ]
+    else:
+        candidates = query_candidates(words, team_id)
+    if prefix_keys[0] not in cached:
+        cache.set(
+            prefix_keys[0],
+            candidates if len(candidates) <= MAX_CACHED_CANDIDATES else None,
+            CACHE_TIMEOUT
+        )
+    return [worker_id for worker_id, _ in candidates]
@@ -0,0 +1,347 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from taggit.models import Tag
+
+from task_manager.forms import TaskBatchItemForm, get_or_create_pks_by_names
+from task_manager.handlers import publish_notification, touch_project
+from task_manager.live import (
+    LIVE_TASK_FIELDS,
+    publish_task_fields,
+    publish_task_relations,
+)
+from task_manager.models import (
+    Project,
+    Task,
+    TaskType,
+    NotificationType,
+    Notification,
+)
+from task_manager.search import update_task_search_index
+from task_manager.tags import add_project_tag_counts
+
+# tasks created or updated by one batch
+TASK_BATCH_MAX_SIZE = 1000
+# fields of the batch items which are assigned to the tasks as they are
+TASK_BATCH_FIELDS = (
+    "name",
+    "description",
+    "deadline",
+    "priority",
+    "is_completed",
+)
+
+
+class TaskBatchError(Exception):
+    """
+    Invalid task batch, none of its tasks is saved
+    """
+
+    def __init__(self, message: str, errors: dict = None):
+        super().__init__(message)
+        # {item index: {field: [message, ...]}}
+        self.errors = errors or {}
+
+
+def add_error(errors: dict, index: int, field: str, message: str) -> None:
+    errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+
+def validate_items(items) -> list:
+    """
+    :returns: forms of the batch items
+    :raises TaskBatchError: if the batch or any of its items is invalid
+    """
+    if not isinstance(items, list) or not items:
+        raise TaskBatchError("tasks must be a non-empty list")
+    if len(items) > TASK_BATCH_MAX_SIZE:
+        raise TaskBatchError(
+            f"A batch may contain at most {TASK_BATCH_MAX_SIZE} tasks"
+        )
+    forms, errors, task_ids = [], {}, set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            add_error(errors, index, "__all__", "Enter an object.")
+            continue
+        form = TaskBatchItemForm(item)
+        if not form.is_valid():
+            errors[index] = {
+                field: list(messages)
+                for field, messages in form.errors.items()
+            }
+            continue
+        task_id = form.cleaned_data["id"]
+        if task_id is not None:
+            if task_id in task_ids:
+                add_error(
+                    errors, index, "id", "The task is already submitted."
+                )
+            task_ids.add(task_id)
+        forms.append(form)
+    if errors:
+        raise TaskBatchError("Invalid tasks", errors)
+    return forms
+
+
+def get_names(forms: list, field: str) -> list:
+    """
+    :returns: names submitted in the field of the items, without duplicates
+    """
+    names = {}
+    for form in forms:
+        if field in form.get_submitted_fields():
+            value = form.cleaned_data[field]
+            if not isinstance(value, list):
+                value = [value]
+            names.update(dict.fromkeys(value))
+    return list(names)
+
+
+def get_references(project: Project, requester, forms: list) -> tuple:
+    """
+    Loads the updated tasks, locking them until the end of the transaction,
+    and finds the submitted assignees among the team members
+    :returns: ({task_id: task}, {username: worker_id})
+    :raises TaskBatchError: if a task isn't found in the project
+    among the ones requested by the requester
+    or an assignee isn't a member of the team
+    """
+    task_ids = [
+        form.cleaned_data["id"] for form in forms
+        if form.cleaned_data["id"] is not None
+    ]
+    tasks = {}
+    if task_ids:
+        # only the requester may edit a task, as in TaskUpdateView
+        tasks = Task.objects.select_for_update().filter(
+            project=project, requester=requester
+        ).in_bulk(task_ids)
+    usernames = get_names(forms, "assignees")
+    members = {}
+    if usernames:
+        members = dict(
+            get_user_model().objects.filter(
+                teams=project.working_team_id, username__in=usernames
+            ).values_list("username", "pk")
+        )
+    errors = {}
+    for index, form in enumerate(forms):
+        task_id = form.cleaned_data["id"]
+        if task_id is not None and task_id not in tasks:
+            add_error(
+                errors,
+                index,
+                "id",
+                "The task isn't in the project or wasn't requested by you."
+            )
+        outsiders = [
+            username for username in form.cleaned_data["assignees"]
+            if username not in members
+        ]
+        if outsiders:
+            add_error(
+                errors,
+                index,
+                "assignees",
+                f"Not members of the team: {', '.join(outsiders)}."
+            )
+    if errors:
+        raise TaskBatchError("Invalid tasks", errors)
+    for task in tasks.values():
+        task.project = project
+    return tasks, members
+
+
+def replace_relations(
+        through,
+        task_field: str,
+        related_field: str,
+        relations: dict,
+        **extra
+) -> dict:
+    """
+    Sets the related objects of the tasks by one query reading
+    the current relations, one deleting the dropped ones
+    and one inserting the new ones
+    :param relations: {task_id: [related_id, ...]}
+    :param extra: values of the other fields of the relations,
+    e.g. the content type of taggit relations
+    :returns: {task_id: (added related ids, removed related ids)}
+    of the changed tasks
+    """
+    if not relations:
+        return {}
+    current = {task_id: set() for task_id in relations}
+    dropped = []
+    for pk, task_id, related_id in through.objects.filter(
+            **extra, **{f"{task_field}__in": list(relations)}
+    ).values_list("pk", task_field, related_field):
+        current[task_id].add(related_id)
+        if related_id not in relations[task_id]:
+            dropped.append(pk)
+    if dropped:
+        through.objects.filter(pk__in=dropped).delete()
+    through.objects.bulk_create(
+        through(**extra, **{task_field: task_id, related_field: related_id})
+        for task_id, related_ids in relations.items()
+        for related_id in related_ids
+        if related_id not in current[task_id]
+    )
+    changes = {}
+    for task_id, related_ids in relations.items():
+        added = set(related_ids) - current[task_id]
+        removed = current[task_id] - set(related_ids)
+        if added or removed:
+            changes[task_id] = (added, removed)
+    return changes
+
+
+def get_batch_notification_type() -> NotificationType:
+    try:
+        return NotificationType.objects.get(name="task_batch_saved")
+    except NotificationType.DoesNotExist:
+        return NotificationType.objects.create(
+            name="task_batch_saved",
+            message_template=("Tasks of the project \"{task.project.name}\" "
+                              "assigned to you were created or updated, "
+                              "e.g. \"{task.name}\"")
+        )
+
+
+def notify_assignees(
+        project: Project,
+        tasks: list,
+        assignee_changes: dict
+) -> None:
+    """
+    Sends each worker newly assigned to the tasks one notification
+    of the batch, referring to the first of their tasks.
+    All assignees of the created tasks are new ones
+    :param assignee_changes: result of replace_relations()
+    """
+    first_tasks = {}
+    for task in tasks:
+        added_ids = assignee_changes.get(task.pk, ((), ()))[0]
+        for user_id in added_ids:
+            first_tasks.setdefault(user_id, task)
+    if not first_tasks:
+        return
+    notification_type = get_batch_notification_type()
+    notifications = Notification.objects.bulk_create(
+        Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            task=task,
+            team_id=project.working_team_id,
+            project_id=project.pk
+        )
+        for user_id, task in first_tasks.items()
+    )
+    for notification in notifications:
+        publish_notification(notification.user_id, notification)
+
+
+def save_task_batch(project: Project, requester, items) -> list:
+    """
+    Creates and updates tasks of the project in one transaction
+    by bulk queries, whose number doesn't depend on the batch size.
+    Bulk queries don't send the model signals, so the search index,
+    the tag counters, the modification times and the live updates
+    are updated for all tasks together, and instead of the task
+    notifications each assignee gets one notification of the batch
+    :param items: [{field: value, ...}, ...] of TaskBatchItemForm
+    :returns: ids of the tasks in the order of the items
+    :raises TaskBatchError: if the batch is invalid, nothing is saved then
+    """
+    forms = validate_items(items)
+    with transaction.atomic():
+        tasks, members = get_references(project, requester, forms)
+        task_types = {}
+        task_type_names = get_names(forms, "task_type")
+        if task_type_names:
+            task_types = {
+                name: TaskType(pk=pk, name=name)
+                for name, pk in get_or_create_pks_by_names(
+                    TaskType, "name", task_type_names
+                ).items()
+            }
+        tags = {}
+        tag_names = get_names(forms, "tags")
+        if tag_names:
+            tags = get_or_create_pks_by_names(Tag, "name", tag_names)
+        now = timezone.now()
+        batch_tasks, created, updated, update_fields = [], [], [], set()
+        for form in forms:
+            values = {
+                field: form.cleaned_data[field]
+                for field in form.get_submitted_fields()
+                if field in TASK_BATCH_FIELDS
+            }
+            if "task_type" in form.get_submitted_fields():
+                values["task_type"] = task_types[
+                    form.cleaned_data["task_type"]
+                ]
+            if form.cleaned_data["id"] is None:
+                task = Task(project=project, requester=requester, **values)
+                created.append(task)
+            else:
+                task = tasks[form.cleaned_data["id"]]
+                task.previous_values = {
+                    field: getattr(task, field)
+                    for field in ("project_id", *LIVE_TASK_FIELDS)
+                }
+                for field, value in values.items():
+                    setattr(task, field, value)
+                # bulk_update() doesn't set auto_now fields
+                task.updated_at = now
+                update_fields.update(values)
+                updated.append(task)
+            batch_tasks.append(task)
+        Task.objects.bulk_create(created)
+        if updated:
+            Task.objects.bulk_update(updated, [*update_fields, "updated_at"])
+        tag_changes = replace_relations(
+            Task.tags.through,
+            "object_id",
+            "tag_id",
+            {
+                task.pk: [tags[name] for name in form.cleaned_data["tags"]]
+                for task, form in zip(batch_tasks, forms)
+                if "tags" in form.get_submitted_fields()
+            },
+            content_type=ContentType.objects.get_for_model(Task)
+        )
+        assignee_changes = replace_relations(
+            Task.assignees.through,
+            "task_id",
+            "worker_id",
+            {
+                task.pk: [
+                    members[username]
+                    for username in form.cleaned_data["assignees"]
+                ]
+                for task, form in zip(batch_tasks, forms)
+                if "assignees" in form.get_submitted_fields()
+            }
+        )
+        tag_deltas = Counter()
+        for added, removed in tag_changes.values():
+            tag_deltas.update(added)
+            tag_deltas.subtract(removed)
+        add_project_tag_counts(project.pk, tag_deltas)
+        update_task_search_index([task.pk for task in batch_tasks])
+        touch_project(project.pk)
+        for task in updated:
+            publish_task_fields(task)
+        publish_task_relations(
+            [task.pk for task in updated if task.pk in tag_changes], "tags"
+        )
+        publish_task_relations(
+            [task.pk for task in updated if task.pk in assignee_changes],
+            "assignees"
+        )
+        notify_assignees(project, batch_tasks, assignee_changes)
+    return [task.pk for task in batch_tasks]
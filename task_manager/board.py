@@ -0,0 +1,158 @@
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from task_manager.models import Task
+from task_manager.pagination import (
+    KeysetPage,
+    decode_cursor,
+    get_keyset_page,
+    sort_by_ordering,
+)
+
+# orderings of the board cards, each ending with the primary key
+# and walking an index of the project tasks within a column
+BOARD_ORDERINGS = {
+    "status": ("deadline", "-priority", "id"),
+    "priority": ("is_completed", "deadline", "id"),
+}
+# columns read by one query per value of the leading ordering field:
+# PostgreSQL before 17 sorts the rows of an IN list instead of walking
+# the index in order
+BOARD_SEGMENTS = {
+    "priority": ("is_completed", (False, True)),
+}
+
+
+def get_board_columns(grouping: str, today=None) -> dict:
+    """
+    :param today: date splitting open and overdue tasks,
+    the local date by default
+    :returns: {column: (title, filter)} of the board grouped
+    by status or priority
+    """
+    # is_completed is compared by IN, which seeks the indexes,
+    # while a boolean equality may be rendered as NOT is_completed
+    if grouping == "priority":
+        return {
+            str(value): (label, Q(priority=value))
+            for value, label in sorted(Task.Priority.choices, reverse=True)
+        }
+    today = today or timezone.localdate()
+    return {
+        "overdue": (
+            "Overdue", Q(is_completed__in=[False], deadline__lt=today)
+        ),
+        "open": ("Open", Q(is_completed__in=[False], deadline__gte=today)),
+        "completed": ("Completed", Q(is_completed__in=[True])),
+    }
+
+
+def get_task_status(is_completed: bool, deadline) -> str:
+    """
+    :returns: name of the status column of a task
+    """
+    if is_completed:
+        return "completed"
+    return "overdue" if deadline < timezone.localdate() else "open"
+
+
+def get_column_segments(tasks, grouping: str, position=None) -> list:
+    """
+    Splits the tasks of a column into the querysets read one after
+    another, each walking an index range in the board ordering
+    :param position: ordering values of the cursor row, the segments
+    preceding it are skipped
+    """
+    if grouping not in BOARD_SEGMENTS:
+        return [tasks]
+    field, values = BOARD_SEGMENTS[grouping]
+    if position and position[0] in values:
+        values = values[values.index(position[0]):]
+    return [tasks.filter(**{f"{field}__in": [value]}) for value in values]
+
+
+def get_column_page(tasks, grouping: str, per_page: int, cursor: str):
+    """
+    Returns the page of the column following the cursor, reading
+    the segments of the column until the page is filled.
+    The cards are appended to the column, so the first page isn't
+    repeated when the rest of the column was moved away
+    """
+    ordering = BOARD_ORDERINGS[grouping]
+    position = decode_cursor(cursor, ordering) if cursor else None
+    rows = []
+    for segment in get_column_segments(
+            tasks, grouping, position and position[1]
+    ):
+        page = get_keyset_page(
+            segment,
+            per_page - len(rows),
+            cursor,
+            ordering,
+            empty_when_exhausted=True
+        )
+        rows += page.object_list
+        if page.has_next():
+            return KeysetPage(rows, True, False, ordering)
+    return KeysetPage(rows, False, False, ordering)
+
+
+def get_board_query(tasks, grouping: str, per_page: int, today=None):
+    """
+    Builds one UNION ALL of the limited selects of the first cards
+    of every column segment, each reading at most a page and a row
+    of an index range
+    :returns: (sql, params) selecting (task_id, column index) rows
+    """
+    columns = get_board_columns(grouping, today)
+    ordering = BOARD_ORDERINGS[grouping]
+    selects, params = [], []
+    for index, (_, condition) in enumerate(columns.values()):
+        for segment in get_column_segments(tasks.filter(condition), grouping):
+            sql, select_params = segment.order_by(*ordering).values(
+                "id"
+            )[:per_page + 1].query.sql_with_params()
+            selects.append(
+                f"SELECT id, {index} AS board_column "
+                f"FROM ({sql}) AS segment_{len(selects)}"
+            )
+            params += select_params
+    return " UNION ALL ".join(selects), params
+
+
+def get_board(tasks, grouping: str, per_page: int, today=None) -> list:
+    """
+    Returns the first page of every column of the board.
+    Card ids of all columns are selected by one query,
+    and the cards are loaded by one query with their relations
+    :returns: [{"name": column, "title": title, "page": KeysetPage}, ...]
+    """
+    columns = get_board_columns(grouping, today)
+    ordering = BOARD_ORDERINGS[grouping]
+    with connection.cursor() as cursor:
+        cursor.execute(*get_board_query(tasks, grouping, per_page, today))
+        rows = cursor.fetchall()
+    cards = Task.objects.for_board().in_bulk(
+        [task_id for task_id, _ in rows]
+    )
+    column_cards = defaultdict(list)
+    for task_id, index in rows:
+        if task_id in cards:
+            column_cards[index].append(cards[task_id])
+    board = []
+    for index, (name, (title, _)) in enumerate(columns.items()):
+        column_tasks = sort_by_ordering(column_cards[index], ordering)
+        board.append({
+            "name": name,
+            "title": title,
+            "page": KeysetPage(
+                column_tasks[:per_page],
+                len(column_tasks) > per_page,
+                False,
+                ordering
+            ),
+        })
+    return board
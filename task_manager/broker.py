@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def project_channel(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+class BaseBroker:
+    """
+    Publish/subscribe broker for live updates.
+    publish() is called from the synchronous code (signal handlers),
+    subscribe() is used by the async streaming views
+    """
+
+    def publish(self, channel: str, message: dict):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str):
+        """
+        :returns: async context manager with a subscription,
+        which messages are received by ``await subscription.get()``
+        """
+        raise NotImplementedError
+
+    def publish_safely(self, channel: str, message: dict):
+        """
+        Publishes the message, logging the errors of the broker
+        instead of raising them, since live updates are optional
+        and the changes are already committed
+        """
+        try:
+            self.publish(channel, message)
+        except Exception:
+            logger.exception("Failed to publish to %s", channel)
+
+    def publish_on_commit(self, channel: str, message: dict):
+        transaction.on_commit(lambda: self.publish_safely(channel, message))
+
+
+class InProcessSubscription:
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Delivers messages to the subscribers of the same process only.
+    Each subscriber costs one bounded queue,
+    so idle connections don't use any resources besides it
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self.subscribers = {}
+
+    def publish(self, channel: str, message: dict):
+        for loop, queue in list(self.subscribers.get(channel, ())):
+            loop.call_soon_threadsafe(self._put, queue, message)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, message: dict):
+        if not queue.full():
+            queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        subscriber = (
+            asyncio.get_running_loop(),
+            asyncio.Queue(maxsize=self.max_queue_size)
+        )
+        self.subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield InProcessSubscription(subscriber[1])
+        finally:
+            channel_subscribers = self.subscribers.get(channel, set())
+            channel_subscribers.discard(subscriber)
+            if not channel_subscribers:
+                self.subscribers.pop(channel, None)
+
+
+class RedisSubscription:
+    """
+    Reads the pub/sub messages into a bounded queue by a task of its own,
+    so that a get() cancelled by a timeout (e.g. of the stream heartbeat)
+    doesn't close the pub/sub reader
+    """
+
+    def __init__(self, pubsub, max_queue_size: int):
+        self.pubsub = pubsub
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.reader = None
+
+    def start(self):
+        self.reader = asyncio.create_task(self.read())
+
+    async def stop(self):
+        self.reader.cancel()
+        try:
+            await self.reader
+        except asyncio.CancelledError:
+            pass
+
+    async def read(self):
+        async for message in self.pubsub.listen():
+            if message["type"] == "message" and not self.queue.full():
+                self.queue.put_nowait(json.loads(message["data"]))
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class RedisBroker(BaseBroker):
+    """
+    Delivers messages between processes through Redis pub/sub.
+    Clients may be passed explicitly, otherwise they are created
+    from the url with the redis package
+    """
+
+    def __init__(
+            self,
+            url: str = "redis://localhost:6379/0",
+            prefix: str = "firefly:",
+            client=None,
+            async_client=None,
+            max_queue_size: int = 100
+    ):
+        if client is None or async_client is None:
+            try:
+                import redis
+                import redis.asyncio
+            except ImportError:
+                raise ImproperlyConfigured(
+                    "RedisBroker requires the redis package"
+                )
+            client = client or redis.Redis.from_url(url)
+            async_client = async_client or redis.asyncio.Redis.from_url(url)
+        self.prefix = prefix
+        self.max_queue_size = max_queue_size
+        self.client = client
+        self.async_client = async_client
+
+    def publish(self, channel: str, message: dict):
+        self.client.publish(self.prefix + channel, json.dumps(message))
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        pubsub = self.async_client.pubsub()
+        await pubsub.subscribe(self.prefix + channel)
+        subscription = RedisSubscription(pubsub, self.max_queue_size)
+        subscription.start()
+        try:
+            yield subscription
+        finally:
+            await subscription.stop()
+            await pubsub.unsubscribe(self.prefix + channel)
+            await pubsub.reset()
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> BaseBroker:
+    broker_settings = getattr(settings, "LIVE_UPDATES_BROKER", {})
+    broker_class = import_string(broker_settings.get(
+        "BACKEND", "task_manager.broker.InProcessBroker"
+    ))
+    return broker_class(**broker_settings.get("OPTIONS", {}))
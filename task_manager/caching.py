@@ -0,0 +1,58 @@
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+KEY_PREFIX = "firefly"
+
+
+def get_versions(*names: str) -> list:
+    """
+    Returns current versions of the named cache namespaces.
+    A missing version is initialized with the current time,
+    so entries cached before an eviction of the version are never reused
+    """
+    keys = [f"{KEY_PREFIX}:version:{name}" for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def incr_versions(names: tuple):
+    for name in names:
+        try:
+            cache.incr(f"{KEY_PREFIX}:version:{name}")
+        except ValueError:
+            # not initialized yet, nothing is cached under the old version
+            pass
+
+
+def bump_versions(*names: str):
+    """
+    Invalidates the named cache namespaces now, so the current transaction
+    reads its changes, and again after its commit: a concurrent request
+    may read the uncommitted data and cache it under the new versions
+    """
+    incr_versions(names)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: incr_versions(names))
+
+
+def versioned_key(names: tuple, *parts) -> str:
+    versions = get_versions(*names)
+    return ":".join(map(str, (KEY_PREFIX, *names, *versions, *parts)))
+
+
+def team_page_version(team_slug: str) -> str:
+    return f"team-page:{team_slug}"
+
+
+def project_page_version(project_slug: str) -> str:
+    return f"project-page:{project_slug}"
+
+
+def notifications_version(user_id: int) -> str:
+    return f"notifications:{user_id}"
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Warning, register, Tags
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    """
+    Warns that the access checks and the ETags may use stale cached
+    team memberships and versions in other processes, unless the cache
+    is shared by them
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The default cache ({backend}) isn't shared by processes.",
+            hint=(
+                "Team memberships and page versions cached by one worker "
+                "aren't invalidated in the others. Set DJANGO_CACHE_URL "
+                "unless the project is served by a single process."
+            ),
+            id="task_manager.W001",
+        )
+    ]
@@ -0,0 +1,206 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from task_manager.models import (
+    Notification,
+    NotificationEvent,
+    NotificationReadState,
+    NotificationEmailPreference,
+)
+
+DIGEST_INTERVALS = {
+    NotificationEmailPreference.Frequency.HOURLY: timedelta(hours=1),
+    NotificationEmailPreference.Frequency.DAILY: timedelta(days=1),
+}
+
+DEFAULT_EMAIL_SETTINGS = {
+    "FROM_EMAIL": None,
+    # digests of this number of users are built and sent together
+    "BATCH_SIZE": 50,
+    "MAX_MESSAGES_PER_RUN": 1000,
+    # the latest notifications of a user shown by a digest
+    "MAX_NOTIFICATIONS_PER_DIGEST": 50,
+    # None disables throttling
+    "MESSAGES_PER_SECOND": None,
+}
+
+RELATED_FIELDS = (
+    "notification_type",
+    "task__project__working_team",
+    "task__requester",
+)
+
+
+def get_email_settings(**overrides) -> dict:
+    email_settings = dict(DEFAULT_EMAIL_SETTINGS)
+    email_settings.update(getattr(settings, "NOTIFICATION_EMAIL", {}))
+    email_settings.update(
+        (key, value) for key, value in overrides.items() if value is not None
+    )
+    return email_settings
+
+
+def get_due_preferences(now):
+    due = Q()
+    for frequency, interval in DIGEST_INTERVALS.items():
+        due |= Q(frequency=frequency) & (
+            Q(last_sent_at__isnull=True)
+            | Q(last_sent_at__lte=now - interval)
+        )
+    return NotificationEmailPreference.objects.filter(due).exclude(
+        user__email=""
+    ).select_related("user").order_by("pk")
+
+
+def latest_per_user(queryset, user_field: str, limit: int):
+    """
+    Keeps the latest rows of every user by filtering on a window
+    """
+    return queryset.annotate(
+        user_rank=Window(
+            RowNumber(),
+            partition_by=F(user_field),
+            order_by=F("sent_at").desc()
+        )
+    ).filter(user_rank__lte=limit)
+
+
+def get_pending_notifications(
+        preferences: list,
+        now=None,
+        limit: int = DEFAULT_EMAIL_SETTINGS["MAX_NOTIFICATIONS_PER_DIGEST"]
+) -> dict:
+    """
+    Loads the latest unread notifications sent after the previous digest,
+    or within the digest interval for the first one,
+    for all users of the batch with two queries
+    :returns: {user_id: [notification, ...]}
+    """
+    now = now or timezone.now()
+    user_ids = [preference.user_id for preference in preferences]
+    since = {
+        preference.user_id: (
+            preference.last_sent_at
+            or now - DIGEST_INTERVALS[preference.frequency]
+        )
+        for preference in preferences
+    }
+    date_filter = Q(sent_at__gt=min(since.values()))
+
+    pending = {user_id: [] for user_id in user_ids}
+    notifications = latest_per_user(
+        Notification.objects.filter(
+            date_filter, user_id__in=user_ids, is_read=False
+        ),
+        "user_id",
+        limit
+    ).select_related(*RELATED_FIELDS)
+    events = latest_per_user(
+        NotificationEvent.objects.filter(
+            date_filter, recipients__in=user_ids
+        ),
+        "recipients",
+        limit
+    ).annotate(
+        recipient_id=F("recipients")
+    ).select_related(*RELATED_FIELDS)
+    read_states = {
+        read_state.user_id: read_state
+        for read_state in NotificationReadState.objects.filter(
+            user_id__in=user_ids
+        )
+    }
+    for notification in notifications:
+        pending[notification.user_id].append(notification)
+    for event in events:
+        read_state = read_states.get(event.recipient_id)
+        if read_state is None or not read_state.is_event_read(event.id):
+            pending[event.recipient_id].append(event)
+    for user_id, user_notifications in pending.items():
+        user_notifications[:] = sorted(
+            (
+                notification for notification in user_notifications
+                if notification.sent_at > since[user_id]
+            ),
+            key=lambda notification: notification.sent_at,
+            reverse=True
+        )[:limit]
+    return pending
+
+
+def build_digest(user, notifications: list, from_email) -> EmailMessage:
+    body = render_to_string(
+        "task_manager/email/notification_digest.txt",
+        {"user": user, "notifications": notifications}
+    )
+    return EmailMessage(
+        subject=f"Firefly: {len(notifications)} new notifications",
+        body=body,
+        from_email=from_email,
+        to=[user.email],
+    )
+
+
+def send_digests(now=None, connection=None, **overrides) -> int:
+    """
+    Sends notification digests to the users whose digest is due.
+    All messages go through a single connection,
+    MESSAGES_PER_SECOND and MAX_MESSAGES_PER_RUN limit the sending rate
+    :returns: number of sent messages
+    """
+    now = now or timezone.now()
+    email_settings = get_email_settings(**overrides)
+    batch_size = email_settings["BATCH_SIZE"]
+    max_messages = email_settings["MAX_MESSAGES_PER_RUN"]
+    messages_per_second = email_settings["MESSAGES_PER_SECOND"]
+    connection = connection or get_connection()
+    sent = 0
+    last_pk = 0
+    with connection:
+        while sent < max_messages:
+            preferences = list(
+                get_due_preferences(now).filter(pk__gt=last_pk)[:batch_size]
+            )
+            if not preferences:
+                break
+            last_pk = preferences[-1].pk
+            pending = get_pending_notifications(
+                preferences,
+                now,
+                email_settings["MAX_NOTIFICATIONS_PER_DIGEST"]
+            )
+            messages = []
+            processed = []
+            for preference in preferences:
+                if len(messages) + sent >= max_messages:
+                    break
+                processed.append(preference)
+                notifications = pending[preference.user_id]
+                if notifications:
+                    messages.append(build_digest(
+                        preference.user,
+                        notifications,
+                        email_settings["FROM_EMAIL"]
+                    ))
+            started_at = time.monotonic()
+            connection.send_messages(messages)
+            for preference in processed:
+                preference.last_sent_at = now
+            NotificationEmailPreference.objects.bulk_update(
+                processed, ["last_sent_at"]
+            )
+            sent += len(messages)
+            if messages_per_second and messages:
+                time.sleep(max(
+                    0,
+                    len(messages) / messages_per_second
+                    - (time.monotonic() - started_at)
+                ))
+    return sent
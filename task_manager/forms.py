@@ -1,15 +1,30 @@
+from datetime import timedelta
+from functools import lru_cache
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
 from django.db.models import Q
 from django.forms import ModelForm
+from django.forms.fields import CallableChoiceIterator
+from django.utils import timezone
+from django_select2.cache import cache as select2_cache
 from django_select2.forms import (
     ModelSelect2TagWidget,
     ModelSelect2MultipleWidget
 )
 from taggit.models import Tag
 
+from task_manager.autocomplete import search_worker_ids
+from task_manager.memberships import (
+    get_team_roster,
+    get_accessible_team_ids,
+)
 from task_manager.models import Team, Project, Task, TaskType
+from task_manager.pagination import TASK_SORT_ORDERINGS
+from task_manager.tags import order_tags_by_popularity
 
 
 class UserRegistrationForm(UserCreationForm):
@@ -25,6 +40,154 @@ class UserRegistrationForm(UserCreationForm):
         )
 
 
+class TeamAutocompleteMixin:
+    """
+    Keeps team_id of the select2 widget in the widget cache,
+    so that the autocomplete view can scope its results to the team
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.team_id = kwargs.pop("team_id", None)
+        super().__init__(*args, **kwargs)
+
+    def get_cache_key(self) -> str:
+        # the key the autocomplete view finds the widget by
+        return f"{settings.SELECT2_CACHE_PREFIX}{self.uuid}"
+
+    def set_to_cache(self):
+        super().set_to_cache()
+        if self.team_id is None:
+            return
+        # the cached attributes become the arguments of the widget
+        # in the autocomplete view
+        key = self.get_cache_key()
+        widget_kwargs = select2_cache.get(key)
+        widget_kwargs["team_id"] = self.team_id
+        select2_cache.set(key, widget_kwargs)
+
+
+class WorkerAutocompleteWidget(
+    TeamAutocompleteMixin,
+    ModelSelect2MultipleWidget
+):
+    """
+    Searches workers by name and position prefixes
+    through the search tokens index instead of icontains scans.
+    Search is limited to the members of the team if team_id is set
+    """
+
+    model = get_user_model()
+    queryset = get_user_model().objects.select_related("position")
+    search_fields = [
+        "first_name__istartswith",
+        "last_name__istartswith",
+        "position__name__istartswith",
+    ]
+
+    def __init__(self, *args, **kwargs):
+        # {worker_id: label} of the workers known without a query
+        self.labels = kwargs.pop("labels", {})
+        super().__init__(*args, **kwargs)
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [str(pk) for pk in value if pk not in ("", None)]
+        labels = {str(pk): label for pk, label in self.labels.items()}
+        if not all(pk in labels for pk in selected):
+            return super().optgroups(name, value, attrs)
+        options = [
+            self.create_option(name, pk, labels[pk], True, index)
+            for index, pk in enumerate(selected)
+        ]
+        return [(None, options, 0)]
+
+    def filter_queryset(
+            self, request, term, queryset=None, **dependent_fields
+    ):
+        if queryset is None:
+            queryset = self.get_queryset()
+        if self.team_id is not None:
+            queryset = queryset.filter(teams=self.team_id)
+        worker_ids = search_worker_ids(term, self.team_id)
+        if worker_ids is not None:
+            queryset = queryset.filter(pk__in=worker_ids)
+        return queryset
+
+
+class TeamRosterFieldMixin:
+    """
+    Builds choices from and validates values against
+    the cached team roster instead of querying the field's queryset,
+    if the roster is set
+    """
+
+    roster = None
+
+    def set_roster(self, roster: list):
+        self.roster = roster
+        self.widget.choices = self.choices
+        if isinstance(self.widget, WorkerAutocompleteWidget):
+            self.widget.labels = dict(roster)
+
+    def _get_choices(self):
+        if self.roster is None:
+            return super()._get_choices()
+        choices = list(self.roster)
+        if self.empty_label is not None:
+            choices.insert(0, ("", self.empty_label))
+        return choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def get_roster_pk(self, value) -> int:
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        if pk not in dict(self.roster):
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return pk
+
+
+class TeamRosterChoiceField(TeamRosterFieldMixin, forms.ModelChoiceField):
+    def to_python(self, value):
+        if self.roster is not None and value not in self.empty_values:
+            self.get_roster_pk(value)
+        return super().to_python(value)
+
+
+class TeamRosterMultipleChoiceField(
+    TeamRosterFieldMixin,
+    forms.ModelMultipleChoiceField
+):
+    def clean(self, value):
+        if self.roster is None:
+            return super().clean(value)
+        value = self.prepare_value(value)
+        if not value:
+            if self.required:
+                raise ValidationError(
+                    self.error_messages["required"], code="required"
+                )
+            return self.queryset.none()
+        if not isinstance(value, (list, tuple)):
+            raise ValidationError(
+                self.error_messages["invalid_list"], code="invalid_list"
+            )
+        pks = {self.get_roster_pk(pk) for pk in value}
+        self.run_validators(value)
+        # the values are checked against the roster,
+        # so the workers are loaded only when the result is used
+        return self.queryset.filter(pk__in=pks)
+
+
 class TeamForm(ModelForm):
     class Meta:
         model = Team
@@ -35,13 +198,7 @@ class TeamForm(ModelForm):
     )
     members = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.select_related("position"),
-        widget=ModelSelect2MultipleWidget(
-            model=get_user_model(),
-            search_fields=[
-                "first_name__icontains",
-                "last_name__icontains",
-                "position__name__icontains"
-            ],
+        widget=WorkerAutocompleteWidget(
             attrs={
                 "data-placeholder": "Choose members"
             },
@@ -51,12 +208,13 @@ class TeamForm(ModelForm):
 
 class TeamUpdateForm(TeamForm):
     def __init__(self, *args, **kwargs):
-        members_queryset = kwargs["initial"].pop("members_queryset", None)
         super().__init__(*args, **kwargs)
-        self.fields["founder"].queryset = members_queryset
+        roster = get_team_roster(self.instance.pk)
+        self.fields["founder"].set_roster(roster["founder_choices"])
+        self.fields["members"].widget.labels = dict(roster["members"])
 
-    founder = forms.ModelChoiceField(
-        queryset=None,
+    founder = TeamRosterChoiceField(
+        queryset=get_user_model().objects.all(),
         required=False,
     )
 
@@ -71,6 +229,54 @@ class ProjectForm(ModelForm):
     )
 
 
+def build_named_object(model, field: str, name: str):
+    obj = model(**{field: name})
+    if hasattr(obj, "slugify") and not obj.slug:
+        # bulk_create() doesn't call save(), which fills taggit slugs
+        obj.slug = obj.slugify(name)
+    return obj
+
+
+def get_pks_by_names(model, field: str, names) -> dict:
+    return dict(
+        model.objects.filter(**{f"{field}__in": names}).values_list(
+            field, "pk"
+        )
+    )
+
+
+def create_named_objects(model, field: str, names) -> dict:
+    """
+    Creates objects with the given names, tolerating objects
+    created concurrently by another request
+    :returns: {name: pk}
+    """
+    model.objects.bulk_create(
+        [build_named_object(model, field, name) for name in names],
+        ignore_conflicts=True
+    )
+    pks_by_names = get_pks_by_names(model, field, names)
+    for name in names:
+        if name not in pks_by_names:
+            # conflict on another unique field (e.g. slug),
+            # which save() knows how to resolve
+            pks_by_names[name] = model.objects.get_or_create(
+                **{field: name}
+            )[0].pk
+    return pks_by_names
+
+
+def get_or_create_pks_by_names(model, field: str, names) -> dict:
+    """
+    :returns: {name: pk} of the named objects, creating the missing ones
+    """
+    pks_by_names = get_pks_by_names(model, field, names)
+    new_names = [name for name in names if name not in pks_by_names]
+    if new_names:
+        pks_by_names.update(create_named_objects(model, field, new_names))
+    return pks_by_names
+
+
 class ModelMultipleAutocompleteChoiceWidget(ModelSelect2TagWidget):
     """
     Implements user-friendly ModelMultipleChoiceField design
@@ -85,38 +291,85 @@ class ModelMultipleAutocompleteChoiceWidget(ModelSelect2TagWidget):
         self.many = kwargs.pop("many", self.many)
         super().__init__(*args, **kwargs)
 
-    def value_from_datadict(self, data, files, name):
-        values = super().value_from_datadict(data, files, name)
-        cleaned_values = [
-            value
-            if value.isdigit()
-            and self.model.objects.filter(pk=int(value)).exists()
-            else str(self.model.objects.get_or_create(
-                **{self.create_field: value}
-            )[0].pk)
+    def resolve_values(self, values) -> list:
+        """
+        Replaces submitted values with primary keys of existing objects,
+        values that aren't existing primary keys are treated as names
+        of objects, which are created if needed
+        """
+        values = [value for value in values if value]
+        existing_pks = set()
+        submitted_pks = {int(value) for value in values if value.isdigit()}
+        if submitted_pks:
+            existing_pks = set(
+                self.model.objects.filter(
+                    pk__in=submitted_pks
+                ).values_list("pk", flat=True)
+            )
+        names = list(dict.fromkeys(
+            value for value in values
+            if not (value.isdigit() and int(value) in existing_pks)
+        ))
+        pks_by_names = {}
+        if names:
+            pks_by_names = get_or_create_pks_by_names(
+                self.model, self.create_field, names
+            )
+        return [
+            value if value.isdigit() and int(value) in existing_pks
+            else str(pks_by_names[value])
             for value in values
         ]
-        if not self.many and cleaned_values:
-            return self.model.objects.get(pk=cleaned_values[0])
+
+    def value_from_datadict(self, data, files, name):
+        values = super().value_from_datadict(data, files, name)
+        cleaned_values = self.resolve_values(values)
+        if not self.many:
+            return cleaned_values[0] if cleaned_values else None
         return cleaned_values
 
     def value_omitted_from_data(self, data, files, name):
         return False
 
 
+class TagAutocompleteWidget(
+    TeamAutocompleteMixin,
+    ModelMultipleAutocompleteChoiceWidget
+):
+    """
+    Suggests the tags most used by the team's tasks first,
+    ranked by the team tag counters
+    """
+
+    search_fields = ["name__icontains"]
+
+    def filter_queryset(
+            self, request, term, queryset=None, **dependent_fields
+    ):
+        queryset = super().filter_queryset(
+            request, term, queryset, **dependent_fields
+        )
+        if self.team_id is None:
+            return queryset
+        return order_tags_by_popularity(queryset, self.team_id)
+
+
 class TaskForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         team_slug = kwargs["initial"].pop('team_slug', None)
+        project = kwargs["initial"].get("project")
         super().__init__(*args, **kwargs)
-        assignees_queryset = self.fields['assignees'].queryset
-        if team_slug and assignees_queryset:
-            self.fields['assignees'].queryset = assignees_queryset.filter(
-                teams__slug=team_slug
+        if team_slug and project:
+            team_id = project.working_team_id
+            self.fields["assignees"].set_roster(
+                get_team_roster(team_id)["members"]
             )
+            self.fields["assignees"].widget.team_id = team_id
+            self.fields["tags"].widget.team_id = team_id
 
     tags = forms.ModelMultipleChoiceField(
         queryset=Tag.objects.all(),
-        widget=ModelMultipleAutocompleteChoiceWidget(
+        widget=TagAutocompleteWidget(
             model=Tag,
             search_fields=["name__icontains"],
             attrs={
@@ -144,15 +397,9 @@ class TaskForm(forms.ModelForm):
         widget=forms.HiddenInput,
         required=False
     )
-    assignees = forms.ModelMultipleChoiceField(
+    assignees = TeamRosterMultipleChoiceField(
         queryset=get_user_model().objects.select_related("position"),
-        widget=ModelSelect2MultipleWidget(
-            model=get_user_model(),
-            search_fields=[
-                "first_name__icontains",
-                "last_name__icontains",
-                "position__name__icontains"
-            ],
+        widget=WorkerAutocompleteWidget(
             attrs={
                 "data-placeholder": "Choose assignees"
             },
@@ -178,13 +425,94 @@ class TaskForm(forms.ModelForm):
 
 
 class TaskForOneAssigneeForm(TaskForm):
-    assignees = forms.ModelMultipleChoiceField(
+    assignees = TeamRosterMultipleChoiceField(
         queryset=get_user_model().objects,
         widget=forms.HiddenInput,
         required=False
     )
 
 
+class NameListField(forms.Field):
+    """
+    List of names decoded from JSON, e.g. tags or usernames
+    submitted to the batch API. Duplicates are dropped
+    """
+
+    default_error_messages = {
+        "invalid": "Enter a list of names.",
+    }
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if not isinstance(value, list) or not all(
+                isinstance(name, str) and name.strip() for name in value
+        ):
+            raise ValidationError(
+                self.error_messages["invalid"], code="invalid"
+            )
+        return list(dict.fromkeys(name.strip() for name in value))
+
+
+class TaskBatchItemForm(forms.Form):
+    """
+    Task created (without id) or updated (with id) by a task batch,
+    referring to the task type, tags and assignees by names.
+    Updates change the submitted fields only
+    """
+
+    REQUIRED_FIELDS = ("name", "deadline", "task_type")
+    # fields which may be omitted, the model default is kept then,
+    # but can't be emptied
+    NOT_EMPTY_FIELDS = ("priority",)
+
+    id = forms.IntegerField(min_value=1, required=False)
+    name = forms.CharField(max_length=255, required=False)
+    description = forms.CharField(required=False)
+    deadline = forms.DateField(required=False)
+    priority = forms.TypedChoiceField(
+        choices=Task.Priority.choices,
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+    is_completed = forms.BooleanField(required=False)
+    task_type = forms.CharField(max_length=255, required=False)
+    tags = NameListField(required=False)
+    assignees = NameListField(required=False)
+
+    def get_submitted_fields(self) -> list:
+        return [
+            field for field in self.fields
+            if field in self.data and field != "id"
+        ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        unknown = sorted(set(self.data) - set(self.fields))
+        if unknown:
+            raise ValidationError(
+                "Unknown fields: %(fields)s",
+                code="unknown",
+                params={"fields": ", ".join(unknown)},
+            )
+        is_created = cleaned_data.get("id") is None
+        for field in (*self.REQUIRED_FIELDS, *self.NOT_EMPTY_FIELDS):
+            if (
+                    (
+                        (is_created and field in self.REQUIRED_FIELDS)
+                        or field in self.data
+                    )
+                    and field not in self.errors
+                    and cleaned_data.get(field) in (None, "")
+            ):
+                self.add_error(field, ValidationError(
+                    self.fields[field].error_messages["required"],
+                    code="required",
+                ))
+        return cleaned_data
+
+
 class NotificationFilterByTeamForm(forms.Form):
     def __init__(self, *args, **kwargs):
         user_id = kwargs["initial"].pop("user_id", None)
@@ -192,8 +520,8 @@ class NotificationFilterByTeamForm(forms.Form):
         if user_id:
             team_queryset = self.fields["team"].queryset
             self.fields["team"].queryset = team_queryset.filter(
-                Q(founder_id=user_id) | Q(members__id=user_id),
-            ).distinct()
+                pk__in=get_accessible_team_ids(user_id)
+            )
 
     team = forms.ModelChoiceField(
         queryset=Team.objects.all(),
@@ -204,14 +532,149 @@ class NotificationFilterByTeamForm(forms.Form):
 class NotificationFilterByProjectForm(forms.Form):
     def __init__(self, *args, **kwargs):
         team_id = kwargs["initial"].pop("team_id", None)
+        user_id = kwargs["initial"].pop("user_id", None)
         super().__init__(*args, **kwargs)
         if team_id:
             project_queryset = self.fields["project"].queryset
             self.fields["project"].queryset = project_queryset.filter(
                 working_team__id=team_id,
             )
+        if user_id:
+            project_queryset = self.fields["project"].queryset
+            self.fields["project"].queryset = project_queryset.filter(
+                working_team__id__in=get_accessible_team_ids(user_id),
+            )
 
     project = forms.ModelChoiceField(
         queryset=Project.objects.select_related("working_team"),
         required=False,
     )
+
+
+class MemberTasksFilterForm(forms.Form):
+    """
+    Filters and sorts tasks of the member tasks page.
+    Invalid fields are ignored, so that the tasks are always listed
+    """
+    # is_completed is compared by IN, which seeks the indexes,
+    # while a boolean equality may be rendered as NOT is_completed
+    STATUS_FILTERS = {
+        "open": lambda: Q(is_completed__in=[False]),
+        "overdue": lambda: Q(
+            is_completed__in=[False], deadline__lt=timezone.localdate()
+        ),
+        "due_week": lambda: Q(
+            is_completed__in=[False],
+            deadline__range=(
+                timezone.localdate(),
+                timezone.localdate() + timedelta(days=6)
+            ),
+        ),
+        "completed": lambda: Q(is_completed__in=[True]),
+    }
+    PRIORITY_CHOICES = [("", "Any")] + sorted(Task.Priority.choices)
+
+    status = forms.ChoiceField(
+        choices=[
+            ("", "Any"),
+            ("open", "Open"),
+            ("overdue", "Overdue"),
+            ("due_week", "Due this week"),
+            ("completed", "Completed"),
+        ],
+        required=False,
+    )
+    priority_from = forms.TypedChoiceField(
+        choices=PRIORITY_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+    priority_to = forms.TypedChoiceField(
+        choices=PRIORITY_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+    deadline_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+    )
+    deadline_to = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+    )
+    task_type = forms.ModelChoiceField(
+        queryset=TaskType.objects.all(),
+        required=False,
+    )
+    tag = forms.SlugField(required=False)
+    sort = forms.ChoiceField(
+        choices=[
+            ("priority", "Priority"),
+            ("deadline", "Deadline"),
+            ("name", "Name"),
+        ],
+        required=False,
+    )
+
+    def set_tag_choices(self, get_tag_counts) -> None:
+        """
+        Shows the tag filter as a dropdown of the tags returned
+        by the callable as [(slug, name, tasks_count), ...],
+        which is called only if the form is rendered
+        """
+        selected_tag = self.data.get("tag")
+
+        # the widget iterates the choices more than once per render
+        @lru_cache(maxsize=None)
+        def get_choices():
+            choices = [
+                (slug, f"{name} ({tasks_count})")
+                for slug, name, tasks_count in get_tag_counts()
+            ]
+            if selected_tag and selected_tag not in dict(choices):
+                choices.append((selected_tag, selected_tag))
+            return [("", "Any")] + choices
+
+        self.fields["tag"].widget = forms.Select()
+        self.fields["tag"].widget.choices = CallableChoiceIterator(get_choices)
+
+    def get_filters(self) -> dict:
+        self.is_valid()
+        return {
+            name: value for name, value in self.cleaned_data.items()
+            if value not in (None, "") and name != "sort"
+        }
+
+    def filter_tasks(self, tasks):
+        filters = self.get_filters()
+        if "status" in filters:
+            tasks = tasks.filter(self.STATUS_FILTERS[filters["status"]]())
+        if "priority_from" in filters:
+            tasks = tasks.filter(priority__gte=filters["priority_from"])
+        if "priority_to" in filters:
+            tasks = tasks.filter(priority__lte=filters["priority_to"])
+        if "deadline_from" in filters:
+            tasks = tasks.filter(deadline__gte=filters["deadline_from"])
+        if "deadline_to" in filters:
+            tasks = tasks.filter(deadline__lte=filters["deadline_to"])
+        if "task_type" in filters:
+            tasks = tasks.filter(task_type=filters["task_type"])
+        if "tag" in filters:
+            tasks = tasks.filter(tags__slug=filters["tag"])
+        return tasks
+
+    def get_ordering(self) -> tuple:
+        self.is_valid()
+        return TASK_SORT_ORDERINGS[self.cleaned_data.get("sort") or "priority"]
+
+    def get_query(self) -> dict:
+        """
+        Returns the valid query parameters, kept by the pagination links
+        """
+        self.is_valid()
+        return {
+            name: self.data[name] for name, value in self.cleaned_data.items()
+            if value not in (None, "")
+        }
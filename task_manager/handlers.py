@@ -1,16 +1,55 @@
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models.signals import post_save, pre_delete
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    post_save,
+    pre_save,
+    pre_delete,
+    post_delete,
+    m2m_changed,
+)
 from django.dispatch import receiver
+from django.utils import timezone
+from taggit.models import Tag
 
 from task_manager.models import (
     Position,
     Task,
     NotificationType,
     Notification,
-    Team
+    NotificationEvent,
+    Team,
+    Project
+)
+from task_manager.autocomplete import (
+    update_worker_search_tokens,
+    team_members_version,
+)
+from task_manager.broker import get_broker, user_channel
+from task_manager.caching import (
+    bump_versions,
+    team_page_version,
+    project_page_version,
+    notifications_version,
+)
+from task_manager.live import (
+    LIVE_TASK_FIELDS,
+    is_live_enabled,
+    publish_task_fields,
+    publish_task_relations,
+    publish_task_removed,
+)
+from task_manager.memberships import user_teams_version
+from task_manager.search import (
+    update_task_search_index,
+    delete_from_task_search_index,
 )
 from task_manager.signals import task_review_requested, task_completed
+from task_manager.tags import (
+    add_task_tag_counts,
+    move_project_tag_counts,
+    remove_project_tag_counts,
+)
 
 
 def on_transaction_commit(func):
@@ -19,18 +58,50 @@ def on_transaction_commit(func):
     return inner
 
 
+def get_origin_model(origin):
+    """
+    :returns: model of the instance or queryset whose delete()
+    sent the deletion signal
+    """
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def is_deleted_with_project(origin) -> bool:
+    """
+    Tasks deleted with their project or team are handled
+    by the project handlers for all tasks of the project together
+    """
+    return get_origin_model(origin) in (Project, Team)
+
+
 @receiver(pre_delete, sender=Position)
 def position_pre_delete(sender, instance: Position, **kwargs):
+    worker_ids = list(instance.workers.values_list("id", flat=True))
     instance.workers.update(position_id=Position.get_default_position().id)
+    update_worker_search_tokens(worker_ids)
+
+
+@receiver(post_save, sender=Position)
+def position_post_save(sender, instance: Position, created, **kwargs):
+    if not created:
+        update_worker_search_tokens(
+            instance.workers.values_list("id", flat=True)
+        )
 
 
 @receiver(pre_delete, sender=get_user_model())
 def user_pre_delete(sender, instance, **kwargs):
+    team_ids = set(instance.teams.values_list("id", flat=True))
+    team_ids.update(instance.founded_teams.values_list("id", flat=True))
+    bump_versions(*map(team_members_version, team_ids))
     for founded_team in instance.founded_teams.all():
         if founded_team.members:
+            new_founder = founded_team.members.first()
             Team.objects.filter(pk=founded_team.pk).update(
-                founder=founded_team.members.first()
+                founder=new_founder
             )
+            if new_founder:
+                bump_versions(user_teams_version(new_founder.pk))
         else:
             founded_team.delete()
     deleted_user = get_user_model().get_deleted_user()
@@ -41,25 +112,421 @@ def user_pre_delete(sender, instance, **kwargs):
 
 
 @receiver(post_save, sender=get_user_model())
-def user_post_save(sender, instance, **kwargs):
+def user_post_save(sender, instance, created, **kwargs):
     if instance.position is None:
         get_user_model().objects.filter(pk=instance.pk).update(
             position_id=Position.get_default_position().id
         )
+    if created:
+        # the id may be reused after a deletion of the previous owner
+        bump_versions(user_teams_version(instance.pk))
+
+
+WORKER_SEARCH_FIELDS = ("first_name", "last_name", "username", "position")
+
+
+def is_search_update(update_fields) -> bool:
+    return update_fields is None or bool(
+        set(WORKER_SEARCH_FIELDS) & set(update_fields)
+    )
+
+
+def get_search_values(worker) -> tuple:
+    return (
+        worker.first_name,
+        worker.last_name,
+        worker.username,
+        worker.position_id,
+    )
+
+
+@receiver(pre_save, sender=get_user_model())
+def user_search_tokens_pre_save(
+        sender,
+        instance,
+        update_fields=None,
+        **kwargs
+):
+    instance.previous_search_values = None
+    if instance.pk is not None and is_search_update(update_fields):
+        instance.previous_search_values = get_user_model().objects.filter(
+            pk=instance.pk
+        ).values_list(*WORKER_SEARCH_FIELDS).first()
+
+
+@receiver(post_save, sender=get_user_model())
+def user_search_tokens_post_save(
+        sender,
+        instance,
+        update_fields=None,
+        **kwargs
+):
+    # saves which keep the names and the position, such as logins
+    # and profile edits of other fields, keep the caches of the teams
+    if is_search_update(update_fields) and (
+            get_search_values(instance) != instance.previous_search_values
+    ):
+        update_worker_search_tokens([instance.pk])
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def team_members_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Team):
+        team_ids = [instance.pk]
+        if action == "pre_clear":
+            user_ids = list(instance.members.values_list("id", flat=True))
+        else:
+            user_ids = pk_set
+    else:
+        user_ids = [instance.pk]
+        if action == "pre_clear":
+            team_ids = list(instance.teams.values_list("id", flat=True))
+        else:
+            team_ids = pk_set
+    Team.objects.filter(pk__in=team_ids).update(updated_at=timezone.now())
+    if isinstance(instance, Team):
+        team_slugs = [instance.slug]
+    else:
+        team_slugs = Team.objects.filter(pk__in=team_ids).values_list(
+            "slug", flat=True
+        )
+    bump_versions(
+        *map(team_members_version, team_ids),
+        *map(user_teams_version, user_ids),
+        *map(team_page_version, team_slugs)
+    )
+
+
+@receiver(pre_save, sender=Team)
+def team_pre_save(sender, instance: Team, **kwargs):
+    instance.previous_founder_id = None
+    instance.previous_slug = None
+    if instance.pk is not None:
+        instance.previous_founder_id, instance.previous_slug = (
+            Team.objects.filter(pk=instance.pk).values_list(
+                "founder_id", "slug"
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Team)
+def team_founder_changed(sender, instance: Team, **kwargs):
+    founder_ids = {instance.founder_id, instance.previous_founder_id}
+    slugs = {instance.slug, instance.previous_slug}
+    bump_versions(
+        team_members_version(instance.pk),
+        *map(user_teams_version, founder_ids - {None}),
+        *map(team_page_version, slugs - {None})
+    )
+
+
+@receiver(post_delete, sender=Team)
+def team_post_delete(sender, instance: Team, **kwargs):
+    bump_versions(team_page_version(instance.slug))
+
+
+@receiver(pre_save, sender=Project)
+def project_pre_save(sender, instance: Project, **kwargs):
+    instance.previous_slug = None
+    instance.previous_working_team_id = None
+    if instance.pk is not None:
+        instance.previous_slug, instance.previous_working_team_id = (
+            Project.objects.filter(pk=instance.pk).values_list(
+                "slug", "working_team_id"
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Project)
+def project_page_changed(sender, instance: Project, **kwargs):
+    slugs = {instance.slug, instance.previous_slug}
+    bump_versions(*map(project_page_version, slugs - {None}))
+
+
+@receiver(post_delete, sender=Project)
+def project_post_delete(sender, instance: Project, **kwargs):
+    bump_versions(project_page_version(instance.slug))
+
+
+@receiver(pre_delete, sender=Team)
+def team_pre_delete(sender, instance: Team, **kwargs):
+    user_ids = set(instance.members.values_list("id", flat=True))
+    user_ids.add(instance.founder_id)
+    bump_versions(*map(user_teams_version, user_ids - {None}))
+
+
+def publish_notification(user_id: int, notification):
+    transaction.on_commit(
+        lambda: bump_versions(notifications_version(user_id))
+    )
+    project = notification.task.project
+    try:
+        message = notification.message_text
+    except AttributeError:
+        # the template refers to a missing object, e.g. a deleted requester
+        message = notification.notification_type.name
+    get_broker().publish_on_commit(user_channel(user_id), {
+        "id": notification.id,
+        "url": notification.get_absolute_url(),
+        "message": message,
+        "place": f"{project.working_team} / {project}",
+        "sent_at": notification.sent_at.isoformat(),
+    })
 
 
 def send_notification_to_assignees(
         task: Task,
         notification_type: NotificationType
 ):
-    for user in task.assignees.all():
-        Notification.objects.create(
-            user=user,
+    team_id = task.project.working_team_id
+    assignee_ids = list(task.assignees.values_list("id", flat=True))
+    if notification_type.delivery == NotificationType.Delivery.BROADCAST:
+        event = NotificationEvent.objects.create(
             notification_type=notification_type,
-            task=task
+            task=task,
+            team_id=team_id,
+            project_id=task.project_id
+        )
+        # the audience is recorded, so that later assignment changes
+        # don't change the past events of the users
+        event.recipients.add(*assignee_ids)
+        for user_id in assignee_ids:
+            publish_notification(user_id, event)
+        return
+    notifications = Notification.objects.bulk_create(
+        Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            task=task,
+            team_id=team_id,
+            project_id=task.project_id
+        )
+        for user_id in assignee_ids
+    )
+    for notification in notifications:
+        publish_notification(notification.user_id, notification)
+
+
+@receiver(post_save, sender=Task)
+def task_project_changed(sender, instance: Task, created, **kwargs):
+    if created:
+        return
+    team_id = Project.objects.filter(
+        pk=instance.project_id
+    ).values("working_team_id")[:1]
+    for model in (Notification, NotificationEvent):
+        model.objects.filter(task=instance).exclude(
+            project_id=instance.project_id
+        ).update(project_id=instance.project_id, team_id=team_id)
+
+
+@receiver(post_save, sender=Project)
+def project_team_changed(sender, instance: Project, created, **kwargs):
+    if created:
+        return
+    for model in (Notification, NotificationEvent):
+        model.objects.filter(project=instance).exclude(
+            team_id=instance.working_team_id
+        ).update(team_id=instance.working_team_id)
+    if instance.previous_working_team_id not in (
+            None, instance.working_team_id
+    ):
+        update_task_search_index(
+            instance.task_set.values_list("id", flat=True)
+        )
+        move_project_tag_counts(
+            instance.pk,
+            instance.previous_working_team_id,
+            instance.working_team_id
+        )
+
+
+def touch_project(project_id: int):
+    """
+    Updates modification time of the project and its team
+    """
+    now = timezone.now()
+    Project.objects.filter(pk=project_id).update(updated_at=now)
+    Team.objects.filter(projects=project_id).update(updated_at=now)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance: Task, **kwargs):
+    if not is_deleted_with_project(kwargs.get("origin")):
+        touch_project(instance.project_id)
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def task_assignees_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    now = timezone.now()
+    if isinstance(instance, Task):
+        task_ids = [instance.pk]
+    elif action == "pre_clear":
+        task_ids = list(instance.assigned_tasks.values_list("id", flat=True))
+    else:
+        task_ids = pk_set
+    Task.objects.filter(pk__in=task_ids).update(updated_at=now)
+    project_ids = Task.objects.filter(pk__in=task_ids).values("project_id")
+    Project.objects.filter(pk__in=project_ids).update(updated_at=now)
+    Team.objects.filter(projects__in=project_ids).update(updated_at=now)
+
+
+@receiver(post_save, sender=Task)
+def task_search_index_changed(sender, instance: Task, **kwargs):
+    update_task_search_index([instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def task_search_index_deleted(sender, instance: Task, origin=None, **kwargs):
+    if not is_deleted_with_project(origin):
+        delete_from_task_search_index([instance.pk])
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def task_tags_changed(sender, instance, action, **kwargs):
+    if (
+            isinstance(instance, Task)
+            and action in ("post_add", "post_remove", "post_clear")
+    ):
+        update_task_search_index([instance.pk])
+
+
+def get_task_tag_ids(task: Task) -> list:
+    return list(task.tags.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def task_tag_counts_changed(sender, instance, action, pk_set, **kwargs):
+    if not isinstance(instance, Task):
+        return
+    if action == "post_add":
+        add_task_tag_counts(instance.project_id, pk_set, 1)
+    elif action == "post_remove":
+        add_task_tag_counts(instance.project_id, pk_set, -1)
+    elif action == "pre_clear":
+        add_task_tag_counts(
+            instance.project_id, get_task_tag_ids(instance), -1
+        )
+
+
+@receiver(pre_save, sender=Task)
+def task_pre_save(sender, instance: Task, **kwargs):
+    instance.previous_values = None
+    if instance.pk is not None:
+        # the live fields are read only if their changes are published
+        fields = LIVE_TASK_FIELDS if is_live_enabled() else ()
+        instance.previous_values = Task.objects.filter(
+            pk=instance.pk
+        ).values("project_id", *fields).first()
+    instance.previous_project_id = (
+        instance.previous_values and instance.previous_values["project_id"]
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_tag_counts_moved(sender, instance: Task, **kwargs):
+    if instance.previous_project_id in (None, instance.project_id):
+        return
+    tag_ids = get_task_tag_ids(instance)
+    add_task_tag_counts(instance.previous_project_id, tag_ids, -1)
+    add_task_tag_counts(instance.project_id, tag_ids, 1)
+
+
+@receiver(post_save, sender=Task)
+def task_fields_published(sender, instance: Task, created, **kwargs):
+    if not created:
+        publish_task_fields(instance)
+
+
+@receiver(post_delete, sender=Task)
+def task_removal_published(sender, instance: Task, origin=None, **kwargs):
+    # the pages of a deleted project have nothing to update
+    if not is_deleted_with_project(origin):
+        publish_task_removed(instance.pk, instance.project_id)
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def task_tags_published(sender, instance, action, **kwargs):
+    if (
+            isinstance(instance, Task)
+            and action in ("post_add", "post_remove", "post_clear")
+    ):
+        # the cached task cards are keyed by the modification time,
+        # the ETags of the task lists by the one of the project
+        Task.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+        touch_project(instance.project_id)
+        publish_task_relations([instance.pk], "tags")
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def task_assignees_published(sender, instance, action, pk_set, **kwargs):
+    # tasks of a worker cleared from the reverse side are unknown
+    # after the clear, so they are not published
+    if action in ("post_add", "post_remove", "post_clear"):
+        if isinstance(instance, Task):
+            publish_task_relations([instance.pk], "assignees")
+        elif action != "post_clear":
+            publish_task_relations(pk_set, "assignees")
+
+
+@receiver(pre_delete, sender=Task)
+def task_tag_counts_deleted(sender, instance: Task, origin=None, **kwargs):
+    if not is_deleted_with_project(origin):
+        add_task_tag_counts(
+            instance.project_id, get_task_tag_ids(instance), -1
         )
 
 
+@receiver(pre_delete, sender=Project)
+def project_tasks_deleted(sender, instance: Project, origin=None, **kwargs):
+    """
+    Removes the tasks of the deleted project from the search index
+    and its tag counts from the team by one query each,
+    instead of the handlers of every task
+    """
+    delete_from_task_search_index(
+        Task.objects.filter(project=instance).values_list("id", flat=True)
+    )
+    # the counters of a deleted team are deleted with it
+    if get_origin_model(origin) is not Team:
+        remove_project_tag_counts(instance.pk, instance.working_team_id)
+
+
+def get_tagged_task_ids(tag: Tag) -> list:
+    return list(
+        Task.objects.filter(tags=tag).values_list("id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Tag)
+def tag_renamed(sender, instance: Tag, created, **kwargs):
+    if not created:
+        update_task_search_index(get_tagged_task_ids(instance))
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_pre_delete(sender, instance: Tag, **kwargs):
+    instance.tagged_task_ids = get_tagged_task_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+def tag_post_delete(sender, instance: Tag, **kwargs):
+    update_task_search_index(instance.tagged_task_ids)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance: Project, **kwargs):
+    Team.objects.filter(pk=instance.working_team_id).update(
+        updated_at=timezone.now()
+    )
+
+
 @receiver(post_save, sender=Task)
 @on_transaction_commit
 def task_created(sender, instance: Task, created, **kwargs):
@@ -108,11 +575,12 @@ def task_review_requested_handler(sender, instance: Task, **kwargs):
             name="task_review_requested",
             message_template="Review requested for the task \"{task.name}\""
         )
-    Notification.objects.create(
+    notification = Notification.objects.create(
         user=instance.requester,
         notification_type=notification_type,
         task=instance
     )
+    publish_notification(notification.user_id, notification)
 
 
 @receiver(task_completed, sender=Task)
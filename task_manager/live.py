@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils.formats import date_format
+
+from task_manager.board import get_task_status
+from task_manager.broker import get_broker, project_channel
+from task_manager.models import Task
+
+# fields shown by the task cards, their changes are pushed to the pages
+# of the project
+LIVE_TASK_FIELDS = (
+    "name",
+    "deadline",
+    "priority",
+    "is_completed",
+    "task_type_id",
+)
+
+
+def is_live_enabled() -> bool:
+    return settings.TASK_UPDATES_STREAM_ENABLED
+
+
+def get_field_value(task: Task, field: str):
+    """
+    :returns: value of the field as it is read from the database,
+    e.g. a date of a deadline assigned as a datetime
+    """
+    return Task._meta.get_field(field).to_python(getattr(task, field))
+
+
+def get_changed_fields(task: Task) -> list:
+    """
+    :returns: names of the live fields changed since the values
+    read before the task was saved
+    """
+    previous_values = getattr(task, "previous_values", None)
+    if not previous_values:
+        return []
+    return [
+        field for field in LIVE_TASK_FIELDS
+        if previous_values[field] != get_field_value(task, field)
+    ]
+
+
+def get_field_values(task: Task, fields) -> dict:
+    """
+    :returns: {field: value} of the fields as the task cards show them,
+    with the status of the task if it may have changed
+    """
+    values = {}
+    for field in fields:
+        if field == "deadline":
+            values["deadline"] = date_format(
+                get_field_value(task, "deadline")
+            )
+        elif field == "priority":
+            values["priority"] = task.get_priority_display()
+        elif field == "task_type_id":
+            values["task_type"] = str(task.task_type)
+        else:
+            values[field] = getattr(task, field)
+    if {"deadline", "is_completed"} & set(fields):
+        values["status"] = get_task_status(
+            task.is_completed, get_field_value(task, "deadline")
+        )
+    return values
+
+
+def publish_task_change(project_id: int, message: dict) -> None:
+    if not is_live_enabled():
+        return
+    get_broker().publish_on_commit(project_channel(project_id), message)
+
+
+def publish_task_removed(task_id: int, project_id: int) -> None:
+    publish_task_change(project_id, {"id": task_id, "removed": True})
+
+
+def publish_task_fields(task: Task) -> None:
+    """
+    Publishes the changed live fields of the saved task to its project.
+    A task moved to another project is removed from the pages
+    of the previous one
+    """
+    if not is_live_enabled():
+        return
+    previous_project_id = task.previous_values and (
+        task.previous_values["project_id"]
+    )
+    if previous_project_id not in (None, task.project_id):
+        publish_task_removed(task.pk, previous_project_id)
+    fields = get_changed_fields(task)
+    if fields:
+        publish_task_change(task.project_id, {
+            "id": task.pk,
+            "version": task.updated_at.isoformat(),
+            "fields": get_field_values(task, fields),
+        })
+
+
+def publish_task_relations(task_ids, relation: str) -> None:
+    """
+    Publishes the current tags or assignees of the tasks,
+    reading them by one query for all tasks
+    """
+    task_ids = list(task_ids)
+    if not task_ids or not is_live_enabled():
+        return
+    names = defaultdict(list)
+    if relation == "tags":
+        rows = Task.tags.through.objects.filter(
+            content_type=ContentType.objects.get_for_model(Task),
+            object_id__in=task_ids
+        ).order_by("tag__name").values_list("object_id", "tag__name")
+    else:
+        rows = (
+            (task_id, f"{first_name} {last_name}")
+            for task_id, first_name, last_name
+            in Task.assignees.through.objects.filter(
+                task_id__in=task_ids
+            ).order_by(
+                "worker__position__name",
+                "worker__first_name",
+                "worker__last_name"
+            ).values_list(
+                "task_id", "worker__first_name", "worker__last_name"
+            )
+        )
+    for task_id, name in rows:
+        names[task_id].append(name)
+    for task_id, project_id, updated_at in Task.objects.filter(
+            pk__in=task_ids
+    ).values_list("id", "project_id", "updated_at"):
+        publish_task_change(project_id, {
+            "id": task_id,
+            "version": updated_at.isoformat(),
+            "fields": {relation: names[task_id]},
+        })
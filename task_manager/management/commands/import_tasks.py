@@ -0,0 +1,57 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.batch import TaskBatchError, save_task_batch
+from task_manager.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates and updates tasks of a project from a JSON file, "
+        "e.g. a backlog exported from another tool. The file contains "
+        "a list of tasks in the format of the task batch API, "
+        "which are saved in one transaction"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("team", help="Slug of the team")
+        parser.add_argument("project", help="Slug of the project")
+        parser.add_argument("path", help="JSON file, - to read stdin")
+        parser.add_argument(
+            "--requester",
+            required=True,
+            help="Username of the requester of the created tasks",
+        )
+
+    def handle(self, *args, **options):
+        project = Project.objects.select_related("working_team").filter(
+            slug=options["project"], working_team__slug=options["team"]
+        ).first()
+        if project is None:
+            raise CommandError("The project isn't found in the team")
+        requester = get_user_model().objects.filter(
+            username=options["requester"]
+        ).first()
+        if requester is None:
+            raise CommandError("The requester isn't found")
+        try:
+            if options["path"] == "-":
+                items = json.load(sys.stdin)
+            else:
+                with open(options["path"], encoding="utf-8") as file:
+                    items = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Can't read the tasks: {error}")
+        try:
+            task_ids = save_task_batch(project, requester, items)
+        except TaskBatchError as error:
+            for index, errors in sorted(error.errors.items()):
+                for field, messages in errors.items():
+                    self.stderr.write(
+                        f"Task {index}, {field}: {' '.join(messages)}"
+                    )
+            raise CommandError(f"{error}, no tasks saved")
+        self.stdout.write(f"{len(task_ids)} tasks saved")
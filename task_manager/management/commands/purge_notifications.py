@@ -0,0 +1,86 @@
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from task_manager.retention import (
+    get_retention_policy,
+    get_expired_notifications,
+    get_expired_notification_events,
+    purge_in_batches,
+    open_archive,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired notifications according to "
+        "the NOTIFICATION_RETENTION policy"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--read-days",
+            type=int,
+            help="Delete read notifications older than this number of days",
+        )
+        parser.add_argument(
+            "--completed-task-days",
+            type=int,
+            help=(
+                "Delete notifications about completed tasks "
+                "older than this number of days"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of rows deleted in one transaction",
+        )
+        parser.add_argument(
+            "--archive",
+            metavar="PATH",
+            help="Append deleted rows to the gzip-compressed JSONL file",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count expired notifications",
+        )
+
+    def handle(self, *args, **options):
+        policy = get_retention_policy(
+            READ_DAYS=options["read_days"],
+            COMPLETED_TASK_DAYS=options["completed_task_days"],
+            BATCH_SIZE=options["batch_size"],
+        )
+        querysets = (
+            get_expired_notifications(policy),
+            get_expired_notification_events(policy),
+        )
+        if options["dry_run"]:
+            for queryset in querysets:
+                self.stdout.write(
+                    f"{queryset.model.__name__}: "
+                    f"{queryset.count()} expired rows"
+                )
+            return
+        archive_path = options["archive"]
+        with (
+            open_archive(archive_path) if archive_path else nullcontext()
+        ) as archive_file:
+            for queryset in querysets:
+                deleted = purge_in_batches(
+                    queryset,
+                    policy["BATCH_SIZE"],
+                    archive_file=archive_file,
+                    pause=options["pause"],
+                )
+                self.stdout.write(
+                    f"{queryset.model.__name__}: {deleted} rows deleted"
+                )
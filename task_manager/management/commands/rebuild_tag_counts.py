@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.tags import rebuild_tag_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the per-project and per-team tag counters from scratch. "
+        "The counters are maintained on tag changes, so this is only "
+        "needed after bulk updates which bypass model signals"
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_tag_counts()
+        self.stdout.write(f"{count} tag counters rebuilt")
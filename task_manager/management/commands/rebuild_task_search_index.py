@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.search import rebuild_task_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the full-text task search index from scratch. "
+        "The index is maintained on task and tag changes, so this is only "
+        "needed after bulk updates which bypass model signals"
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_task_search_index()
+        self.stdout.write(f"{count} tasks indexed")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.stats import refresh_site_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts teams, projects and workers shown on the landing page. "
+        "Should be run periodically, e.g. by cron, "
+        "so that the landing page never counts them itself"
+    )
+
+    def handle(self, *args, **options):
+        stats = refresh_site_stats()
+        self.stdout.write(
+            f"{stats['teams_count']} teams, "
+            f"{stats['projects_count']} projects, "
+            f"{stats['workers_count']} workers"
+        )
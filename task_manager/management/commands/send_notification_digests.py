@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.digests import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends e-mail digests of new notifications to the users "
+        "whose digest is due. Should be run periodically, e.g. by cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of users processed together",
+        )
+        parser.add_argument(
+            "--max-messages",
+            type=int,
+            help="Maximum number of messages sent by one run",
+        )
+        parser.add_argument(
+            "--messages-per-second",
+            type=float,
+            help="Sending rate limit",
+        )
+
+    def handle(self, *args, **options):
+        sent = send_digests(
+            BATCH_SIZE=options["batch_size"],
+            MAX_MESSAGES_PER_RUN=options["max_messages"],
+            MESSAGES_PER_SECOND=options["messages_per_second"],
+        )
+        self.stdout.write(f"{sent} digests sent")
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from task_manager.autocomplete import team_members_version
+from task_manager.caching import versioned_key
+from task_manager.models import Team, Worker
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def user_teams_version(user_id: int) -> str:
+    return f"user-teams:{user_id}"
+
+
+def get_team_roster(team_id: int) -> dict:
+    """
+    Returns cached ids and labels of the team members and founder.
+    The roster is invalidated by membership and founder changes
+    and by changes of the workers' names and positions
+    :returns: {"founder_id": id, "members": [(id, label), ...],
+    "founder_choices": [(id, label), ...]}
+    """
+    key = versioned_key(
+        (team_members_version(team_id),), "team-roster", team_id
+    )
+    roster = cache.get(key)
+    if roster is None:
+        founder_id = Team.objects.filter(pk=team_id).values_list(
+            "founder_id", flat=True
+        ).first()
+        member_ids = Team.members.through.objects.filter(
+            team_id=team_id
+        ).values("worker_id")
+        workers = Worker.objects.filter(
+            Q(pk__in=member_ids) | Q(pk=founder_id)
+        ).select_related("position").annotate(
+            is_member=ExpressionWrapper(
+                Q(pk__in=member_ids), output_field=BooleanField()
+            )
+        )
+        roster = {
+            "founder_id": founder_id,
+            "members": [],
+            "founder_choices": [],
+        }
+        for worker in workers:
+            choice = (worker.id, str(worker))
+            if worker.is_member:
+                roster["members"].append(choice)
+            roster["founder_choices"].append(choice)
+        cache.set(key, roster, CACHE_TIMEOUT)
+    return roster
+
+
+def get_user_team_ids(user_id: int) -> dict:
+    """
+    Returns cached ids of the teams the user is a member or the founder of.
+    The sets are invalidated by membership and founder changes
+    :returns: {"member": {team_id, ...}, "founded": {team_id, ...}}
+    """
+    if user_id is None:
+        return {"member": set(), "founded": set()}
+    key = versioned_key((user_teams_version(user_id),), "user-teams", user_id)
+    team_ids = cache.get(key)
+    if team_ids is None:
+        team_ids = {
+            "member": set(
+                Team.members.through.objects.filter(
+                    worker_id=user_id
+                ).values_list("team_id", flat=True)
+            ),
+            "founded": set(
+                Team.objects.filter(founder_id=user_id).values_list(
+                    "id", flat=True
+                )
+            ),
+        }
+        cache.set(key, team_ids, CACHE_TIMEOUT)
+    return team_ids
+
+
+def get_accessible_team_ids(user_id: int) -> set:
+    team_ids = get_user_team_ids(user_id)
+    return team_ids["member"] | team_ids["founded"]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.5 on 2026-10-19 10:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_notification_team_and_project(apps, schema_editor):
+    Notification = apps.get_model("task_manager", "Notification")
+    Task = apps.get_model("task_manager", "Task")
+    task_queryset = Task.objects.filter(pk=OuterRef("task_id"))
+    Notification.objects.update(
+        project_id=Subquery(task_queryset.values("project_id")[:1]),
+        team_id=Subquery(
+            task_queryset.values("project__working_team_id")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0004_alter_task_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="project",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="task_manager.project",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="team",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="task_manager.team",
+            ),
+        ),
+        migrations.RunPython(
+            fill_notification_team_and_project,
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="project",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="task_manager.project",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="team",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="task_manager.team",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "team", "is_read", "sent_at"],
+                name="notification_user_team_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "project", "is_read", "sent_at"],
+                name="notification_user_project_idx",
+            ),
+        ),
+    ]
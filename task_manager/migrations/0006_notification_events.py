@@ -0,0 +1,104 @@
+# Generated by Django 4.2.5 on 2026-10-19 15:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0005_notification_team_project"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationtype",
+            name="delivery",
+            field=models.CharField(
+                choices=[("per_user", "Per user"), ("broadcast", "Broadcast")],
+                default="per_user",
+                max_length=15,
+            ),
+        ),
+        migrations.CreateModel(
+            name="NotificationReadState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("read_until", models.PositiveBigIntegerField(default=0)),
+                ("read_event_ids", models.JSONField(blank=True, default=list)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_read_state",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="NotificationEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sent_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "notification_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="task_manager.notificationtype",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_events",
+                        to="task_manager.project",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_events",
+                        to="task_manager.task",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_events",
+                        to="task_manager.team",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-sent_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["task", "sent_at"], name="notification_event_task_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.5 on 2026-10-19 15:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0006_notification_events"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationEmailPreference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[
+                            ("never", "Never"),
+                            ("hourly", "Hourly"),
+                            ("daily", "Daily"),
+                        ],
+                        default="never",
+                        max_length=15,
+                    ),
+                ),
+                ("last_sent_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_email_preference",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["frequency", "last_sent_at"],
+                        name="email_preference_due_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.5 on 2026-10-19 15:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_worker_search_tokens(apps, schema_editor):
+    Worker = apps.get_model("task_manager", "Worker")
+    WorkerSearchToken = apps.get_model("task_manager", "WorkerSearchToken")
+    tokens = []
+    for worker_id, *fields in Worker.objects.values_list(
+        "id", "first_name", "last_name", "username", "position__name"
+    ):
+        words = {word[:150] for word in " ".join(filter(None, fields)).lower().split()}
+        tokens += [WorkerSearchToken(worker_id=worker_id, token=word) for word in words]
+    WorkerSearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0007_notification_email_preference"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkerSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=150)),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="workersearchtoken",
+            constraint=models.UniqueConstraint(
+                fields=("token", "worker"), name="unique_worker_search_token"
+            ),
+        ),
+        migrations.RunPython(
+            fill_worker_search_tokens,
+            migrations.RunPython.noop,
+        ),
+    ]
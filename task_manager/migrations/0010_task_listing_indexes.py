@@ -0,0 +1,59 @@
+# Generated by Django 4.2.5 on 2026-10-19 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0009_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "requester", "is_completed", "-priority", "name"],
+                name="task_requester_priority_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=[
+                    "project",
+                    "requester",
+                    "is_completed",
+                    "deadline",
+                    "-priority",
+                ],
+                name="task_requester_deadline_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "requester", "name"], name="task_requester_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "is_completed", "-priority", "name"],
+                name="task_project_priority_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "is_completed", "deadline", "-priority"],
+                name="task_project_deadline_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "name"], name="task_project_name_idx"
+            ),
+        ),
+    ]
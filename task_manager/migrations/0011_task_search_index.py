@@ -0,0 +1,91 @@
+from django.db import migrations
+from django.utils.html import strip_tags
+
+SQLITE_TABLE = "task_manager_task_fts"
+POSTGRES_TABLE = "task_manager_task_search"
+
+
+def get_task_documents(apps):
+    Task = apps.get_model("task_manager", "Task")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    tags = {}
+    content_type = ContentType.objects.filter(
+        app_label="task_manager", model="task"
+    ).first()
+    if content_type is not None:
+        for task_id, tag in TaggedItem.objects.filter(
+            content_type=content_type
+        ).values_list("object_id", "tag__name"):
+            tags.setdefault(task_id, []).append(tag)
+    return [
+        (task_id, team_id, name, strip_tags(description), " ".join(tags.get(task_id, [])))
+        for task_id, team_id, name, description in Task.objects.values_list(
+            "id", "project__working_team_id", "name", "description"
+        )
+    ]
+
+
+def create_task_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE {POSTGRES_TABLE} ("
+            "task_id bigint PRIMARY KEY "
+            "REFERENCES task_manager_task (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, "
+            "team_id bigint NOT NULL, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {POSTGRES_TABLE}_document_idx "
+            f"ON {POSTGRES_TABLE} USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {POSTGRES_TABLE}_team_idx ON {POSTGRES_TABLE} (team_id)"
+        )
+        sql = (
+            f"INSERT INTO {POSTGRES_TABLE} (task_id, team_id, document) "
+            "VALUES (%s, %s, "
+            "setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'C') || "
+            "setweight(to_tsvector('simple', %s), 'B'))"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5("
+            "name, description, tags, scope, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        sql = (
+            f"INSERT INTO {SQLITE_TABLE} (rowid, scope, name, description, tags) "
+            "VALUES (%s, 'team' || %s, %s, %s, %s)"
+        )
+    else:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(sql, get_task_documents(apps))
+
+
+def drop_task_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP TABLE {POSTGRES_TABLE}")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE {SQLITE_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("taggit", "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx"),
+        ("task_manager", "0010_task_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_task_search_index,
+            drop_task_search_index,
+        ),
+    ]
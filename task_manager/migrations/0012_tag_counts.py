@@ -0,0 +1,146 @@
+# Generated by Django 4.2.5 on 2026-10-19 16:27
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_tag_counts(apps, schema_editor):
+    Task = apps.get_model("task_manager", "Task")
+    ProjectTagCount = apps.get_model("task_manager", "ProjectTagCount")
+    TeamTagCount = apps.get_model("task_manager", "TeamTagCount")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    content_type = ContentType.objects.filter(app_label="task_manager", model="task").first()
+    if content_type is None:
+        return
+    tagged_tasks = TaggedItem.objects.filter(content_type=content_type).annotate(
+        project_id=Subquery(Task.objects.filter(pk=OuterRef("object_id")).values("project_id")),
+        team_id=Subquery(
+            Task.objects.filter(pk=OuterRef("object_id")).values("project__working_team_id")
+        ),
+    ).filter(project_id__isnull=False).order_by()
+    ProjectTagCount.objects.bulk_create(
+        (
+            ProjectTagCount(project_id=project_id, tag_id=tag_id, tasks_count=count)
+            for project_id, tag_id, count in tagged_tasks.values_list(
+                "project_id", "tag_id"
+            ).annotate(count=models.Count("id"))
+        ),
+        batch_size=1000,
+    )
+    TeamTagCount.objects.bulk_create(
+        (
+            TeamTagCount(team_id=team_id, tag_id=tag_id, tasks_count=count)
+            for team_id, tag_id, count in tagged_tasks.values_list(
+                "team_id", "tag_id"
+            ).annotate(count=models.Count("id"))
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+        ("task_manager", "0011_task_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectTagCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tasks_count", models.IntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_counts",
+                        to="task_manager.project",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="taggit.tag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TeamTagCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tasks_count", models.IntegerField(default=0)),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="taggit.tag",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_counts",
+                        to="task_manager.team",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["team", "-tasks_count"], name="team_tag_count_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="teamtagcount",
+            constraint=models.UniqueConstraint(
+                fields=("team", "tag"), name="unique_team_tag_count"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projecttagcount",
+            index=models.Index(
+                fields=["project", "-tasks_count"], name="project_tag_count_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="projecttagcount",
+            constraint=models.UniqueConstraint(
+                fields=("project", "tag"), name="unique_project_tag_count"
+            ),
+        ),
+        migrations.RunPython(
+            fill_tag_counts,
+            migrations.RunPython.noop,
+        ),
+    ]
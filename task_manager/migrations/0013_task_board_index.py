@@ -0,0 +1,20 @@
+# Generated by Django 4.2.5 on 2026-10-19 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0012_tag_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "is_completed", "priority", "deadline"],
+                name="task_project_board_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.5 on 2026-10-19 17:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0013_task_board_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="project",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="task_manager.project",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.5 on 2026-10-19 17:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_recipients(apps, schema_editor):
+    # the audience of the past events isn't known,
+    # the current assignees of their tasks are the closest guess
+    NotificationEvent = apps.get_model("task_manager", "NotificationEvent")
+    TaskAssignee = apps.get_model("task_manager", "Task").assignees.through
+    Recipient = NotificationEvent.recipients.through
+    for event_id, task_id in NotificationEvent.objects.values_list(
+            "id", "task_id"
+    ).iterator():
+        Recipient.objects.bulk_create(
+            Recipient(notificationevent_id=event_id, worker_id=worker_id)
+            for worker_id in TaskAssignee.objects.filter(
+                task_id=task_id
+            ).values_list("worker_id", flat=True)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0014_task_project_fk_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationevent",
+            name="recipients",
+            field=models.ManyToManyField(
+                editable=False,
+                related_name="notification_events",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(
+            fill_recipients,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.5 on 2026-10-19 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0015_notification_event_recipients"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="workersearchtoken",
+            index=models.Index(
+                fields=["token"],
+                name="worker_search_token_prefix",
+                opclasses=["text_pattern_ops"],
+            ),
+        ),
+    ]
@@ -1,9 +1,46 @@
+import hashlib
 from abc import abstractmethod
+from itertools import chain
+from operator import attrgetter
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.core.paginator import PageNotAnInteger, EmptyPage
+from django.http import HttpResponse, Http404
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+    quote_etag,
+)
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
 
-from task_manager.models import Project
+from task_manager.autocomplete import team_members_version
+from task_manager.board import BOARD_ORDERINGS, get_board_columns
+from task_manager.caching import (
+    get_versions,
+    versioned_key,
+    notifications_version,
+)
+from task_manager.memberships import (
+    get_accessible_team_ids,
+    user_teams_version,
+)
+from task_manager.models import (
+    Project,
+    Task,
+    NotificationEvent,
+    NotificationReadState
+)
+from task_manager.forms import MemberTasksFilterForm
+from task_manager.pagination import CountedPaginator, get_keyset_page
+from task_manager.tags import get_project_tag_counts
 
 
 class FounderLoginRequiredMixin(LoginRequiredMixin):
@@ -26,13 +63,15 @@ class MemberOrFounderLoginRequiredMixin(LoginRequiredMixin):
         pass
 
     def dispatch(self, request, *args, **kwargs):
-        response = super().dispatch(request, *args, **kwargs)
+        # checked before the view handles the request, so that a POST
+        # of a user without access doesn't change anything
         if (
-                request.user not in self.get_team().members.all()
-                and request.user != self.get_team().founder
+                request.user.is_authenticated
+                and self.get_team().id
+                not in get_accessible_team_ids(request.user.id)
         ):
             return self.handle_no_permission()
-        return response
+        return super().dispatch(request, *args, **kwargs)
 
 
 class TaskRequesterLoginRequiredMixin(LoginRequiredMixin):
@@ -49,32 +88,193 @@ class TaskRequesterLoginRequiredMixin(LoginRequiredMixin):
         return response
 
 
+class AnonymousPageCacheMixin:
+    """
+    Caches pages rendered for anonymous users under the versions
+    returned by get_page_cache_versions() and answers them with ETag
+    and public Cache-Control headers, so that they may be cached
+    by a reverse proxy or CDN as well
+    """
+
+    page_cache_timeout = 60 * 10
+    # lifetime of the page in shared caches, which aren't invalidated
+    page_cache_max_age = 60
+
+    def get_page_cache_versions(self) -> tuple:
+        return ()
+
+    def get_page_cache_key(self) -> str:
+        path_hash = hashlib.md5(self.request.path.encode()).hexdigest()
+        return versioned_key(
+            self.get_page_cache_versions(), "anonymous-page", path_hash
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+                request.method not in ("GET", "HEAD")
+                or request.user.is_authenticated
+        ):
+            response = super().dispatch(request, *args, **kwargs)
+            patch_vary_headers(response, ("Cookie",))
+            return response
+        key = self.get_page_cache_key()
+        page = cache.get(key)
+        if page is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if hasattr(response, "render"):
+                response.render()
+            page = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "etag": quote_etag(
+                    hashlib.md5(response.content).hexdigest()
+                ),
+            }
+            cache.set(key, page, self.page_cache_timeout)
+        else:
+            response = None
+        not_modified = get_conditional_response(request, etag=page["etag"])
+        if not_modified is not None:
+            response = not_modified
+        elif response is None:
+            response = HttpResponse(
+                page["content"], content_type=page["content_type"]
+            )
+        response["ETag"] = page["etag"]
+        patch_cache_control(
+            response, public=True, max_age=self.page_cache_max_age
+        )
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+
+class ConditionalPageMixin:
+    """
+    Answers GET requests of authenticated users with 304
+    if the page didn't change. The ETag is built from the modification time
+    of the page objects, loaded with a single indexed lookup, and
+    from the versions of the user's notifications and teams
+    and of the members of the teams, which are kept in the cache.
+    Must follow the permission mixins, so that 304 isn't returned
+    to the users who lost access to the page
+    """
+
+    @abstractmethod
+    def get_updated_at(self):
+        """
+        :returns: modification time of the page objects or None
+        """
+
+    def get_page_etag(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return None
+        updated_at = self.get_updated_at()
+        if updated_at is None:
+            return None
+        user_id = request.user.id
+        versions = get_versions(
+            notifications_version(user_id),
+            user_teams_version(user_id),
+            # the workers shown on the pages are members of these teams
+            *map(team_members_version, sorted(
+                get_accessible_team_ids(user_id)
+            )),
+        )
+        validator = ":".join(map(str, (
+            self.__class__.__name__,
+            user_id,
+            updated_at.isoformat(),
+            # overdue tasks depend on the current date
+            timezone.localdate(),
+            *versions,
+        )))
+        return hashlib.md5(validator.encode()).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = condition(etag_func=self.get_page_etag)(super().dispatch)
+        return dispatch(request, *args, **kwargs)
+
+
 class NotificationContextMixin:
+    def get_notification_filters(self) -> dict:
+        return {}
+
     def get_notifications(self):
         return self.request.user.notifications.select_related(
             "notification_type",
             "task__project__working_team",
             "task__requester"
-        ).filter(is_read=False)
+        ).filter(is_read=False, **self.get_notification_filters())
+
+    def get_notification_events(self):
+        read_state = NotificationReadState.for_user(self.request.user)
+        return NotificationEvent.objects.for_user(
+            self.request.user
+        ).unread(read_state).select_related(
+            "notification_type",
+            "task__project__working_team",
+            "task__requester"
+        ).filter(**self.get_notification_filters())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
-            notifications = self.get_notifications().all()
+            notifications = sorted(
+                chain(
+                    self.get_notifications(),
+                    self.get_notification_events()
+                ),
+                key=attrgetter("sent_at"),
+                reverse=True
+            )
             context["notifications"] = notifications
+            if settings.NOTIFICATION_STREAM_ENABLED:
+                context["notification_stream_url"] = reverse(
+                    "task_manager:notification-stream"
+                )
+        return context
+
+
+class TaskUpdatesContextMixin:
+    """
+    Adds the url of the stream of the project task changes,
+    which the page patches its task cards with
+    """
+
+    def get_updates_project(self) -> Project:
+        return self.get_project()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if settings.TASK_UPDATES_STREAM_ENABLED:
+            project = self.get_updates_project()
+            context["task_updates_url"] = reverse(
+                "task_manager:task-updates-stream",
+                kwargs={
+                    "team_slug": project.working_team.slug,
+                    "project_slug": project.slug,
+                }
+            )
         return context
 
 
 class TeamGetObjectMixin:
     object = None
 
+    def get_team_queryset(self):
+        return self.model.objects.select_related(
+            "founder"
+        ).prefetch_related(
+            "members", "projects"
+        )
+
     def get_object(self, queryset=None):
         if not self.object:
-            self.object = self.model.objects.select_related(
-                "founder"
-            ).prefetch_related(
-                "members", "projects"
-            ).get(slug=self.kwargs.get("team_slug"))
+            self.object = self.get_team_queryset().get(
+                slug=self.kwargs.get("team_slug")
+            )
         return self.object
 
 
@@ -114,3 +314,152 @@ class TaskGetObjectMixin:
                 "requester"
             ).get(id=task_id)
         return self.object
+
+
+class ProjectMemberTasksMixin:
+    """
+    Lists the project tasks assigned to or requested by the member
+    on the tabs of the member tasks page
+    """
+    model = get_user_model()
+    slug_field = "username"
+    slug_url_kwarg = "user_slug"
+    tasks_per_page = 12
+    # tab names with the prefixes of their query parameters
+    task_tabs = {"assigned": "at", "requested": "rt"}
+    object = None
+    task_counts = None
+    filter_form = None
+
+    def get_team(self):
+        return self.get_project().working_team
+
+    def get_object(self, queryset=None):
+        if not self.object:
+            user_username = self.kwargs.get("user_slug")
+            self.object = get_object_or_404(
+                self.get_project().working_team.members.select_related(
+                    "position"
+                ),
+                username=user_username
+            )
+        return self.object
+
+    def get_filter_form(self) -> MemberTasksFilterForm:
+        if self.filter_form is None:
+            project_id = self.get_project().id
+            self.filter_form = MemberTasksFilterForm(self.request.GET)
+            self.filter_form.set_tag_choices(
+                lambda: get_project_tag_counts(project_id)
+            )
+        return self.filter_form
+
+    def get_task_counts(self) -> dict:
+        if self.task_counts is None:
+            self.task_counts = self.get_filter_form().filter_tasks(
+                Task.objects.all()
+            ).member_counts(self.get_object().id, self.get_project().id)
+        return self.task_counts
+
+    def get_tab_tasks(self, tab: str):
+        member_id, project_id = self.get_object().id, self.get_project().id
+        tasks = (
+            Task.objects.assigned_in_project(member_id, project_id)
+            if tab == "assigned"
+            else Task.objects.requested_in_project(member_id, project_id)
+        )
+        return self.get_filter_form().filter_tasks(tasks).for_listing()
+
+    def get_tasks_paginator(self, queryset, page, count: int):
+        paginator = CountedPaginator(
+            queryset.order_by(*self.get_filter_form().get_ordering()),
+            self.tasks_per_page,
+            count
+        )
+        try:
+            paginator_page = paginator.page(page)
+        except PageNotAnInteger:
+            paginator_page = paginator.page(1)
+        except EmptyPage:
+            paginator_page = paginator.page(paginator.num_pages)
+
+        return paginator_page
+
+    def get_tab_page(self, tab: str):
+        """
+        Returns the numbered page if a page number is requested,
+        otherwise the keyset page following the requested cursor
+        """
+        prefix = self.task_tabs[tab]
+        tasks = self.get_tab_tasks(tab)
+        page = self.request.GET.get(f"{prefix}_page")
+        if page is not None:
+            return self.get_tasks_paginator(
+                tasks, page, self.get_task_counts()[tab]
+            )
+        return get_keyset_page(
+            tasks,
+            self.tasks_per_page,
+            self.request.GET.get(f"{prefix}_cursor"),
+            self.get_filter_form().get_ordering()
+        )
+
+    def get_tab_context(self, tab: str) -> dict:
+        project = self.get_project()
+        return {
+            "project": project,
+            "tab": tab,
+            "tasks_page": self.get_tab_page(tab),
+            "cursor_param": f"{self.task_tabs[tab]}_cursor",
+            "filter_form": self.get_filter_form(),
+            "filter_query": urlencode(self.get_filter_form().get_query()),
+            "page_url": reverse(
+                "task_manager:project-member-tasks",
+                kwargs={
+                    "team_slug": project.working_team.slug,
+                    "project_slug": project.slug,
+                    "user_slug": self.get_object().username,
+                }
+            ),
+        }
+
+
+class ProjectBoardMixin:
+    """
+    Shows the project tasks in the board columns,
+    grouped by status or priority
+    """
+    column_size = 20
+    today = None
+
+    def get_team(self):
+        return self.get_project().working_team
+
+    def get_today(self):
+        """
+        :returns: date splitting open and overdue tasks, the same
+        for the columns and the cards of the request
+        """
+        if self.today is None:
+            self.today = timezone.localdate()
+        return self.today
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["today"] = self.get_today()
+        return context
+
+    def get_grouping(self) -> str:
+        grouping = self.request.GET.get("group")
+        return grouping if grouping in BOARD_ORDERINGS else "status"
+
+    def get_tasks(self):
+        return Task.objects.filter(project=self.get_project())
+
+    def get_column_filter(self, grouping: str, column: str):
+        if grouping not in BOARD_ORDERINGS:
+            raise Http404("Unknown grouping")
+        columns = get_board_columns(grouping, self.get_today())
+        if column not in columns:
+            raise Http404("Unknown column")
+        return columns[column][1]
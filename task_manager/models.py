@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models.lookups import Exact
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 from taggit.managers import TaggableManager
+from taggit.models import Tag
 
+from task_manager.caching import bump_versions, notifications_version
 from task_manager.signals import task_completed, task_review_requested
 
 
@@ -55,6 +59,77 @@ class Worker(AbstractUser):
         return f"{self.position}: {self.first_name} {self.last_name}"
 
 
+class WorkerSearchToken(models.Model):
+    """
+    Lowercased word of a worker's name, username or position,
+    searched by prefix for the workers autocomplete
+    """
+
+    TOKEN_MAX_LENGTH = 150
+
+    worker = models.ForeignKey(
+        Worker,
+        on_delete=models.CASCADE,
+        related_name="search_tokens"
+    )
+    token = models.CharField(max_length=TOKEN_MAX_LENGTH)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["token", "worker"],
+                name="unique_worker_search_token"
+            ),
+        ]
+        indexes = [
+            # prefix searches with LIKE can use the index on PostgreSQL
+            # regardless of the database collation
+            models.Index(
+                fields=["token"],
+                name="worker_search_token_prefix",
+                opclasses=["text_pattern_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return self.token
+
+
+def count_subquery(queryset) -> models.Subquery:
+    """
+    Counts rows of the correlated queryset in a subquery,
+    which doesn't multiply rows of the outer query as joins do
+    """
+    return models.Subquery(
+        queryset.order_by().annotate(
+            count=models.Func(models.F("pk"), function="COUNT")
+        ).values("count"),
+        output_field=models.IntegerField()
+    )
+
+
+class TeamQuerySet(models.QuerySet):
+    def with_summary(self):
+        tasks = Task.objects.filter(
+            project__working_team=models.OuterRef("pk"),
+            is_completed=False
+        )
+        return self.annotate(
+            project_count=count_subquery(
+                Project.objects.filter(working_team=models.OuterRef("pk"))
+            ),
+            member_count=count_subquery(
+                Team.members.through.objects.filter(
+                    team_id=models.OuterRef("pk")
+                )
+            ),
+            open_task_count=count_subquery(tasks),
+            overdue_task_count=count_subquery(
+                tasks.filter(deadline__lt=timezone.localdate())
+            ),
+        )
+
+
 class Team(models.Model):
     name = models.CharField(max_length=255, unique=True)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
@@ -65,6 +140,10 @@ class Team(models.Model):
         related_name="founded_teams"
     )
     members = models.ManyToManyField(get_user_model(), related_name="teams")
+    # also updated by changes of the members, projects and tasks
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TeamQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
@@ -95,6 +174,20 @@ class Team(models.Model):
         return self.name
 
 
+class ProjectQuerySet(models.QuerySet):
+    def with_task_counts(self):
+        tasks = Task.objects.filter(
+            project=models.OuterRef("pk"),
+            is_completed=False
+        )
+        return self.annotate(
+            open_task_count=count_subquery(tasks),
+            overdue_task_count=count_subquery(
+                tasks.filter(deadline__lt=timezone.localdate())
+            ),
+        )
+
+
 class Project(models.Model):
     name = models.CharField(max_length=255, unique=True)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
@@ -104,6 +197,10 @@ class Project(models.Model):
         on_delete=models.CASCADE,
         related_name="projects"
     )
+    # also updated by changes of the tasks
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
@@ -147,6 +244,74 @@ class TaskType(models.Model):
         return self.name
 
 
+class TaskQuerySet(models.QuerySet):
+    def for_listing(self):
+        """
+        Loads the relations rendered by the task cards
+        in a constant number of queries
+        """
+        return self.select_related(
+            "task_type", "project__working_team"
+        ).prefetch_related("tags")
+
+    def for_board(self):
+        """
+        Loads the relations rendered by the board cards
+        in a constant number of queries
+        """
+        return self.for_listing().prefetch_related("assignees")
+
+    def assigned_in_project(self, member_id: int, project_id: int):
+        """
+        Tasks of the project assigned to the member, found by the worker
+        index of the assignees. The project is compared by an expression
+        no index matches, otherwise the planner walks the project tasks
+        in the sort order of an index and probes the assignees of each
+        """
+        return self.filter(
+            Exact(
+                models.ExpressionWrapper(
+                    models.F("project_id") + 0,
+                    output_field=models.IntegerField()
+                ),
+                project_id
+            ),
+            id__in=self.model.assignees.through.objects.filter(
+                worker_id=member_id
+            ).values("task_id")
+        )
+
+    def requested_in_project(self, member_id: int, project_id: int):
+        """
+        Tasks of the project requested by the member,
+        found by the (project, requester, ...) indexes
+        """
+        return self.filter(project_id=project_id, requester_id=member_id)
+
+    def count_subquery(self) -> models.Subquery:
+        return models.Subquery(
+            self.order_by().annotate(
+                count=models.Func("id", function="COUNT")
+            ).values("count")
+        )
+
+    def member_counts(self, member_id: int, project_id: int) -> dict:
+        """
+        Counts tasks of the project assigned to and requested by the member
+        in one query of two subqueries, each seeking the member's tasks
+        by an index rather than counting over all tasks of the project
+        :returns: {"assigned": count, "requested": count}
+        """
+        return Project.objects.filter(pk=project_id).values(
+            assigned=self.assigned_in_project(
+                member_id, project_id
+            ).count_subquery(),
+            requested=self.requested_in_project(
+                member_id, project_id
+            ).count_subquery(),
+        ).get()
+
+
 class Task(models.Model):
     class Priority(models.IntegerChoices):
         CRITICAL = 6, "Critical"
@@ -170,16 +335,62 @@ class Task(models.Model):
         get_user_model(),
         related_name="assigned_tasks"
     )
-    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    # found by the composite indexes starting with the project
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, db_index=False
+    )
     requester = models.ForeignKey(
         get_user_model(),
         on_delete=models.SET_NULL,
         null=True,
         related_name="requested_tasks"
     )
+    # also updated by changes of the assignees
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         ordering = ["is_completed", "-priority", "name"]
+        # sort orders of the requested tasks of a member, of the project
+        # tasks listed by the API and of the board columns, assigned tasks
+        # are found by the worker index of the assignees
+        indexes = [
+            models.Index(
+                fields=[
+                    "project", "requester", "is_completed", "-priority", "name"
+                ],
+                name="task_requester_priority_idx",
+            ),
+            models.Index(
+                fields=[
+                    "project", "requester", "is_completed", "deadline",
+                    "-priority"
+                ],
+                name="task_requester_deadline_idx",
+            ),
+            models.Index(
+                fields=["project", "requester", "name"],
+                name="task_requester_name_idx",
+            ),
+            models.Index(
+                fields=["project", "is_completed", "-priority", "name"],
+                name="task_project_priority_idx",
+            ),
+            models.Index(
+                fields=["project", "is_completed", "deadline", "-priority"],
+                name="task_project_deadline_idx",
+            ),
+            models.Index(
+                fields=["project", "name"],
+                name="task_project_name_idx",
+            ),
+            # columns of the board grouped by priority
+            models.Index(
+                fields=["project", "is_completed", "priority", "deadline"],
+                name="task_project_board_idx",
+            ),
+        ]
 
     def get_priority_display(self):
         return self.Priority(self.priority).label
@@ -206,9 +417,80 @@ class Task(models.Model):
         return self.name
 
 
+class TagCount(models.Model):
+    """
+    Number of tasks tagged with the tag, maintained on tag changes
+    so that popular tags are listed without counting tagged items
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="+")
+    # not positive, so that a drifted counter never fails a tag change
+    tasks_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class ProjectTagCount(TagCount):
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="tag_counts"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "tag"],
+                name="unique_project_tag_count"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["project", "-tasks_count"],
+                name="project_tag_count_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} / {self.tag_id}: {self.tasks_count}"
+
+
+class TeamTagCount(TagCount):
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name="tag_counts"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "tag"],
+                name="unique_team_tag_count"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["team", "-tasks_count"],
+                name="team_tag_count_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} / {self.tag_id}: {self.tasks_count}"
+
+
 class NotificationType(models.Model):
+    class Delivery(models.TextChoices):
+        PER_USER = "per_user", "Per user"
+        BROADCAST = "broadcast", "Broadcast"
     name = models.CharField(max_length=255, unique=True)
     message_template = models.CharField(max_length=255, unique=True)
+    delivery = models.CharField(
+        max_length=15,
+        choices=Delivery.choices,
+        default=Delivery.PER_USER
+    )
 
     class Meta:
         ordering = ["name"]
@@ -228,17 +510,64 @@ class Notification(models.Model):
         on_delete=models.CASCADE
     )
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        editable=False
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        editable=False
+    )
     sent_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
     class Meta:
         ordering = ["-sent_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "team", "is_read", "sent_at"],
+                name="notification_user_team_idx"
+            ),
+            models.Index(
+                fields=["user", "project", "is_read", "sent_at"],
+                name="notification_user_project_idx"
+            ),
+        ]
+
+    def save(
+            self,
+            force_insert=False,
+            force_update=False,
+            using=None,
+            update_fields=None
+    ):
+        if not self.project_id:
+            self.project_id = self.task.project_id
+        if not self.team_id:
+            self.team_id = self.task.project.working_team_id
+        super(Notification, self).save(
+            force_insert,
+            force_update,
+            using,
+            update_fields
+        )
+
+    def get_absolute_url(self):
+        return reverse(
+            "task_manager:notification-redirect",
+            kwargs={"id": self.id}
+        )
 
     def mark_as_read(self):
         if self.is_read:
             return
         self.is_read = True
         self.save()
+        bump_versions(notifications_version(self.user_id))
 
     @property
     def message_text(self) -> str:
@@ -248,3 +577,187 @@ class Notification(models.Model):
         return (f"{self.notification_type.name}: "
                 f"{self.task.name}, "
                 f"{self.sent_at.strftime('%d.%m.%Y %H:%M:%S')}")
+
+
+class NotificationEventQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(recipients=user)
+
+    def unread(self, read_state: "NotificationReadState"):
+        return self.filter(id__gt=read_state.read_until).exclude(
+            id__in=read_state.read_event_ids
+        )
+
+
+class NotificationEvent(models.Model):
+    """
+    Single notification about a task event, shared by the task assignees
+    at the time of the event, who are recorded as its recipients.
+    Used instead of per-user Notification rows
+    for broadcast notification types
+    """
+
+    notification_type = models.ForeignKey(
+        NotificationType,
+        on_delete=models.CASCADE
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name="notification_events"
+    )
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name="notification_events",
+        editable=False
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="notification_events",
+        editable=False
+    )
+    recipients = models.ManyToManyField(
+        get_user_model(),
+        related_name="notification_events",
+        editable=False
+    )
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    objects = NotificationEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-sent_at"]
+        indexes = [
+            models.Index(
+                fields=["task", "sent_at"],
+                name="notification_event_task_idx"
+            ),
+        ]
+
+    def get_absolute_url(self):
+        return reverse(
+            "task_manager:notification-event-redirect",
+            kwargs={"id": self.id}
+        )
+
+    @property
+    def message_text(self) -> str:
+        return self.notification_type.message_template.format(task=self.task)
+
+    def __str__(self):
+        return (f"{self.notification_type.name}: "
+                f"{self.task.name}, "
+                f"{self.sent_at.strftime('%d.%m.%Y %H:%M:%S')}")
+
+
+class NotificationReadState(models.Model):
+    """
+    Per-user read watermark for NotificationEvent.
+    Events with id <= read_until are read, and so are the ids
+    in read_event_ids. Once the read-set grows over READ_SET_LIMIT,
+    the watermark is moved over the read ids which follow it without
+    an unread event of the user between them. The read-set is then
+    cut to the READ_SET_LIMIT latest ids, so events older than them
+    count as read even if they were skipped
+    """
+
+    READ_SET_LIMIT = 200
+
+    user = models.OneToOneField(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="notification_read_state"
+    )
+    read_until = models.PositiveBigIntegerField(default=0)
+    read_event_ids = models.JSONField(default=list, blank=True)
+
+    @classmethod
+    def for_user(cls, user) -> "NotificationReadState":
+        read_state = cls.objects.filter(user=user).first()
+        if read_state is None:
+            read_state = cls(user=user)
+        return read_state
+
+    def is_event_read(self, event_id: int) -> bool:
+        return (
+            event_id <= self.read_until
+            or event_id in self.read_event_ids
+        )
+
+    def compact(self):
+        """
+        Moves the watermark over the read ids following it,
+        up to the first unread event of the user,
+        and then over the read ids exceeding READ_SET_LIMIT
+        """
+        read_event_ids = set(self.read_event_ids)
+        for event_id in NotificationEvent.objects.for_user(
+                self.user_id
+        ).filter(id__gt=self.read_until).order_by("id").values_list(
+            "id", flat=True
+        )[:len(read_event_ids) + 1]:
+            if event_id not in read_event_ids:
+                break
+            self.read_until = event_id
+        self.read_event_ids = sorted(
+            event_id for event_id in read_event_ids
+            if event_id > self.read_until
+        )
+        if len(self.read_event_ids) > self.READ_SET_LIMIT:
+            self.read_until = self.read_event_ids[-self.READ_SET_LIMIT - 1]
+            self.read_event_ids = self.read_event_ids[-self.READ_SET_LIMIT:]
+
+    def mark_event_as_read(self, event_id: int):
+        if self.is_event_read(event_id):
+            return
+        with transaction.atomic():
+            # the row is locked, so that concurrent marks aren't lost
+            read_state, _ = (
+                NotificationReadState.objects.select_for_update()
+                .get_or_create(user_id=self.user_id)
+            )
+            if not read_state.is_event_read(event_id):
+                read_state.read_event_ids = sorted(
+                    read_state.read_event_ids + [event_id]
+                )
+                if len(read_state.read_event_ids) > self.READ_SET_LIMIT:
+                    read_state.compact()
+                read_state.save()
+        self.pk = read_state.pk
+        self.read_until = read_state.read_until
+        self.read_event_ids = read_state.read_event_ids
+        bump_versions(notifications_version(self.user_id))
+
+    def __str__(self):
+        return f"{self.user}: read until {self.read_until}"
+
+
+class NotificationEmailPreference(models.Model):
+    class Frequency(models.TextChoices):
+        NEVER = "never", "Never"
+        HOURLY = "hourly", "Hourly"
+        DAILY = "daily", "Daily"
+    user = models.OneToOneField(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="notification_email_preference"
+    )
+    frequency = models.CharField(
+        max_length=15,
+        choices=Frequency.choices,
+        default=Frequency.NEVER
+    )
+    last_sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["frequency", "last_sent_at"],
+                name="email_preference_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user}: {self.get_frequency_display()}"
@@ -0,0 +1,203 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# the model's ordering with the primary key making it unique
+TASK_KEYSET_ORDERING = ("is_completed", "-priority", "name", "id")
+# sort orders of task lists, each ending with the primary key
+TASK_SORT_ORDERINGS = {
+    "priority": TASK_KEYSET_ORDERING,
+    "deadline": ("is_completed", "deadline", "-priority", "id"),
+    "name": ("name", "id"),
+}
+NEXT = "next"
+PREVIOUS = "previous"
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator with the number of objects known in advance,
+    e.g. counted by one aggregate for several paginators
+    """
+
+    def __init__(self, object_list, per_page, count: int, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    Keeps microseconds of the datetimes, which DjangoJSONEncoder drops,
+    so that rows with close timestamps aren't skipped between pages
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(direction: str, ordering: tuple, values: list) -> str:
+    data = json.dumps(
+        [direction, ",".join(ordering), *values], cls=CursorEncoder
+    ).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: tuple):
+    """
+    :returns: (direction, values) or None if the cursor is malformed
+    or belongs to another ordering
+    """
+    try:
+        data = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+    except (ValueError, binascii.Error):
+        return None
+    if (
+            not isinstance(data, list)
+            or len(data) != len(ordering) + 2
+            or data[0] not in (NEXT, PREVIOUS)
+            or data[1] != ",".join(ordering)
+    ):
+        return None
+    return data[0], data[2:]
+
+
+def get_ordering_value(obj, field: str):
+    """
+    Returns the value of the ordering field, which may span relations
+    """
+    for name in field.lstrip("-").split("__"):
+        obj = getattr(obj, name)
+    return obj
+
+
+def sort_by_ordering(objects: list, ordering: tuple) -> list:
+    """
+    Sorts the objects in place as the database orders them by the fields,
+    relying on the stability of sorts for mixed directions
+    """
+    for field in reversed(ordering):
+        objects.sort(
+            key=lambda obj: get_ordering_value(obj, field),
+            reverse=field.startswith("-")
+        )
+    return objects
+
+
+def reverse_ordering(ordering: tuple) -> tuple:
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}"
+        for field in ordering
+    )
+
+
+def keyset_filter(ordering: tuple, values: list) -> Q:
+    """
+    Returns the filter of the rows following the row with the values
+    of the ordering fields
+    """
+    keyset = Q(pk__in=[])
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        keyset |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return keyset
+
+
+class KeysetPage:
+    """
+    Page navigated by the ordering values of its first and last rows,
+    without counting or skipping the preceding rows
+    """
+
+    def __init__(
+            self,
+            object_list: list,
+            has_next: bool,
+            has_previous: bool,
+            ordering: tuple
+    ):
+        self.object_list = object_list
+        self.ordering = ordering
+        self.next_cursor = (
+            self.get_cursor(NEXT, object_list[-1]) if has_next else None
+        )
+        self.previous_cursor = (
+            self.get_cursor(PREVIOUS, object_list[0]) if has_previous
+            else None
+        )
+
+    def get_cursor(self, direction: str, obj) -> str:
+        return encode_cursor(
+            direction,
+            self.ordering,
+            [get_ordering_value(obj, field) for field in self.ordering]
+        )
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+
+def get_keyset_page(
+        queryset,
+        per_page: int,
+        cursor: str = None,
+        ordering: tuple = TASK_KEYSET_ORDERING,
+        empty_when_exhausted: bool = False
+) -> KeysetPage:
+    """
+    Returns the page following or preceding the cursor row, or the first
+    page if the cursor is missing, malformed or there are no rows left.
+    Runs one query fetching a row more than the page needs
+    :param empty_when_exhausted: return an empty page instead of
+    the first one if there are no rows left, e.g. for pages appended
+    to the previous ones
+    """
+    position = decode_cursor(cursor, ordering) if cursor else None
+    direction, page_queryset = NEXT, queryset.order_by(*ordering)
+    if position is not None:
+        page_ordering = (
+            ordering if position[0] == NEXT else reverse_ordering(ordering)
+        )
+        try:
+            page_queryset = queryset.filter(
+                keyset_filter(page_ordering, position[1])
+            ).order_by(*page_ordering)
+            direction = position[0]
+        except (ValidationError, ValueError, TypeError):
+            # values of a forged cursor don't fit the fields
+            position = None
+    rows = list(page_queryset[:per_page + 1])
+    if not rows and position is not None:
+        if empty_when_exhausted:
+            return KeysetPage([], False, False, ordering)
+        return get_keyset_page(queryset, per_page, ordering=ordering)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == PREVIOUS:
+        rows.reverse()
+        return KeysetPage(rows, True, has_more, ordering)
+    return KeysetPage(rows, has_more, position is not None, ordering)
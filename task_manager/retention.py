@@ -0,0 +1,103 @@
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from task_manager.models import Notification, NotificationEvent
+
+DEFAULT_RETENTION_POLICY = {
+    # read notifications are deleted after this number of days
+    "READ_DAYS": 30,
+    # all notifications about completed tasks are deleted
+    # after this number of days
+    "COMPLETED_TASK_DAYS": 90,
+    "BATCH_SIZE": 1000,
+}
+
+
+def get_retention_policy(**overrides) -> dict:
+    policy = dict(DEFAULT_RETENTION_POLICY)
+    policy.update(getattr(settings, "NOTIFICATION_RETENTION", {}))
+    policy.update(
+        (key, value) for key, value in overrides.items() if value is not None
+    )
+    return policy
+
+
+def get_expired_notifications(policy: dict, now=None):
+    now = now or timezone.now()
+    expired = Q(pk__in=[])
+    if policy["READ_DAYS"] is not None:
+        expired |= Q(
+            is_read=True,
+            sent_at__lt=now - timedelta(days=policy["READ_DAYS"])
+        )
+    if policy["COMPLETED_TASK_DAYS"] is not None:
+        expired |= Q(
+            task__is_completed=True,
+            sent_at__lt=now - timedelta(days=policy["COMPLETED_TASK_DAYS"])
+        )
+    return Notification.objects.filter(expired)
+
+
+def get_expired_notification_events(policy: dict, now=None):
+    now = now or timezone.now()
+    if policy["COMPLETED_TASK_DAYS"] is None:
+        return NotificationEvent.objects.none()
+    return NotificationEvent.objects.filter(
+        task__is_completed=True,
+        sent_at__lt=now - timedelta(days=policy["COMPLETED_TASK_DAYS"])
+    )
+
+
+def purge_in_batches(
+        queryset,
+        batch_size: int,
+        archive_file=None,
+        pause: float = 0
+) -> int:
+    """
+    Deletes rows of the queryset in primary key order,
+    one short transaction per batch.
+    The expiration condition is checked again inside each transaction,
+    so rows changed by live traffic in the meantime are kept.
+    :returns: number of deleted rows
+    """
+    model = queryset.model
+    last_pk = 0
+    deleted = 0
+    while True:
+        batch_pks = list(
+            queryset.filter(pk__gt=last_pk).order_by("pk").values_list(
+                "pk", flat=True
+            )[:batch_size]
+        )
+        if not batch_pks:
+            return deleted
+        last_pk = batch_pks[-1]
+        with transaction.atomic():
+            rows = list(
+                queryset.filter(pk__in=batch_pks).select_for_update(
+                    skip_locked=True, of=("self",)
+                ).values()
+            )
+            if archive_file is not None:
+                for row in rows:
+                    archive_file.write(json.dumps(
+                        {"model": model._meta.label_lower, "fields": row},
+                        cls=DjangoJSONEncoder
+                    ) + "\n")
+            model.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+        deleted += len(rows)
+        if pause:
+            time.sleep(pause)
+
+
+def open_archive(path: str):
+    return gzip.open(path, "at", encoding="utf-8")
@@ -0,0 +1,252 @@
+import re
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, NotSupportedError
+from django.utils.html import strip_tags
+
+from task_manager.models import Task
+from task_manager.pagination import (
+    KeysetPage,
+    NEXT,
+    PREVIOUS,
+    decode_cursor,
+)
+
+# ranks are ascending, the best match first
+SEARCH_ORDERING = ("search_rank", "id")
+SQLITE_TABLE = "task_manager_task_fts"
+POSTGRES_TABLE = "task_manager_task_search"
+INDEXED_VENDORS = ("sqlite", "postgresql")
+MAX_SEARCH_WORDS = 8
+# bm25 weights of the name, description, tags and scope columns
+SQLITE_WEIGHTS = "10.0, 1.0, 5.0, 0.0"
+
+
+def parse_search_words(text: str) -> list:
+    """
+    Splits the search text into lowercase words, which are safe to embed
+    into FTS5 and tsquery expressions
+    """
+    return re.findall(r"[^\W_]+", text.lower())[:MAX_SEARCH_WORDS]
+
+
+def get_task_documents(task_ids) -> list:
+    """
+    :returns: [(task_id, team_id, name, description, tags), ...]
+    with the description stripped of html
+    """
+    tags = defaultdict(list)
+    for task_id, tag in Task.tags.through.objects.filter(
+            content_type=ContentType.objects.get_for_model(Task),
+            object_id__in=task_ids
+    ).values_list("object_id", "tag__name"):
+        tags[task_id].append(tag)
+    return [
+        (task_id, team_id, name, strip_tags(description),
+         " ".join(tags[task_id]))
+        for task_id, team_id, name, description in Task.objects.filter(
+            pk__in=task_ids
+        ).values_list("id", "project__working_team_id", "name", "description")
+    ]
+
+
+def delete_from_task_search_index(task_ids) -> None:
+    task_ids = list(task_ids)
+    if not task_ids or connection.vendor not in INDEXED_VENDORS:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"DELETE FROM {POSTGRES_TABLE} WHERE task_id = ANY(%s)",
+                [task_ids]
+            )
+        else:
+            placeholders = ", ".join(["%s"] * len(task_ids))
+            cursor.execute(
+                f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({placeholders})",
+                task_ids
+            )
+
+
+def update_task_search_index(task_ids) -> None:
+    """
+    Reindexes the tasks, removing the deleted ones from the index
+    """
+    task_ids = list(task_ids)
+    if not task_ids or connection.vendor not in INDEXED_VENDORS:
+        return
+    documents = get_task_documents(task_ids)
+    delete_from_task_search_index(task_ids)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (task_id, team_id, document) "
+                "VALUES (%s, %s, "
+                "setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'C') || "
+                "setweight(to_tsvector('simple', %s), 'B'))",
+                documents
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} "
+                "(rowid, scope, name, description, tags) "
+                "VALUES (%s, 'team' || %s, %s, %s, %s)",
+                documents
+            )
+
+
+def rebuild_task_search_index(batch_size: int = 500) -> int:
+    """
+    Clears the index and indexes all tasks
+    :returns: number of indexed tasks
+    """
+    if connection.vendor not in INDEXED_VENDORS:
+        raise NotSupportedError(
+            f"Task search doesn't support {connection.vendor}"
+        )
+    table = (
+        POSTGRES_TABLE if connection.vendor == "postgresql" else SQLITE_TABLE
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+    task_ids = list(Task.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(task_ids), batch_size):
+        update_task_search_index(task_ids[start:start + batch_size])
+    return len(task_ids)
+
+
+def get_matches_sql(words: list, team_ids) -> tuple:
+    """
+    Returns the query of tasks containing words starting with every
+    search word within the teams (or all teams if team_ids is None)
+    :returns: (sql selecting id and search_rank columns, params)
+    """
+    if connection.vendor not in INDEXED_VENDORS:
+        raise NotSupportedError(
+            f"Task search doesn't support {connection.vendor}"
+        )
+    params = []
+    if connection.vendor == "postgresql":
+        matches = (
+            "SELECT task_id AS id, "
+            "-ts_rank_cd(document, query)::float8 AS search_rank "
+            f"FROM {POSTGRES_TABLE}, to_tsquery('simple', %s) AS query "
+            "WHERE document @@ query"
+        )
+        params.append(" & ".join(f"{word}:*" for word in words))
+        if team_ids is not None:
+            matches += " AND team_id = ANY(%s)"
+            params.append(list(team_ids))
+    else:
+        expression = "{name description tags}: (%s)" % " AND ".join(
+            f'"{word}"*' for word in words
+        )
+        if team_ids is not None:
+            expression = "scope: (%s) AND %s" % (
+                " OR ".join(f"team{team_id}" for team_id in team_ids),
+                expression
+            )
+        matches = (
+            "SELECT rowid AS id, "
+            f"bm25({SQLITE_TABLE}, {SQLITE_WEIGHTS}) AS search_rank "
+            f"FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s"
+        )
+        params.append(expression)
+    return matches, params
+
+
+def query_search_index(
+        words: list,
+        team_ids,
+        position: tuple = None,
+        limit: int = None
+) -> list:
+    """
+    Finds tasks matching the search words within the teams
+    :param position: (direction, rank, task_id) of the row
+    to continue after or before
+    :returns: [(task_id, rank), ...] in the direction order
+    """
+    matches, params = get_matches_sql(words, team_ids)
+    sql = f"SELECT id, search_rank FROM ({matches}) AS matches"
+    order = "ASC"
+    if position is not None:
+        direction, rank, task_id = position
+        comparison, order = (
+            (">", "ASC") if direction == NEXT else ("<", "DESC")
+        )
+        sql += (
+            f" WHERE search_rank {comparison} %s "
+            f"OR (search_rank = %s AND id {comparison} %s)"
+        )
+        params += [rank, rank, task_id]
+    sql += f" ORDER BY search_rank {order}, id {order}"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def get_search_position(cursor: str):
+    """
+    :returns: (direction, rank, task_id) or None if the cursor
+    is malformed
+    """
+    position = decode_cursor(cursor, SEARCH_ORDERING)
+    if position is None:
+        return None
+    direction, (rank, task_id) = position
+    if (
+            not isinstance(rank, (int, float)) or isinstance(rank, bool)
+            or not isinstance(task_id, int) or isinstance(task_id, bool)
+    ):
+        return None
+    return direction, rank, task_id
+
+
+def search_tasks(
+        text: str,
+        team_ids,
+        per_page: int,
+        cursor: str = None
+) -> KeysetPage:
+    """
+    Returns the page of tasks matching the search text within the teams,
+    best matches first, with the rank set as task.search_rank.
+    Runs one index query fetching a row more than the page needs
+    and one query loading the tasks
+    """
+    words = parse_search_words(text)
+    if not words or (team_ids is not None and not team_ids):
+        return KeysetPage([], False, False, SEARCH_ORDERING)
+    position = get_search_position(cursor) if cursor else None
+    rows = query_search_index(words, team_ids, position, per_page + 1)
+    if not rows and position is not None:
+        return search_tasks(text, team_ids, per_page)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    direction = position[0] if position is not None else NEXT
+    if direction == PREVIOUS:
+        rows.reverse()
+        has_more, has_preceding = True, has_more
+    else:
+        has_preceding = position is not None
+    tasks = Task.objects.for_listing().in_bulk(
+        [task_id for task_id, _ in rows]
+    )
+    object_list = []
+    for task_id, rank in rows:
+        # a task deleted by a concurrent transaction is skipped
+        if task_id in tasks:
+            tasks[task_id].search_rank = rank
+            object_list.append(tasks[task_id])
+    return KeysetPage(
+        object_list,
+        has_more and bool(object_list),
+        has_preceding and bool(object_list),
+        SEARCH_ORDERING
+    )
@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from task_manager.caching import bump_versions
+from task_manager.models import Team, Project, Worker
+
+STATS_KEY = "firefly:site-stats"
+# version of the pages showing the stats
+STATS_VERSION = "site-stats"
+REFRESH_LOCK_KEY = "firefly:site-stats:refresh"
+# the lock expires if the refreshing request dies
+REFRESH_LOCK_TIMEOUT = 60
+STATS_MODELS = {
+    "teams_count": Team,
+    "projects_count": Project,
+    "workers_count": Worker,
+}
+
+
+def get_refresh_interval() -> int:
+    return getattr(settings, "SITE_STATS_REFRESH_INTERVAL", 60 * 10)
+
+
+def count_rows(model) -> int:
+    """
+    Returns the planner's estimate of the table size on PostgreSQL,
+    which doesn't scan the table as COUNT(*) does, and the exact count
+    on other databases or for tables which were never analyzed
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = %s::regclass",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return model.objects.count()
+
+
+def refresh_site_stats() -> dict:
+    stats = {name: count_rows(model) for name, model in STATS_MODELS.items()}
+    stats["refreshed_at"] = time.time()
+    cache.set(STATS_KEY, stats, None)
+    bump_versions(STATS_VERSION)
+    return stats
+
+
+def get_site_stats():
+    """
+    Returns cached site stats without querying the database.
+    Stats older than the refresh interval are refreshed by a single
+    request, which takes the refresh lock, while others use stale stats
+    :returns: stats dict or None if the stats were never counted
+    and another request is counting them
+    """
+    stats = cache.get(STATS_KEY)
+    refresh_interval = get_refresh_interval()
+    if stats is not None and (
+            time.time() - stats["refreshed_at"] < refresh_interval
+    ):
+        return stats
+    if cache.add(REFRESH_LOCK_KEY, True, REFRESH_LOCK_TIMEOUT):
+        try:
+            stats = refresh_site_stats()
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+    return stats
@@ -0,0 +1,182 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from task_manager.models import (
+    Project,
+    Task,
+    ProjectTagCount,
+    TeamTagCount,
+)
+
+# tags listed by the tag filters
+POPULAR_TAGS_LIMIT = 50
+
+
+def add_tag_counts(model, owner: dict, deltas: dict) -> None:
+    """
+    Adds the deltas to the tag counters of the owner (project or team),
+    creating missing counters
+    :param deltas: {tag_id: delta}
+    """
+    deltas = {tag_id: delta for tag_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    model.objects.bulk_create(
+        [model(tag_id=tag_id, **owner) for tag_id in deltas],
+        ignore_conflicts=True
+    )
+    tag_ids_by_delta = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        tag_ids_by_delta[delta].append(tag_id)
+    for delta, tag_ids in tag_ids_by_delta.items():
+        model.objects.filter(tag_id__in=tag_ids, **owner).update(
+            tasks_count=F("tasks_count") + delta
+        )
+
+
+def add_task_tag_counts(project_id: int, tag_ids, delta: int) -> None:
+    """
+    Counts the tags added to (delta=1) or removed from (delta=-1)
+    a task of the project in the project and team counters
+    """
+    add_project_tag_counts(project_id, dict.fromkeys(tag_ids, delta))
+
+
+def add_project_tag_counts(project_id: int, deltas: dict) -> None:
+    """
+    Adds the deltas to the tag counters of the project and its team,
+    e.g. the tags of many tasks changed together
+    :param deltas: {tag_id: delta}
+    """
+    if not any(deltas.values()):
+        return
+    team_id = Project.objects.filter(pk=project_id).values_list(
+        "working_team_id", flat=True
+    ).first()
+    add_tag_counts(ProjectTagCount, {"project_id": project_id}, deltas)
+    if team_id is not None:
+        add_tag_counts(TeamTagCount, {"team_id": team_id}, deltas)
+
+
+def get_project_counts_by_tag(project_id: int) -> dict:
+    """
+    :returns: {tag_id: tasks_count} of the project counters
+    """
+    return dict(
+        ProjectTagCount.objects.filter(project_id=project_id).values_list(
+            "tag_id", "tasks_count"
+        )
+    )
+
+
+def move_project_tag_counts(
+        project_id: int,
+        old_team_id: int,
+        new_team_id: int
+) -> None:
+    """
+    Moves the tag counts of the project to its new team
+    """
+    counts = get_project_counts_by_tag(project_id)
+    add_tag_counts(
+        TeamTagCount,
+        {"team_id": old_team_id},
+        {tag_id: -count for tag_id, count in counts.items()}
+    )
+    add_tag_counts(TeamTagCount, {"team_id": new_team_id}, counts)
+
+
+def remove_project_tag_counts(project_id: int, team_id: int) -> None:
+    """
+    Subtracts the tag counts of the deleted project from its team,
+    the project counters are deleted with the project
+    """
+    add_tag_counts(
+        TeamTagCount,
+        {"team_id": team_id},
+        {
+            tag_id: -count
+            for tag_id, count in get_project_counts_by_tag(
+                project_id
+            ).items()
+        }
+    )
+
+
+def rebuild_tag_counts() -> int:
+    """
+    Recounts all tag counters from the tagged tasks
+    :returns: number of counters
+    """
+    ProjectTagCount.objects.all().delete()
+    TeamTagCount.objects.all().delete()
+    tagged_tasks = Task.objects.filter(tags__isnull=False).order_by()
+    ProjectTagCount.objects.bulk_create(
+        (
+            ProjectTagCount(project_id=project_id, tag_id=tag_id,
+                            tasks_count=count)
+            for project_id, tag_id, count in tagged_tasks.values_list(
+                "project_id", "tags"
+            ).annotate(count=Count("id"))
+        ),
+        batch_size=1000
+    )
+    TeamTagCount.objects.bulk_create(
+        (
+            TeamTagCount(team_id=team_id, tag_id=tag_id, tasks_count=count)
+            for team_id, tag_id, count in tagged_tasks.values_list(
+                "project__working_team_id", "tags"
+            ).annotate(count=Count("id"))
+        ),
+        batch_size=1000
+    )
+    return ProjectTagCount.objects.count() + TeamTagCount.objects.count()
+
+
+def get_project_tag_counts(
+        project_id: int,
+        limit: int = POPULAR_TAGS_LIMIT
+) -> list:
+    """
+    :returns: [(slug, name, tasks_count), ...] of the most used tags
+    of the project, read from the counters
+    """
+    return list(
+        ProjectTagCount.objects.filter(
+            project_id=project_id, tasks_count__gt=0
+        ).order_by("-tasks_count", "tag__name").values_list(
+            "tag__slug", "tag__name", "tasks_count"
+        )[:limit]
+    )
+
+
+def get_teams_tag_counts(team_ids, limit: int = POPULAR_TAGS_LIMIT) -> list:
+    """
+    :returns: [(slug, name, tasks_count), ...] of the most used tags
+    of the teams, summing the counters of each team
+    """
+    return list(
+        TeamTagCount.objects.filter(
+            team_id__in=team_ids, tasks_count__gt=0
+        ).values_list("tag__slug", "tag__name").annotate(
+            total=Sum("tasks_count")
+        ).order_by("-total", "tag__name")[:limit]
+    )
+
+
+def order_tags_by_popularity(tags, team_id: int):
+    """
+    Orders the tags queryset by the number of the team's tasks using them
+    """
+    return tags.annotate(
+        team_tasks_count=Coalesce(
+            Subquery(
+                TeamTagCount.objects.filter(
+                    team_id=team_id, tag_id=OuterRef("pk")
+                ).values("tasks_count")[:1]
+            ),
+            0
+        )
+    ).order_by("-team_tasks_count", "name")
@@ -0,0 +1,14 @@
+from django import template
+
+from task_manager.caching import get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def cache_version(name: str):
+    """
+    Returns the current version of the named cache namespace,
+    e.g. to vary template fragment cache keys on it
+    """
+    return get_versions(name)[0]
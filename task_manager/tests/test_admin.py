@@ -1,8 +1,10 @@
+import datetime
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
-from task_manager.models import Position
+from task_manager.models import Position, Team, Project, TaskType, Task
 
 
 class AdminPageTests(TestCase):
@@ -40,3 +42,32 @@ class AdminPageTests(TestCase):
         )
         response = self.client.get(url)
         self.assertContains(response, self.worker.position)
+
+    def test_task_search_uses_description_and_tags(self):
+        """
+        Test that Task admin search finds tasks by description and tags
+        """
+        project = Project.objects.create(
+            name="Test project",
+            working_team=Team.objects.create(name="Test team")
+        )
+        tasks = [
+            Task.objects.create(
+                name=name,
+                description=description,
+                deadline=datetime.date(2222, 2, 22),
+                task_type=TaskType.objects.create(name=f"{name} type"),
+                project=project,
+            )
+            for name, description in (
+                ("First", "Migrate the database"),
+                ("Second", ""),
+                ("Third", ""),
+            )
+        ]
+        tasks[1].tags.add("database")
+        url = reverse("admin:task_manager_task_changelist")
+        response = self.client.get(url, {"q": "datab"})
+        self.assertEqual(
+            set(response.context["cl"].result_list), set(tasks[:2])
+        )
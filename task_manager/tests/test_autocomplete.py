@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.autocomplete import search_worker_ids, team_members_version
+from task_manager.caching import get_versions
+from task_manager.forms import TaskForm, WorkerAutocompleteWidget
+from task_manager.models import Position, Project, Team, WorkerSearchToken
+
+
+class WorkerAutocompleteTests(TestCase):
+    def setUp(self) -> None:
+        self.developer = Position.objects.create(name="Python Developer")
+        self.designer = Position.objects.create(name="Designer")
+        self.john = get_user_model().objects.create(
+            username="john.smith",
+            first_name="John",
+            last_name="Smith",
+            position=self.developer,
+        )
+        self.jane = get_user_model().objects.create(
+            username="jane.doe",
+            first_name="Jane",
+            last_name="Doe",
+            position=self.designer,
+        )
+        self.team = Team.objects.create(name="Test team", founder=self.john)
+        self.team.members.add(self.john)
+
+    def test_search_tokens_are_built_from_worker_fields(self):
+        self.assertEqual(
+            set(self.john.search_tokens.values_list("token", flat=True)),
+            {"john", "smith", "john.smith", "python", "developer"}
+        )
+
+    def test_search_by_prefixes_of_words(self):
+        self.assertEqual(search_worker_ids("j"), [self.john.id, self.jane.id])
+        self.assertEqual(search_worker_ids("ja"), [self.jane.id])
+        self.assertEqual(search_worker_ids("Dev JO"), [self.john.id])
+        self.assertEqual(search_worker_ids("jo designer"), [])
+        self.assertIsNone(search_worker_ids("  "))
+
+    def test_longer_term_reuses_cached_prefix_result(self):
+        search_worker_ids("j")
+        with self.assertNumQueries(0):
+            self.assertEqual(search_worker_ids("jan"), [self.jane.id])
+
+    def test_search_within_team(self):
+        self.assertEqual(
+            search_worker_ids("j", self.team.id), [self.john.id]
+        )
+        self.team.members.add(self.jane)
+        self.assertEqual(
+            search_worker_ids("j", self.team.id), [self.john.id, self.jane.id]
+        )
+
+    def test_tokens_follow_worker_and_position_changes(self):
+        search_worker_ids("des")
+        self.jane.first_name = "Alice"
+        self.jane.save()
+        self.assertEqual(search_worker_ids("ali"), [self.jane.id])
+        self.assertFalse(self.jane.search_tokens.filter(token="jane"))
+        self.designer.name = "Artist"
+        self.designer.save()
+        self.assertEqual(search_worker_ids("des"), [])
+        self.assertEqual(search_worker_ids("art"), [self.jane.id])
+
+    def test_team_versions_follow_only_search_field_changes(self):
+        other_team = Team.objects.create(
+            name="Other team", founder=self.jane
+        )
+        team_versions = [
+            team_members_version(self.team.id),
+            team_members_version(other_team.id),
+        ]
+        versions = get_versions(*team_versions)
+        self.john.email = "john@example.com"
+        self.john.save()
+        self.assertEqual(get_versions(*team_versions), versions)
+        self.john.last_name = "Brown"
+        self.john.save()
+        changed_versions = get_versions(*team_versions)
+        self.assertNotEqual(changed_versions[0], versions[0])
+        self.assertEqual(changed_versions[1], versions[1])
+
+    def test_autocomplete_view_searches_within_widget_team(self):
+        widget = WorkerAutocompleteWidget(team_id=self.team.id)
+        widget.render("assignees", None)
+        response = self.client.get(
+            reverse("django_select2:auto-json"),
+            {"field_id": widget.field_id, "term": "j"}
+        )
+        self.assertEqual(
+            [result["id"] for result in response.json()["results"]],
+            [self.john.id]
+        )
+
+    def test_tokens_are_updated_on_position_delete(self):
+        self.designer.delete()
+        self.assertFalse(
+            WorkerSearchToken.objects.filter(token="designer").exists()
+        )
+        self.assertEqual(search_worker_ids("user"), [self.jane.id])
+
+    def test_assignees_widget_searches_within_team(self):
+        widget = TaskForm(initial={}).fields["assignees"].widget
+        queryset = widget.filter_queryset(None, "j")
+        self.assertEqual(set(queryset), {self.john, self.jane})
+        project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        widget = TaskForm(
+            initial={"team_slug": self.team.slug, "project": project}
+        ).fields["assignees"].widget
+        queryset = widget.filter_queryset(None, "")
+        self.assertEqual(list(queryset), [self.john])
+        self.assertIsNone(TaskForm.base_fields["assignees"].widget.team_id)
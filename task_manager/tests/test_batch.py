@@ -0,0 +1,335 @@
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from task_manager.batch import TaskBatchError, save_task_batch
+from task_manager.broker import get_broker, project_channel
+from task_manager.models import (
+    Team,
+    Project,
+    Task,
+    TaskType,
+    Notification,
+    ProjectTagCount,
+    TeamTagCount,
+)
+from task_manager.search import search_tasks
+
+
+class TaskBatchTests(TestCase):
+    def setUp(self) -> None:
+        self.requester = get_user_model().objects.create_user(
+            username="requester"
+        )
+        self.worker = get_user_model().objects.create_user(
+            username="worker", first_name="Jane", last_name="Doe"
+        )
+        self.team = Team.objects.create(name="Test team")
+        self.team.members.add(self.requester, self.worker)
+        self.project = Project.objects.select_related("working_team").get(
+            pk=Project.objects.create(
+                name="Test project", working_team=self.team
+            ).pk
+        )
+        self.task_type = TaskType.objects.create(name="Feature")
+
+    def get_items(self, count: int) -> list:
+        return [
+            {
+                "name": f"Imported task {index}",
+                "deadline": "2222-02-22",
+                "task_type": "Feature",
+                "tags": ["imported", f"sprint-{index % 2}"],
+                "assignees": ["worker"],
+            }
+            for index in range(count)
+        ]
+
+    def test_tasks_are_created_with_relations(self):
+        task_ids = save_task_batch(self.project, self.requester, [
+            {
+                "name": "Imported task",
+                "deadline": "2222-02-22",
+                "priority": Task.Priority.HIGH,
+                "task_type": "Bug",
+                "tags": ["imported", "backend"],
+                "assignees": ["worker"],
+            },
+        ])
+        task = Task.objects.get(pk=task_ids[0])
+        self.assertEqual(task.name, "Imported task")
+        self.assertEqual(task.priority, Task.Priority.HIGH)
+        self.assertEqual(task.task_type.name, "Bug")
+        self.assertEqual(task.requester, self.requester)
+        self.assertEqual(
+            sorted(task.tags.names()), ["backend", "imported"]
+        )
+        self.assertEqual(list(task.assignees.all()), [self.worker])
+
+    def test_updates_change_submitted_fields_and_relations(self):
+        task = Task.objects.create(
+            name="Existing task",
+            description="Kept",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+            requester=self.requester,
+        )
+        task.tags.add("obsolete", "kept")
+        task.assignees.add(self.requester)
+        updated_at = Task.objects.get(pk=task.pk).updated_at
+        save_task_batch(self.project, self.requester, [
+            {
+                "id": task.id,
+                "name": "Renamed task",
+                "tags": ["kept", "new"],
+                "assignees": ["worker"],
+            },
+        ])
+        task.refresh_from_db()
+        self.assertEqual(task.name, "Renamed task")
+        self.assertEqual(task.description, "Kept")
+        self.assertGreater(task.updated_at, updated_at)
+        self.assertEqual(sorted(task.tags.names()), ["kept", "new"])
+        self.assertEqual(list(task.assignees.all()), [self.worker])
+        self.assertEqual(
+            dict(
+                ProjectTagCount.objects.filter(
+                    project=self.project
+                ).values_list("tag__name", "tasks_count")
+            ),
+            {"obsolete": 0, "kept": 1, "new": 1}
+        )
+
+    def test_tag_counts_and_search_index_are_updated(self):
+        save_task_batch(self.project, self.requester, self.get_items(3))
+        self.assertEqual(
+            TeamTagCount.objects.get(
+                team=self.team, tag__name="imported"
+            ).tasks_count,
+            3
+        )
+        self.assertEqual(
+            ProjectTagCount.objects.get(
+                project=self.project, tag__name="sprint-0"
+            ).tasks_count,
+            2
+        )
+        page = search_tasks("sprint", [self.team.id], 10)
+        self.assertEqual(len(page), 3)
+
+    def test_each_assignee_gets_one_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task_ids = save_task_batch(
+                self.project, self.requester, self.get_items(5)
+            )
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.worker)
+        self.assertEqual(notification.task_id, task_ids[0])
+        self.assertEqual(notification.project, self.project)
+        self.assertIn("Test project", notification.message_text)
+
+    def test_only_new_assignees_are_notified(self):
+        task = Task.objects.create(
+            name="Existing task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+            requester=self.requester,
+        )
+        task.assignees.add(self.worker)
+        Notification.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            save_task_batch(self.project, self.requester, [
+                {"id": task.id, "name": "Renamed task"},
+                {**self.get_items(1)[0], "assignees": []},
+            ])
+        self.assertFalse(Notification.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            save_task_batch(self.project, self.requester, [
+                {"id": task.id, "assignees": ["worker", "requester"]},
+            ])
+        self.assertEqual(
+            list(Notification.objects.values_list("user", "task")),
+            [(self.requester.id, task.id)]
+        )
+
+    def test_tasks_of_other_requesters_are_rejected(self):
+        task = Task.objects.create(
+            name="Worker's task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+            requester=self.worker,
+        )
+        with self.assertRaises(TaskBatchError) as context:
+            save_task_batch(self.project, self.requester, [
+                {"id": task.id, "name": "Renamed task"},
+            ])
+        self.assertEqual(list(context.exception.errors[0]), ["id"])
+        task.refresh_from_db()
+        self.assertEqual(task.name, "Worker's task")
+
+    def test_number_of_queries_doesnt_depend_on_batch_size(self):
+        # task type, tags and notification type are created
+        # by the first batch, and 100 tasks fit into one insert
+        # of the database's bulk batch size
+        save_task_batch(self.project, self.requester, self.get_items(2))
+        with self.assertNumQueries(25):
+            save_task_batch(self.project, self.requester, self.get_items(2))
+        with self.assertNumQueries(25):
+            save_task_batch(
+                self.project, self.requester, self.get_items(100)
+            )
+
+    @override_settings(TASK_UPDATES_STREAM_ENABLED=True)
+    def test_updates_are_published(self):
+        task = Task.objects.create(
+            name="Existing task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+            requester=self.requester,
+        )
+        with patch.object(get_broker(), "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                save_task_batch(self.project, self.requester, [
+                    {"id": task.id, "priority": Task.Priority.HIGH},
+                    *self.get_items(1),
+                ])
+        task.refresh_from_db()
+        self.assertIn(
+            (project_channel(self.project.id), {
+                "id": task.id,
+                "version": task.updated_at.isoformat(),
+                "fields": {"priority": "High"},
+            }),
+            [call.args for call in publish.call_args_list]
+        )
+
+    def test_invalid_batch_saves_nothing(self):
+        other_task = Task.objects.create(
+            name="Other task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=Project.objects.create(
+                name="Other project", working_team=self.team
+            ),
+        )
+        outsider = get_user_model().objects.create_user(username="outsider")
+        items = self.get_items(2) + [
+            {"id": other_task.id, "name": "Moved task"},
+            {"name": "Task without deadline", "task_type": "Feature"},
+            {"name": "Outsider task", "deadline": "2222-02-22",
+             "task_type": "New type", "assignees": [outsider.username]},
+        ]
+        with self.assertRaises(TaskBatchError) as context:
+            save_task_batch(self.project, self.requester, items)
+        self.assertEqual(
+            sorted(context.exception.errors[3]), ["deadline"]
+        )
+        with self.assertRaises(TaskBatchError) as context:
+            save_task_batch(
+                self.project, self.requester, items[:3] + items[4:]
+            )
+        self.assertEqual(sorted(context.exception.errors), [2, 3])
+        self.assertFalse(
+            Task.objects.filter(project=self.project).exists()
+        )
+        self.assertFalse(TaskType.objects.filter(name="New type").exists())
+        self.assertFalse(ProjectTagCount.objects.exists())
+
+    def test_empty_priority_is_rejected(self):
+        task = Task.objects.create(
+            name="Existing task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+        )
+        items = [
+            {**self.get_items(1)[0], "priority": None},
+            {"id": task.id, "priority": ""},
+        ]
+        with self.assertRaises(TaskBatchError) as context:
+            save_task_batch(self.project, self.requester, items)
+        self.assertEqual(
+            context.exception.errors,
+            {index: {"priority": ["This field is required."]}
+             for index in range(2)}
+        )
+        task_ids = save_task_batch(
+            self.project, self.requester, self.get_items(1)
+        )
+        self.assertEqual(
+            Task.objects.get(pk=task_ids[0]).priority, Task.Priority.UNKNOWN
+        )
+
+    def test_malformed_items_are_rejected(self):
+        for items, message in (
+                ([], "tasks must be a non-empty list"),
+                ({"name": "Task"}, "tasks must be a non-empty list"),
+                (["Task"], "Invalid tasks"),
+                ([{"name": "Task", "unknown": 1}], "Invalid tasks"),
+                ([{"id": 1}, {"id": 1}], "Invalid tasks"),
+        ):
+            with self.assertRaisesMessage(TaskBatchError, message):
+                save_task_batch(self.project, self.requester, items)
+
+
+class ImportTasksCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.requester = get_user_model().objects.create_user(
+            username="requester"
+        )
+        self.team = Team.objects.create(name="Test team")
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        file, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(file)
+        self.addCleanup(os.remove, self.path)
+
+    def write_items(self, items: list) -> None:
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(items, file)
+
+    def import_tasks(self, **options) -> str:
+        stdout = StringIO()
+        call_command(
+            "import_tasks",
+            self.team.slug,
+            self.project.slug,
+            self.path,
+            requester="requester",
+            stdout=stdout,
+            stderr=StringIO(),
+            **options
+        )
+        return stdout.getvalue()
+
+    def test_tasks_are_imported(self):
+        self.write_items([
+            {"name": f"Imported task {index}", "deadline": "2222-02-22",
+             "task_type": "Feature"}
+            for index in range(3)
+        ])
+        self.assertEqual(self.import_tasks(), "3 tasks saved\n")
+        self.assertEqual(
+            Task.objects.filter(
+                project=self.project, requester=self.requester
+            ).count(),
+            3
+        )
+
+    def test_invalid_tasks_are_reported(self):
+        self.write_items([{"name": "Task without deadline"}])
+        with self.assertRaisesMessage(CommandError, "no tasks saved"):
+            self.import_tasks()
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,107 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from task_manager.broker import InProcessBroker, RedisBroker
+
+
+class LocalRedis:
+    """
+    Local stand-in for the sync and asyncio redis clients
+    """
+
+    def __init__(self):
+        self.channels = {}
+
+    def publish(self, channel, data):
+        for pubsub in self.channels.get(channel, ()):
+            pubsub.loop.call_soon_threadsafe(
+                pubsub.queue.put_nowait,
+                {"type": "message", "channel": channel, "data": data}
+            )
+
+    def pubsub(self):
+        return LocalPubSub(self)
+
+
+class UnavailableRedis(LocalRedis):
+    def publish(self, channel, data):
+        raise ConnectionError("Redis is unavailable")
+
+
+class LocalPubSub:
+    def __init__(self, redis: LocalRedis):
+        self.redis = redis
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.channels.setdefault(channel, []).append(self)
+        await self.queue.put({"type": "subscribe", "channel": channel})
+
+    async def unsubscribe(self, channel):
+        self.redis.channels[channel].remove(self)
+
+    async def reset(self):
+        pass
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    async def test_subscriber_receives_channel_messages(self):
+        broker = InProcessBroker()
+        async with broker.subscribe("user:1") as subscription:
+            broker.publish("user:2", {"id": 2})
+            broker.publish("user:1", {"id": 1})
+            message = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(message, {"id": 1})
+        self.assertEqual(broker.subscribers, {})
+
+    async def test_messages_can_be_published_from_another_thread(self):
+        broker = InProcessBroker()
+        async with broker.subscribe("user:1") as subscription:
+            await asyncio.to_thread(broker.publish, "user:1", {"id": 1})
+            message = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(message, {"id": 1})
+
+    async def test_slow_subscriber_queue_is_bounded(self):
+        broker = InProcessBroker(max_queue_size=2)
+        async with broker.subscribe("user:1") as subscription:
+            for message_id in range(5):
+                broker.publish("user:1", {"id": message_id})
+            await asyncio.sleep(0)
+            self.assertEqual(subscription.queue.qsize(), 2)
+
+
+class RedisBrokerTests(SimpleTestCase):
+    async def test_subscriber_receives_channel_messages(self):
+        local_redis = LocalRedis()
+        broker = RedisBroker(client=local_redis, async_client=local_redis)
+        async with broker.subscribe("user:1") as subscription:
+            broker.publish("user:2", {"id": 2})
+            broker.publish("user:1", {"id": 1})
+            message = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(message, {"id": 1})
+        self.assertEqual(local_redis.channels["firefly:user:1"], [])
+
+    async def test_messages_are_received_after_a_timeout(self):
+        local_redis = LocalRedis()
+        broker = RedisBroker(client=local_redis, async_client=local_redis)
+        async with broker.subscribe("user:1") as subscription:
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(subscription.get(), 0.01)
+            broker.publish("user:1", {"id": 1})
+            message = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(message, {"id": 1})
+
+    def test_publish_errors_after_commit_are_logged(self):
+        unavailable_redis = UnavailableRedis()
+        broker = RedisBroker(
+            client=unavailable_redis, async_client=unavailable_redis
+        )
+        with self.assertLogs("task_manager.broker", "ERROR") as logs:
+            broker.publish_on_commit("user:1", {"id": 1})
+        self.assertIn("user:1", logs.output[0])
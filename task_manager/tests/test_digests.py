@@ -0,0 +1,147 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from task_manager.digests import get_pending_notifications, send_digests
+from task_manager.models import (
+    Team,
+    Project,
+    TaskType,
+    Task,
+    NotificationType,
+    Notification,
+    NotificationEvent,
+    NotificationEmailPreference,
+)
+
+
+class NotificationDigestsTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(
+            username="test.user", email="test.user@example.com"
+        )
+        self.another_user = get_user_model().objects.create(
+            username="another.user", email="another.user@example.com"
+        )
+        team = Team.objects.create(name="Test team")
+        self.project = Project.objects.create(
+            name="Test project",
+            working_team=team
+        )
+        task_type = TaskType.objects.create(name="Test TaskType")
+        self.task = Task.objects.create(
+            name="Test task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=task_type,
+            project=self.project,
+        )
+        self.task.assignees.add(self.user, self.another_user)
+        self.notification_type = NotificationType.objects.create(
+            name="test_notification",
+            message_template="Notification about \"{task.name}\"",
+        )
+        self.preference = NotificationEmailPreference.objects.create(
+            user=self.user,
+            frequency=NotificationEmailPreference.Frequency.DAILY,
+        )
+
+    def sample_notification(self, user, **kwargs):
+        return Notification.objects.create(
+            user=user,
+            notification_type=self.notification_type,
+            task=self.task,
+            **kwargs
+        )
+
+    def test_digest_contains_unread_notifications(self):
+        self.sample_notification(self.user)
+        self.sample_notification(self.user, is_read=True)
+        self.sample_notification(self.another_user)
+        NotificationEvent.objects.create(
+            notification_type=self.notification_type,
+            task=self.task,
+            team=self.project.working_team,
+            project=self.project,
+        ).recipients.add(self.user, self.another_user)
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, [self.user.email])
+        self.assertIn("2 new notifications", message.subject)
+        self.assertEqual(
+            message.body.count("Notification about \"Test task\""), 2
+        )
+
+    def test_digest_is_not_sent_again_before_interval(self):
+        self.sample_notification(self.user)
+        send_digests()
+        self.sample_notification(self.user)
+        self.assertEqual(send_digests(), 0)
+        next_day = timezone.now() + datetime.timedelta(days=1, minutes=1)
+        self.assertEqual(send_digests(now=next_day), 1)
+        self.assertIn("1 new notifications", mail.outbox[-1].subject)
+
+    def test_digest_is_not_sent_without_new_notifications(self):
+        self.assertEqual(send_digests(), 0)
+        self.preference.refresh_from_db()
+        self.assertIsNotNone(self.preference.last_sent_at)
+
+    def test_digests_are_limited_per_run(self):
+        NotificationEmailPreference.objects.create(
+            user=self.another_user,
+            frequency=NotificationEmailPreference.Frequency.HOURLY,
+        )
+        self.sample_notification(self.user)
+        self.sample_notification(self.another_user)
+        self.assertEqual(send_digests(MAX_MESSAGES_PER_RUN=1), 1)
+        self.assertEqual(send_digests(MAX_MESSAGES_PER_RUN=1), 1)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_first_digest_covers_the_digest_interval(self):
+        old_notification = self.sample_notification(self.user)
+        Notification.objects.filter(pk=old_notification.pk).update(
+            sent_at=timezone.now() - datetime.timedelta(days=2)
+        )
+        self.assertEqual(send_digests(), 0)
+        self.sample_notification(self.user)
+        self.preference.last_sent_at = None
+        self.preference.save()
+        self.assertEqual(send_digests(), 1)
+        self.assertIn("1 new notifications", mail.outbox[0].subject)
+
+    def test_digest_shows_the_latest_notifications(self):
+        notifications = [
+            self.sample_notification(self.user) for _ in range(3)
+        ]
+        for _ in range(2):
+            NotificationEvent.objects.create(
+                notification_type=self.notification_type,
+                task=self.task,
+                team=self.project.working_team,
+                project=self.project,
+            ).recipients.add(self.user)
+        self.sample_notification(self.another_user)
+        Notification.objects.filter(pk=notifications[-1].pk).update(
+            sent_at=timezone.now() + datetime.timedelta(minutes=1)
+        )
+        now = timezone.now() + datetime.timedelta(minutes=2)
+        with self.assertNumQueries(3):
+            pending = get_pending_notifications([self.preference], now, 2)
+        self.assertEqual(len(pending[self.user.id]), 2)
+        self.assertEqual(pending[self.user.id][0], notifications[-1])
+        send_digests(now=now, MAX_NOTIFICATIONS_PER_DIGEST=2)
+        self.assertIn("2 new notifications", mail.outbox[0].subject)
+
+    def test_send_notification_digests_command(self):
+        self.sample_notification(self.user)
+        out = StringIO()
+        call_command(
+            "send_notification_digests", batch_size=10, stdout=out
+        )
+        self.assertIn("1 digests sent", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import TestCase
+from taggit.models import Tag
+
+from task_manager.forms import TaskForm, TeamUpdateForm
+from task_manager.memberships import get_team_roster
+from task_manager.models import TaskType, Team, Project
+
+
+class ModelMultipleAutocompleteChoiceWidgetTests(TestCase):
+    def setUp(self) -> None:
+        self.tags_widget = TaskForm.base_fields["tags"].widget
+        self.task_type_widget = TaskForm.base_fields["task_type"].widget
+        self.existing_tags = [
+            Tag.objects.create(name=f"existing {number}")
+            for number in range(5)
+        ]
+
+    def get_tags_data(self, values) -> QueryDict:
+        data = QueryDict(mutable=True)
+        data.setlist("tags", values)
+        return data
+
+    def test_tags_are_resolved_with_constant_number_of_queries(self):
+        values = (
+            [str(tag.pk) for tag in self.existing_tags]
+            + [tag.name for tag in self.existing_tags]
+            + [f"new {number}" for number in range(5)]
+        )
+        with self.assertNumQueries(4):
+            cleaned_values = self.tags_widget.value_from_datadict(
+                self.get_tags_data(values), {}, "tags"
+            )
+        new_tags = Tag.objects.filter(name__startswith="new")
+        self.assertEqual(new_tags.count(), 5)
+        self.assertEqual(
+            cleaned_values,
+            [str(tag.pk) for tag in self.existing_tags] * 2
+            + [str(tag.pk) for tag in new_tags.order_by("name")]
+        )
+        self.assertTrue(all(tag.slug for tag in new_tags))
+
+    def test_tag_with_conflicting_slug_is_created(self):
+        Tag.objects.create(name="Same slug")
+        cleaned_values = self.tags_widget.value_from_datadict(
+            self.get_tags_data(["same slug"]), {}, "tags"
+        )
+        tag = Tag.objects.get(name="same slug")
+        self.assertEqual(cleaned_values, [str(tag.pk)])
+        self.assertNotEqual(tag.slug, "same-slug")
+
+    def test_unknown_pk_is_treated_as_name(self):
+        cleaned_values = self.tags_widget.value_from_datadict(
+            self.get_tags_data(["12345"]), {}, "tags"
+        )
+        tag = Tag.objects.get(name="12345")
+        self.assertEqual(cleaned_values, [str(tag.pk)])
+
+    def test_single_value_resolves_to_pk_without_extra_lookup(self):
+        task_type = TaskType.objects.create(name="Bug")
+        data = QueryDict(mutable=True)
+        data.setlist("task_type", [str(task_type.pk)])
+        with self.assertNumQueries(1):
+            value = self.task_type_widget.value_from_datadict(
+                data, {}, "task_type"
+            )
+        self.assertEqual(value, str(task_type.pk))
+
+
+class TeamRosterTests(TestCase):
+    def setUp(self) -> None:
+        self.founder = get_user_model().objects.create(username="founder")
+        self.member = get_user_model().objects.create(username="member")
+        self.outsider = get_user_model().objects.create(username="outsider")
+        # the default position is set with update()
+        self.member.refresh_from_db()
+        self.team = Team.objects.create(name="Test team", founder=self.founder)
+        self.team.members.add(self.member)
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+
+    def get_task_form(self, assignees=None) -> TaskForm:
+        data = None
+        if assignees is not None:
+            data = QueryDict(mutable=True)
+            data.setlist("assignees", [str(pk) for pk in assignees])
+        return TaskForm(
+            data,
+            initial={"team_slug": self.team.slug, "project": self.project}
+        )
+
+    def test_roster_contains_members_and_founder(self):
+        roster = get_team_roster(self.team.id)
+        self.assertEqual(roster["founder_id"], self.founder.id)
+        self.assertEqual(
+            roster["members"], [(self.member.id, str(self.member))]
+        )
+        self.assertEqual(
+            {pk for pk, label in roster["founder_choices"]},
+            {self.founder.id, self.member.id}
+        )
+
+    def test_task_form_uses_cached_roster(self):
+        get_team_roster(self.team.id)
+        expected_choices = [(self.member.id, str(self.member))]
+        with self.assertNumQueries(0):
+            form = self.get_task_form()
+            self.assertEqual(
+                form.fields["assignees"].choices, expected_choices
+            )
+
+    def test_task_form_validates_assignees_against_roster(self):
+        for assignees, code in (
+                ([self.outsider.id], "invalid_choice"),
+                (["member"], "invalid_choice"),
+                ([], "required"),
+        ):
+            form = self.get_task_form(assignees)
+            form.is_valid()
+            self.assertEqual(
+                form.errors.as_data()["assignees"][0].code, code
+            )
+        form = self.get_task_form([self.member.id])
+        form.is_valid()
+        self.assertNotIn("assignees", form.errors)
+        self.assertEqual(list(form.cleaned_data["assignees"]), [self.member])
+
+    def test_roster_is_invalidated_on_membership_change(self):
+        get_team_roster(self.team.id)
+        self.team.members.add(self.outsider)
+        self.assertIn(
+            self.outsider.id,
+            dict(get_team_roster(self.team.id)["members"])
+        )
+        self.outsider.teams.remove(self.team)
+        self.assertNotIn(
+            self.outsider.id,
+            dict(get_team_roster(self.team.id)["members"])
+        )
+
+    def test_roster_is_invalidated_on_worker_rename(self):
+        get_team_roster(self.team.id)
+        self.member.first_name = "Renamed"
+        self.member.save()
+        self.assertEqual(
+            get_team_roster(self.team.id)["members"],
+            [(self.member.id, str(self.member))]
+        )
+
+    def test_team_update_form_founder_choices(self):
+        get_team_roster(self.team.id)
+        form = TeamUpdateForm(instance=self.team)
+        self.assertEqual(
+            {pk for pk, label in form.fields["founder"].choices if pk},
+            {self.founder.id, self.member.id}
+        )
+        form = TeamUpdateForm(
+            {
+                "name": self.team.name,
+                "members": [self.member.id],
+                "founder": self.outsider.id,
+            },
+            instance=self.team
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("founder", form.errors)
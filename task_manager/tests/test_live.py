@@ -0,0 +1,111 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from task_manager.broker import get_broker, project_channel
+from task_manager.models import Team, Project, Task, TaskType
+
+
+@override_settings(TASK_UPDATES_STREAM_ENABLED=True)
+class TaskChangesPublishingTests(TestCase):
+    def setUp(self) -> None:
+        team = Team.objects.create(name="Test team")
+        self.project = Project.objects.create(
+            name="Test project", working_team=team
+        )
+        self.task = Task.objects.create(
+            name="Test task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=TaskType.objects.create(name="Test TaskType"),
+            project=self.project,
+        )
+        self.channel = project_channel(self.project.id)
+
+    def get_messages(self, change) -> list:
+        """
+        :returns: [(channel, message), ...] published after the change
+        is committed
+        """
+        with patch.object(get_broker(), "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return [call.args for call in publish.call_args_list]
+
+    def test_changed_fields_are_published(self):
+        self.task.name = "Renamed task"
+        self.task.priority = Task.Priority.HIGH
+        messages = self.get_messages(self.task.save)
+        self.task.refresh_from_db()
+        self.assertEqual(messages, [(self.channel, {
+            "id": self.task.id,
+            "version": self.task.updated_at.isoformat(),
+            "fields": {"name": "Renamed task", "priority": "High"},
+        })])
+
+    def test_completion_publishes_status(self):
+        messages = self.get_messages(self.task.mark_as_completed)
+        channel, message = messages[0]
+        self.assertEqual(
+            message["fields"], {"is_completed": True, "status": "completed"}
+        )
+
+    def test_unchanged_task_isnt_published(self):
+        self.assertEqual(self.get_messages(self.task.save), [])
+
+    @override_settings(TASK_UPDATES_STREAM_ENABLED=False)
+    def test_nothing_is_read_or_published_if_stream_is_disabled(self):
+        self.task.name = "Renamed task"
+        with CaptureQueriesContext(connection) as context:
+            messages = self.get_messages(self.task.save)
+        selected, _ = context.captured_queries[0]["sql"].split(" FROM ")
+        self.assertEqual(selected, 'SELECT "task_manager_task"."project_id"')
+        self.assertEqual(messages, [])
+        messages = self.get_messages(lambda: self.task.tags.add("backend"))
+        self.assertEqual(messages, [])
+        self.assertEqual(self.get_messages(self.task.delete), [])
+
+    def test_relations_are_published(self):
+        worker = get_user_model().objects.create(
+            username="worker", first_name="Jane", last_name="Doe"
+        )
+        messages = self.get_messages(
+            lambda: self.task.tags.add("backend", "api")
+        )
+        self.assertEqual(
+            messages[-1][1]["fields"], {"tags": ["api", "backend"]}
+        )
+        messages = self.get_messages(lambda: self.task.assignees.add(worker))
+        self.assertEqual(
+            messages[-1][1]["fields"], {"assignees": ["Jane Doe"]}
+        )
+        messages = self.get_messages(self.task.tags.clear)
+        self.assertEqual(messages[-1][1]["fields"], {"tags": []})
+
+    def test_tag_changes_touch_the_task(self):
+        updated_at = self.task.updated_at
+        self.task.tags.add("backend")
+        self.task.refresh_from_db()
+        self.assertGreater(self.task.updated_at, updated_at)
+
+    def test_moved_and_deleted_tasks_are_removed(self):
+        other_project = Project.objects.create(
+            name="Other project", working_team=self.project.working_team
+        )
+        self.task.project = other_project
+        messages = self.get_messages(self.task.save)
+        self.assertIn(
+            (self.channel, {"id": self.task.id, "removed": True}), messages
+        )
+        task_id = self.task.id
+        messages = self.get_messages(self.task.delete)
+        self.assertIn(
+            (
+                project_channel(other_project.id),
+                {"id": task_id, "removed": True}
+            ),
+            messages
+        )
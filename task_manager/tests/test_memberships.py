@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from task_manager.caching import versioned_key
+from task_manager.checks import shared_cache_check
+from task_manager.forms import (
+    NotificationFilterByTeamForm,
+    NotificationFilterByProjectForm,
+)
+from task_manager.memberships import (
+    CACHE_TIMEOUT,
+    get_user_team_ids,
+    get_accessible_team_ids,
+    user_teams_version,
+)
+from task_manager.models import Team, Project
+
+
+class UserTeamIdsTests(TestCase):
+    def setUp(self) -> None:
+        self.founder = get_user_model().objects.create(username="founder")
+        self.member = get_user_model().objects.create(username="member")
+        self.team = Team.objects.create(name="Test team", founder=self.founder)
+        self.team.members.add(self.member)
+        self.another_team = Team.objects.create(
+            name="Another team", founder=self.member
+        )
+
+    def test_user_team_ids(self):
+        self.assertEqual(
+            get_user_team_ids(self.member.id),
+            {"member": {self.team.id}, "founded": {self.another_team.id}}
+        )
+        self.assertEqual(
+            get_accessible_team_ids(self.founder.id), {self.team.id}
+        )
+
+    def test_team_ids_are_cached(self):
+        get_user_team_ids(self.member.id)
+        with self.assertNumQueries(0):
+            get_user_team_ids(self.member.id)
+
+    def test_team_ids_follow_membership_changes(self):
+        get_user_team_ids(self.founder.id)
+        self.another_team.members.add(self.founder)
+        self.assertEqual(
+            get_user_team_ids(self.founder.id)["member"],
+            {self.another_team.id}
+        )
+        self.member.teams.clear()
+        self.assertEqual(get_user_team_ids(self.member.id)["member"], set())
+        self.another_team.members.clear()
+        self.assertEqual(get_user_team_ids(self.founder.id)["member"], set())
+
+    def test_team_ids_follow_founder_changes(self):
+        get_user_team_ids(self.founder.id)
+        get_user_team_ids(self.member.id)
+        self.team.founder = self.member
+        self.team.save()
+        self.assertEqual(get_accessible_team_ids(self.founder.id), set())
+        self.assertEqual(
+            get_user_team_ids(self.member.id)["founded"],
+            {self.team.id, self.another_team.id}
+        )
+
+    def test_team_ids_follow_team_deletion(self):
+        get_user_team_ids(self.member.id)
+        self.team.delete()
+        self.assertEqual(
+            get_accessible_team_ids(self.member.id), {self.another_team.id}
+        )
+
+    def test_team_ids_read_before_the_commit_are_invalidated(self):
+        project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.team.members.remove(self.member)
+                # a concurrent request caches the committed membership
+                # under the version bumped by the removal
+                cache.set(
+                    versioned_key(
+                        (user_teams_version(self.member.id),),
+                        "user-teams",
+                        self.member.id
+                    ),
+                    {"member": {self.team.id}, "founded": set()},
+                    CACHE_TIMEOUT
+                )
+        self.assertEqual(
+            get_accessible_team_ids(self.member.id), {self.another_team.id}
+        )
+        self.client.force_login(self.member)
+        response = self.client.get(reverse(
+            "task_manager:project-board",
+            kwargs={"team_slug": self.team.slug, "project_slug": project.slug}
+        ))
+        self.assertEqual(response.status_code, 403)
+
+    def test_filter_forms_are_built_from_team_ids(self):
+        project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        Project.objects.create(
+            name="Another project", working_team=self.another_team
+        )
+        form = NotificationFilterByTeamForm(
+            initial={"user_id": self.founder.id}
+        )
+        self.assertEqual(list(form.fields["team"].queryset), [self.team])
+        form = NotificationFilterByProjectForm(
+            initial={"user_id": self.founder.id, "team_id": self.team.id}
+        )
+        self.assertEqual(list(form.fields["project"].queryset), [project])
+        form = NotificationFilterByProjectForm(
+            initial={
+                "user_id": self.founder.id,
+                "team_id": self.another_team.id,
+            }
+        )
+        self.assertEqual(list(form.fields["project"].queryset), [])
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual(
+            [warning.id for warning in shared_cache_check(None)],
+            ["task_manager.W001"]
+        )
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+    }})
+    def test_shared_cache_passes(self):
+        self.assertEqual(shared_cache_check(None), [])
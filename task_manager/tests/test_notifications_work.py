@@ -66,3 +66,35 @@ class NotificationsWorkTests(TransactionTestCase):
             task=self.task,
         )
         self.assertTrue(notification)
+
+    def test_notification_stores_task_team_and_project(self):
+        notification = Notification.objects.get(
+            user=self.worker,
+            notification_type__name="task_created",
+        )
+        self.assertEqual(notification.team_id, self.team.id)
+        self.assertEqual(notification.project_id, self.project.id)
+
+    def test_notifications_follow_task_moved_to_another_project(self):
+        another_team = Team.objects.create(name="Another team")
+        another_project = Project.objects.create(
+            name="Another project",
+            working_team=another_team
+        )
+        self.task.project = another_project
+        self.task.save()
+        notifications = Notification.objects.filter(task=self.task)
+        self.assertTrue(notifications)
+        for notification in notifications:
+            self.assertEqual(notification.team_id, another_team.id)
+            self.assertEqual(notification.project_id, another_project.id)
+
+    def test_notifications_follow_project_moved_to_another_team(self):
+        another_team = Team.objects.create(name="Another team")
+        self.project.working_team = another_team
+        self.project.save()
+        notification = Notification.objects.get(
+            user=self.worker,
+            notification_type__name="task_created",
+        )
+        self.assertEqual(notification.team_id, another_team.id)
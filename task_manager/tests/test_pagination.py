@@ -0,0 +1,68 @@
+import datetime
+
+from django.test import TestCase
+
+from task_manager.models import Team, Project, Task, TaskType
+from task_manager.pagination import (
+    TASK_KEYSET_ORDERING,
+    get_keyset_page,
+)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self) -> None:
+        project = Project.objects.create(
+            name="Test project",
+            working_team=Team.objects.create(name="Test team")
+        )
+        task_type = TaskType.objects.create(name="Test TaskType")
+        # ties in every ordering field but the id
+        for i in range(11):
+            Task.objects.create(
+                name=f"Task {i % 3}",
+                deadline=datetime.date(2222, 2, 22),
+                is_completed=i % 4 == 0,
+                priority=i % 2,
+                task_type=task_type,
+                project=project,
+            )
+        self.tasks = Task.objects.all()
+        self.ordered_ids = list(
+            self.tasks.order_by(*TASK_KEYSET_ORDERING).values_list(
+                "id", flat=True
+            )
+        )
+
+    def test_pages_follow_ordering(self):
+        pages = [get_keyset_page(self.tasks, 4)]
+        while pages[-1].has_next():
+            pages.append(
+                get_keyset_page(self.tasks, 4, pages[-1].next_cursor)
+            )
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertEqual(
+            [task.id for page in pages for task in page], self.ordered_ids
+        )
+        previous_pages = [pages[-1]]
+        while previous_pages[-1].has_previous():
+            previous_pages.append(get_keyset_page(
+                self.tasks, 4, previous_pages[-1].previous_cursor
+            ))
+        self.assertEqual(
+            [page.object_list for page in reversed(previous_pages)],
+            [page.object_list for page in pages]
+        )
+
+    def test_malformed_cursor_returns_first_page(self):
+        for cursor in ("not-a-cursor", "W10", "WyJuZXh0Il0"):
+            page = get_keyset_page(self.tasks, 4, cursor)
+            self.assertEqual(
+                [task.id for task in page], self.ordered_ids[:4]
+            )
+            self.assertFalse(page.has_previous())
+
+    def test_page_without_rows_returns_first_page(self):
+        cursor = get_keyset_page(self.tasks, 8).next_cursor
+        Task.objects.filter(id__in=self.ordered_ids[8:]).delete()
+        page = get_keyset_page(self.tasks, 8, cursor)
+        self.assertEqual([task.id for task in page], self.ordered_ids[:8])
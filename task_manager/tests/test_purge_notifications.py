@@ -0,0 +1,132 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from task_manager.models import (
+    Team,
+    Project,
+    TaskType,
+    Task,
+    NotificationType,
+    Notification,
+    NotificationEvent,
+)
+
+
+class PurgeNotificationsCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(username="test.user")
+        team = Team.objects.create(name="Test team")
+        project = Project.objects.create(
+            name="Test project",
+            working_team=team
+        )
+        task_type = TaskType.objects.create(name="Test TaskType")
+        self.notification_type = NotificationType.objects.create(
+            name="test_notification",
+        )
+        self.task = Task.objects.create(
+            name="Test task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=task_type,
+            project=project,
+        )
+        self.completed_task = Task.objects.create(
+            name="Completed task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=task_type,
+            project=project,
+            is_completed=True,
+        )
+        self.old_date = timezone.now() - datetime.timedelta(days=100)
+        self.old_read = self.sample_notification(
+            self.task, is_read=True, sent_at=self.old_date
+        )
+        self.old_unread = self.sample_notification(
+            self.task, sent_at=self.old_date
+        )
+        self.new_read = self.sample_notification(self.task, is_read=True)
+        self.old_on_completed_task = self.sample_notification(
+            self.completed_task, sent_at=self.old_date
+        )
+        self.new_on_completed_task = self.sample_notification(
+            self.completed_task
+        )
+        self.old_event = NotificationEvent.objects.create(
+            notification_type=self.notification_type,
+            task=self.completed_task,
+            team=team,
+            project=project,
+        )
+        NotificationEvent.objects.filter(pk=self.old_event.pk).update(
+            sent_at=self.old_date
+        )
+
+    def sample_notification(self, task: Task, sent_at=None, **kwargs):
+        notification = Notification.objects.create(
+            user=self.user,
+            notification_type=self.notification_type,
+            task=task,
+            **kwargs
+        )
+        if sent_at:
+            Notification.objects.filter(pk=notification.pk).update(
+                sent_at=sent_at
+            )
+        return notification
+
+    def test_expired_notifications_are_deleted(self):
+        call_command(
+            "purge_notifications", batch_size=1, stdout=StringIO()
+        )
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)),
+            {
+                self.old_unread.pk,
+                self.new_read.pk,
+                self.new_on_completed_task.pk
+            }
+        )
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_retention_days_can_be_overridden(self):
+        call_command(
+            "purge_notifications",
+            read_days=200,
+            completed_task_days=200,
+            stdout=StringIO()
+        )
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_dry_run_deletes_nothing(self):
+        out = StringIO()
+        call_command("purge_notifications", dry_run=True, stdout=out)
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertIn("Notification: 2 expired rows", out.getvalue())
+
+    def test_deleted_notifications_are_archived(self):
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, "archive.jsonl.gz")
+            call_command(
+                "purge_notifications",
+                archive=archive_path,
+                stdout=StringIO()
+            )
+            with gzip.open(archive_path, "rt") as archive_file:
+                rows = [json.loads(line) for line in archive_file]
+        self.assertEqual(
+            {(row["model"], row["fields"]["id"]) for row in rows},
+            {
+                ("task_manager.notification", self.old_read.pk),
+                ("task_manager.notification", self.old_on_completed_task.pk),
+                ("task_manager.notificationevent", self.old_event.pk),
+            }
+        )
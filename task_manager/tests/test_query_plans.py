@@ -0,0 +1,236 @@
+import datetime
+import itertools
+import re
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from task_manager.board import (
+    BOARD_ORDERINGS,
+    get_board_columns,
+    get_board_query,
+    get_column_segments,
+)
+from task_manager.models import Team, Project, Task, TaskType
+from task_manager.pagination import get_keyset_page, keyset_filter
+from task_manager.views import ProjectMemberTasksView, TaskInboxView
+
+MEMBER_SEEK = "project_id=? AND requester_id=?"
+# filters and sort orders of the member tasks page with the index seeking
+# the requested tasks, its constraints and whether the index gives
+# the sort order. Filters missing from the constraints, e.g. the task type,
+# are checked on the member's index range rather than the project's tasks
+REQUESTED_TASKS_INDEXES = {
+    "": ("task_requester_priority_idx", MEMBER_SEEK, True),
+    "status=open": (
+        "task_requester_priority_idx",
+        f"{MEMBER_SEEK} AND is_completed=?",
+        True
+    ),
+    "status=overdue": (
+        "task_requester_deadline_idx",
+        f"{MEMBER_SEEK} AND is_completed=? AND deadline<?",
+        False
+    ),
+    "status=completed&priority_from=3&priority_to=5": (
+        "task_requester_priority_idx",
+        f"{MEMBER_SEEK} AND is_completed=? AND priority>? AND priority<?",
+        True
+    ),
+    "deadline_from=2222-01-01&deadline_to=2222-12-31": (
+        "task_requester_priority_idx", MEMBER_SEEK, True
+    ),
+    "task_type={task_type_id}": (
+        "task_requester_priority_idx", MEMBER_SEEK, True
+    ),
+    "tag=backend": ("task_requester_priority_idx", MEMBER_SEEK, True),
+    "sort=deadline": ("task_requester_deadline_idx", MEMBER_SEEK, True),
+    "status=overdue&sort=deadline": (
+        "task_requester_deadline_idx",
+        f"{MEMBER_SEEK} AND is_completed=? AND deadline<?",
+        True
+    ),
+    "status=due_week&sort=deadline": (
+        "task_requester_deadline_idx",
+        f"{MEMBER_SEEK} AND is_completed=? AND deadline>? AND deadline<?",
+        True
+    ),
+    "sort=name": ("task_requester_name_idx", MEMBER_SEEK, True),
+}
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+class MemberTasksQueryPlanTests(TestCase):
+    def setUp(self) -> None:
+        self.member = get_user_model().objects.create(username="member")
+        team = Team.objects.create(name="Test team")
+        team.members.add(self.member)
+        self.project = Project.objects.create(
+            name="Test project", working_team=team
+        )
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+        task = Task.objects.create(
+            name="Test task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+            requester=self.member,
+        )
+        task.assignees.add(self.member)
+        task.tags.add("backend")
+
+    def get_plan(self, query: str, tab: str) -> str:
+        view = ProjectMemberTasksView()
+        view.setup(
+            RequestFactory().get(f"/?{query}"),
+            team_slug=self.project.working_team.slug,
+            project_slug=self.project.slug,
+            user_slug=self.member.username,
+        )
+        return view.get_tab_tasks(tab).order_by(
+            *view.get_filter_form().get_ordering()
+        ).explain()
+
+    def test_requested_tasks_are_index_driven(self):
+        for query, (index, seek, is_ordered) in (
+                REQUESTED_TASKS_INDEXES.items()
+        ):
+            query = query.format(task_type_id=self.task_type.id)
+            with self.subTest(query=query):
+                plan = self.get_plan(query, "requested")
+                self.assertIn(
+                    f"SEARCH task_manager_task USING INDEX {index} ({seek})",
+                    plan
+                )
+                self.assertNotIn("SCAN task_manager_task", plan)
+                if is_ordered:
+                    self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_assigned_tasks_are_driven_by_assignees_index(self):
+        # only the member's assigned tasks are sorted
+        for query in REQUESTED_TASKS_INDEXES:
+            query = query.format(task_type_id=self.task_type.id)
+            with self.subTest(query=query):
+                plan = self.get_plan(query, "assigned")
+                self.assertIn(
+                    "SEARCH U0 USING INDEX "
+                    "task_manager_task_assignees_worker_id",
+                    plan
+                )
+                self.assertRegex(
+                    plan,
+                    r"SEARCH task_manager_task USING (INTEGER PRIMARY KEY"
+                    r"|INDEX \w+ \(\w+=\? AND rowid=\?\))"
+                )
+                self.assertNotIn("task_project_", plan)
+                self.assertNotIn("SCAN", plan)
+
+    def test_member_task_counts_seek_the_member_tasks(self):
+        for query in ("", "status=open&tag=backend"):
+            view = ProjectMemberTasksView()
+            view.setup(
+                RequestFactory().get(f"/?{query}"),
+                team_slug=self.project.working_team.slug,
+                project_slug=self.project.slug,
+                user_slug=self.member.username,
+            )
+            view.get_object()
+            with CaptureQueriesContext(connection) as queries:
+                counts = view.get_task_counts()
+            self.assertEqual(counts, {"assigned": 1, "requested": 1})
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"EXPLAIN QUERY PLAN {queries[-1]['sql']}"
+                )
+                plan = "\n".join(row[-1] for row in cursor.fetchall())
+            with self.subTest(query=query):
+                self.assertIn(
+                    "USING INDEX task_manager_task_assignees_worker_id", plan
+                )
+                self.assertRegex(
+                    plan,
+                    r"INDEX task_requester_\w+ \(project_id=\? "
+                    r"AND requester_id=\?"
+                )
+                self.assertNotIn("task_project_", plan)
+                self.assertNotIn("SCAN", plan)
+
+    def test_task_inbox_is_driven_by_assignees_index(self):
+        plans = []
+
+        def explain_page(tasks, per_page, cursor, ordering):
+            plans.append(tasks.order_by(*ordering).explain())
+            return get_keyset_page(tasks, per_page, cursor, ordering)
+
+        for query in ("", "status=overdue", "status=due_week&sort=deadline"):
+            request = RequestFactory().get(f"/?{query}")
+            request.user = self.member
+            view = TaskInboxView()
+            view.setup(request)
+            with patch("task_manager.views.get_keyset_page", explain_page):
+                view.get_context_data()
+        self.assertEqual(len(plans), 3)
+        for plan in plans:
+            self.assertIn(
+                "SEARCH task_manager_task_assignees USING INDEX "
+                "task_manager_task_assignees_worker_id",
+                plan
+            )
+            self.assertIn(
+                "SEARCH task_manager_task USING INTEGER PRIMARY KEY", plan
+            )
+            self.assertNotIn("SCAN", plan)
+
+    def test_board_columns_are_index_driven(self):
+        task = Task.objects.get()
+        for grouping, ordering in BOARD_ORDERINGS.items():
+            values = [getattr(task, field.lstrip("-")) for field in ordering]
+            for column, (_, condition) in get_board_columns(grouping).items():
+                tasks = Task.objects.filter(condition, project=self.project)
+                for segment, (page, page_filter) in itertools.product(
+                        get_column_segments(tasks, grouping),
+                        (
+                            ("first", Q()),
+                            ("next", keyset_filter(ordering, values)),
+                        )
+                ):
+                    with self.subTest(column=column, page=page):
+                        plan = segment.filter(page_filter).order_by(
+                            *ordering
+                        ).explain()
+                        self.assertRegex(
+                            plan,
+                            r"INDEX task_project_\w+ \(project_id=\? "
+                            r"AND is_completed=\?"
+                        )
+                        self.assertNotIn("SCAN task_manager_task", plan)
+                        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_board_selects_every_segment_by_an_index_range(self):
+        tasks = Task.objects.filter(project=self.project)
+        for grouping in BOARD_ORDERINGS:
+            sql, params = get_board_query(tasks, grouping, 20)
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = "\n".join(row[-1] for row in cursor.fetchall())
+            segments_count = sum(
+                len(get_column_segments(tasks, grouping))
+                for _ in get_board_columns(grouping)
+            )
+            with self.subTest(grouping=grouping):
+                self.assertEqual(
+                    len(re.findall(
+                        r"SEARCH task_manager_task USING \w+ ?INDEX "
+                        r"task_project_\w+ \(project_id=\? "
+                        r"AND is_completed=\?",
+                        plan
+                    )),
+                    segments_count
+                )
+                self.assertNotIn("SCAN task_manager_task", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
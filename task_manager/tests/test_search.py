@@ -0,0 +1,135 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from taggit.models import Tag
+
+from task_manager.models import Team, Project, Task, TaskType
+from task_manager.search import search_tasks, rebuild_task_search_index
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self) -> None:
+        self.team = Team.objects.create(name="Test team")
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+
+    def create_task(self, name: str, description: str = "", tags=()):
+        task = Task.objects.create(
+            name=name,
+            description=description,
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=self.project,
+        )
+        task.tags.add(*tags)
+        return task
+
+    def search(self, text: str, team_ids=None, per_page: int = 10) -> list:
+        if team_ids is None:
+            team_ids = [self.team.id]
+        return list(search_tasks(text, team_ids, per_page))
+
+    def test_search_matches_name_description_and_tags_by_prefix(self):
+        by_name = self.create_task("Fix login form")
+        by_description = self.create_task(
+            "Style", "<p>The <b>login</b> button is misaligned</p>"
+        )
+        by_tag = self.create_task("Session timeout", tags=["logins"])
+        self.create_task("Unrelated")
+        self.assertEqual(
+            set(self.search("LOG")), {by_name, by_description, by_tag}
+        )
+        self.assertEqual(self.search("login form"), [by_name])
+        self.assertEqual(self.search("b"), [by_description])
+        self.assertEqual(self.search("  "), [])
+
+    def test_name_matches_rank_above_description_matches(self):
+        by_description = self.create_task("Style", "Cache the report")
+        by_name = self.create_task("Report")
+        results = self.search("report")
+        self.assertEqual(results, [by_name, by_description])
+        self.assertLess(results[0].search_rank, results[1].search_rank)
+
+    def test_search_is_scoped_to_teams(self):
+        task = self.create_task("Scoped task")
+        other_team = Team.objects.create(name="Other team")
+        self.assertEqual(self.search("scoped", [other_team.id]), [])
+        self.assertEqual(self.search("scoped", []), [])
+        self.assertEqual(
+            self.search("scoped", [other_team.id, self.team.id]), [task]
+        )
+        self.project.working_team = other_team
+        self.project.save()
+        self.assertEqual(self.search("scoped"), [])
+        self.assertEqual(self.search("scoped", [other_team.id]), [task])
+
+    def test_index_follows_task_and_tag_changes(self):
+        task = self.create_task("Old name", tags=["backend"])
+        task.name = "New name"
+        task.save()
+        self.assertEqual(self.search("old"), [])
+        self.assertEqual(self.search("new"), [task])
+        task.tags.remove("backend")
+        self.assertEqual(self.search("backend"), [])
+        task.tags.add("frontend")
+        self.assertEqual(self.search("frontend"), [task])
+        tag = Tag.objects.get(name="frontend")
+        tag.name = "design"
+        tag.save()
+        self.assertEqual(self.search("frontend"), [])
+        self.assertEqual(self.search("design"), [task])
+        tag.delete()
+        self.assertEqual(self.search("design"), [])
+        task.delete()
+        self.assertEqual(self.search("new"), [])
+
+    def test_index_follows_project_deletion(self):
+        self.create_task("Deleted task")
+        self.project.delete()
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        task = self.create_task("Other task")
+        self.assertEqual(self.search("task"), [task])
+        self.assertEqual(self.search("deleted"), [])
+
+    def test_pages_follow_ranking(self):
+        for i in range(7):
+            self.create_task(f"Task {i}", "task " * (i % 3))
+        ordered = self.search("task", per_page=10)
+        pages = [search_tasks("task", [self.team.id], 3)]
+        while pages[-1].has_next():
+            pages.append(search_tasks(
+                "task", [self.team.id], 3, pages[-1].next_cursor
+            ))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(
+            [task for page in pages for task in page], ordered
+        )
+        previous_page = search_tasks(
+            "task", [self.team.id], 3, pages[-1].previous_cursor
+        )
+        self.assertEqual(previous_page.object_list, pages[1].object_list)
+        self.assertTrue(previous_page.has_previous())
+
+    def test_malformed_cursor_returns_first_page(self):
+        tasks = [self.create_task(f"Task {i}") for i in range(3)]
+        for cursor in ("not-a-cursor", "W10", "WyJuZXh0IiwgIiIsIDEsIDJd"):
+            page = search_tasks("task", [self.team.id], 2, cursor)
+            self.assertEqual(len(page), 2)
+            self.assertFalse(page.has_previous())
+            self.assertTrue(set(page).issubset(tasks))
+
+    def test_rebuild_index(self):
+        task = self.create_task("Bulk task")
+        Task.objects.filter(pk=task.pk).update(name="Renamed in bulk")
+        self.assertEqual(self.search("renamed"), [])
+        self.assertEqual(rebuild_task_search_index(), 1)
+        self.assertEqual(self.search("renamed"), [task])
+        output = StringIO()
+        call_command("rebuild_task_search_index", stdout=output)
+        self.assertEqual(output.getvalue().strip(), "1 tasks indexed")
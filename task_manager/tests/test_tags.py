@@ -0,0 +1,183 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from taggit.models import Tag
+
+from task_manager.forms import MemberTasksFilterForm, TagAutocompleteWidget
+from task_manager.models import (
+    Team,
+    Project,
+    Task,
+    TaskType,
+    ProjectTagCount,
+    TeamTagCount,
+)
+from task_manager.tags import (
+    get_project_tag_counts,
+    get_teams_tag_counts,
+    rebuild_tag_counts,
+)
+
+
+class TagCountsTests(TestCase):
+    def setUp(self) -> None:
+        self.team = Team.objects.create(name="Test team")
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+
+    def create_task(self, *tags, project: Project = None) -> Task:
+        task = Task.objects.create(
+            name="Test task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=project or self.project,
+        )
+        task.tags.add(*tags)
+        return task
+
+    def get_counts(self) -> dict:
+        """
+        :returns: {"projects": {(project_id, tag_name): count},
+        "teams": {(team_id, tag_name): count}} without zero counters
+        """
+        return {
+            "projects": {
+                (project_id, tag): count
+                for project_id, tag, count in ProjectTagCount.objects.filter(
+                    tasks_count__gt=0
+                ).values_list("project_id", "tag__name", "tasks_count")
+            },
+            "teams": {
+                (team_id, tag): count
+                for team_id, tag, count in TeamTagCount.objects.filter(
+                    tasks_count__gt=0
+                ).values_list("team_id", "tag__name", "tasks_count")
+            },
+        }
+
+    def assert_counts(self, project_counts: dict, team_counts: dict):
+        counts = self.get_counts()
+        self.assertEqual(counts["projects"], project_counts)
+        self.assertEqual(counts["teams"], team_counts)
+        rebuild_tag_counts()
+        self.assertEqual(self.get_counts(), counts)
+
+    def test_counters_follow_tag_changes(self):
+        first_task = self.create_task("backend", "api")
+        second_task = self.create_task("backend")
+        project, team = self.project.id, self.team.id
+        self.assert_counts(
+            {(project, "backend"): 2, (project, "api"): 1},
+            {(team, "backend"): 2, (team, "api"): 1},
+        )
+        first_task.tags.set(["api", "frontend"])
+        second_task.tags.remove("backend")
+        self.assert_counts(
+            {(project, "api"): 1, (project, "frontend"): 1},
+            {(team, "api"): 1, (team, "frontend"): 1},
+        )
+        first_task.tags.clear()
+        self.assert_counts({}, {})
+
+    def test_counters_follow_task_and_project_moves(self):
+        task = self.create_task("backend")
+        other_team = Team.objects.create(name="Other team")
+        other_project = Project.objects.create(
+            name="Other project", working_team=other_team
+        )
+        self.create_task("backend", project=other_project)
+        task.project = other_project
+        task.save()
+        self.assert_counts(
+            {(other_project.id, "backend"): 2},
+            {(other_team.id, "backend"): 2},
+        )
+        other_project.working_team = self.team
+        other_project.save()
+        self.assert_counts(
+            {(other_project.id, "backend"): 2},
+            {(self.team.id, "backend"): 2},
+        )
+
+    def test_counters_follow_deletions(self):
+        task = self.create_task("backend", "api")
+        self.create_task("backend")
+        task.delete()
+        self.assert_counts(
+            {(self.project.id, "backend"): 1},
+            {(self.team.id, "backend"): 1},
+        )
+        Tag.objects.get(name="backend").delete()
+        self.assert_counts({}, {})
+
+    def test_counters_follow_project_and_team_deletions(self):
+        other_project = Project.objects.create(
+            name="Other project", working_team=self.team
+        )
+        self.create_task("backend", project=other_project)
+        self.create_task("backend", "api")
+        self.project.delete()
+        self.assert_counts(
+            {(other_project.id, "backend"): 1},
+            {(self.team.id, "backend"): 1},
+        )
+        self.team.delete()
+        self.assert_counts({}, {})
+
+    def test_project_deletion_queries_dont_depend_on_tasks(self):
+        queries = []
+        for tasks_count in (1, 5):
+            project = Project.objects.create(
+                name=f"Project of {tasks_count}", working_team=self.team
+            )
+            for _ in range(tasks_count):
+                self.create_task("backend", project=project)
+            with CaptureQueriesContext(connection) as context:
+                project.delete()
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_popular_tags_are_ordered_by_counts(self):
+        self.create_task("api", "backend")
+        self.create_task("backend")
+        other_team = Team.objects.create(name="Other team")
+        self.create_task("api", "docs", project=Project.objects.create(
+            name="Other project", working_team=other_team
+        ))
+        self.assertEqual(
+            get_project_tag_counts(self.project.id),
+            [("backend", "backend", 2), ("api", "api", 1)]
+        )
+        self.assertEqual(
+            get_teams_tag_counts([self.team.id, other_team.id]),
+            [("api", "api", 2), ("backend", "backend", 2),
+             ("docs", "docs", 1)]
+        )
+        with self.assertNumQueries(0):
+            MemberTasksFilterForm().set_tag_choices(
+                lambda: get_project_tag_counts(self.project.id)
+            )
+
+    def test_tag_filter_lists_popular_and_selected_tags(self):
+        self.create_task("backend")
+        form = MemberTasksFilterForm({"tag": "archived"})
+        form.set_tag_choices(lambda: get_project_tag_counts(self.project.id))
+        self.assertEqual(
+            list(form.fields["tag"].widget.choices),
+            [("", "Any"), ("backend", "backend (1)"),
+             ("archived", "archived")]
+        )
+
+    def test_tag_autocomplete_ranks_team_tags_first(self):
+        self.create_task("tag b")
+        self.create_task("tag b", "tag c")
+        Tag.objects.create(name="tag a")
+        widget = TagAutocompleteWidget(model=Tag, team_id=self.team.id)
+        tags = widget.filter_queryset(None, "tag", Tag.objects.all())
+        self.assertEqual(
+            [tag.name for tag in tags], ["tag b", "tag c", "tag a"]
+        )
@@ -0,0 +1,284 @@
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.models import (
+    Team,
+    Project,
+    Task,
+    TaskType,
+    NotificationType,
+    Notification,
+    NotificationEvent,
+    NotificationReadState,
+)
+
+TEAM_LIST_URL = reverse("api_v1:team-list")
+NOTIFICATION_LIST_URL = reverse("api_v1:notification-list")
+# session, user, project, page of tasks, tags, assignees
+TASK_LIST_QUERIES = 6
+
+
+class ApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test.user"
+        )
+        self.team = Team.objects.create(name="Test team", founder=self.user)
+        self.team.members.add(self.user)
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+        self.project_kwargs = {
+            "team_slug": self.team.slug,
+            "project_slug": self.project.slug,
+        }
+        self.task_list_url = reverse(
+            "api_v1:task-list", kwargs=self.project_kwargs
+        )
+        self.task_batch_url = reverse(
+            "api_v1:task-batch", kwargs=self.project_kwargs
+        )
+        self.client.force_login(self.user)
+
+    def create_task(self, name: str, **kwargs) -> Task:
+        return Task.objects.create(
+            name=name,
+            deadline=kwargs.pop("deadline", datetime.date(2222, 2, 22)),
+            task_type=self.task_type,
+            project=self.project,
+            **kwargs
+        )
+
+    def get_json(self, url: str, data: dict = None, **headers):
+        response = self.client.get(url, data, headers=headers)
+        content = (
+            b"".join(response.streaming_content) if response.streaming
+            else response.content
+        )
+        return response, json.loads(content) if content else None
+
+    def test_anonymous_users_are_unauthorized(self):
+        self.client.logout()
+        response, data = self.get_json(self.task_list_url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(data, {"detail": "Authentication required"})
+
+    def test_outsiders_are_forbidden(self):
+        outsider = get_user_model().objects.create_user(username="outsider")
+        self.client.force_login(outsider)
+        response, data = self.get_json(self.task_list_url)
+        self.assertEqual(response.status_code, 403)
+        response, data = self.get_json(TEAM_LIST_URL)
+        self.assertEqual(data, {"results": [], "next": None})
+
+    def test_unknown_objects_are_not_found(self):
+        response, data = self.get_json(
+            reverse("api_v1:task-detail", kwargs={
+                **self.project_kwargs, "task_id": 0
+            })
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(data, {"detail": "Not found"})
+
+    def test_team_list_with_members(self):
+        Team.objects.create(name="Other team")
+        response, data = self.get_json(
+            TEAM_LIST_URL, {"fields": "slug,members"}
+        )
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(data, {
+            "results": [{"slug": self.team.slug, "members": ["test.user"]}],
+            "next": None,
+        })
+
+    def test_task_fields_and_relations(self):
+        task = self.create_task("Test task", requester=self.user)
+        task.tags.add("backend")
+        task.assignees.add(self.user)
+        response, data = self.get_json(
+            reverse("api_v1:task-detail", kwargs={
+                **self.project_kwargs, "task_id": task.id
+            })
+        )
+        task.refresh_from_db()
+        self.assertEqual(data, {
+            "id": task.id,
+            "name": "Test task",
+            "description": "",
+            "deadline": "2222-02-22",
+            "is_completed": False,
+            "priority": Task.Priority.UNKNOWN,
+            "task_type": "Test TaskType",
+            "project": self.project.slug,
+            "requester": "test.user",
+            "updated_at": data["updated_at"],
+            "tags": ["backend"],
+            "assignees": ["test.user"],
+        })
+
+    def test_invalid_parameters_are_bad_requests(self):
+        for params in (
+                {"fields": "name,secret"},
+                {"limit": "many"},
+                {"limit": 1000},
+                {"sort": "random"},
+                {"cursor": "forged"},
+        ):
+            with self.subTest(params=params):
+                response, data = self.get_json(self.task_list_url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", data)
+
+    def test_cursor_pages_through_tasks(self):
+        for day in range(5):
+            self.create_task(
+                f"Task {day}", deadline=datetime.date(2222, 2, 22 - day)
+            )
+        names, params = [], {"sort": "deadline", "limit": 2, "fields": "name"}
+        while True:
+            response, data = self.get_json(self.task_list_url, params)
+            self.assertLessEqual(len(data["results"]), 2)
+            names += [task["name"] for task in data["results"]]
+            if data["next"] is None:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(names, [f"Task {day}" for day in range(4, -1, -1)])
+
+    def test_task_list_queries_dont_depend_on_tasks(self):
+        for number in range(20):
+            task = self.create_task(f"Task {number}")
+            task.tags.add(f"tag{number}")
+            task.assignees.add(self.user)
+        # caches the ETag versions and the team ids
+        self.get_json(self.task_list_url)
+        with self.assertNumQueries(TASK_LIST_QUERIES):
+            self.get_json(self.task_list_url, {"limit": 1})
+        with self.assertNumQueries(TASK_LIST_QUERIES):
+            self.get_json(self.task_list_url, {"limit": 20})
+
+    def test_unchanged_tasks_are_not_modified(self):
+        task = self.create_task("Test task")
+        response, _ = self.get_json(self.task_list_url)
+        etag = response["ETag"]
+        response, _ = self.get_json(self.task_list_url, If_None_Match=etag)
+        self.assertEqual(response.status_code, 304)
+        task.name = "Renamed task"
+        task.save()
+        response, data = self.get_json(
+            self.task_list_url, If_None_Match=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["results"][0]["name"], "Renamed task")
+
+    def test_task_list_is_modified_by_tag_changes(self):
+        task = self.create_task("Test task")
+        params = {"fields": "name,tags"}
+        response, _ = self.get_json(self.task_list_url, params)
+        etag = response["ETag"]
+        task.tags.add("backend")
+        response, data = self.get_json(
+            self.task_list_url, params, If_None_Match=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["results"][0]["tags"], ["backend"])
+
+    def test_notifications_are_merged_with_events(self):
+        task = self.create_task("Test task")
+        task.assignees.add(self.user)
+        notification_type = NotificationType.objects.create(
+            name="test", message_template="{task.name}"
+        )
+        Notification.objects.all().delete()
+        NotificationEvent.objects.all().delete()
+        notification = Notification.objects.create(
+            user=self.user, notification_type=notification_type, task=task
+        )
+        events = [
+            NotificationEvent.objects.create(
+                notification_type=notification_type,
+                task=task,
+                team=self.team,
+                project=self.project
+            )
+            for _ in range(2)
+        ]
+        for event in events:
+            event.recipients.add(self.user)
+        read_state = NotificationReadState.for_user(self.user)
+        read_state.mark_event_as_read(events[0].id)
+        rows, params = [], {"limit": 2, "fields": "id,kind,is_read"}
+        while True:
+            response, data = self.get_json(NOTIFICATION_LIST_URL, params)
+            rows += data["results"]
+            if data["next"] is None:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(rows, [
+            {"id": events[1].id, "kind": "event", "is_read": False},
+            {"id": events[0].id, "kind": "event", "is_read": True},
+            {"id": notification.id, "kind": "notification", "is_read": False},
+        ])
+
+    def post_batch(self, tasks) -> tuple:
+        response = self.client.post(
+            self.task_batch_url,
+            json.dumps({"tasks": tasks}),
+            content_type="application/json"
+        )
+        return response, json.loads(response.content)
+
+    def test_task_batch_creates_and_updates_tasks(self):
+        task = self.create_task("Existing task", requester=self.user)
+        response, data = self.post_batch([
+            {"name": "New task", "deadline": "2222-02-22",
+             "task_type": "Test TaskType", "assignees": ["test.user"]},
+            {"id": task.id, "is_completed": True, "tags": ["done"]},
+        ])
+        self.assertEqual(response.status_code, 200)
+        new_task = Task.objects.get(name="New task")
+        self.assertEqual(data, {"ids": [new_task.id, task.id]})
+        self.assertEqual(new_task.requester, self.user)
+        task.refresh_from_db()
+        self.assertTrue(task.is_completed)
+        self.assertEqual(list(task.tags.names()), ["done"])
+
+    def test_invalid_task_batch_is_a_bad_request(self):
+        response, data = self.post_batch([
+            {"name": "New task", "deadline": "someday"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            sorted(data["errors"]["0"]), ["deadline", "task_type"]
+        )
+        response = self.client.post(
+            self.task_batch_url, "{", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+    def test_task_batch_cant_update_tasks_of_other_requesters(self):
+        task = self.create_task("Other's task")
+        response, data = self.post_batch([
+            {"id": task.id, "is_completed": True},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(data["errors"]["0"]), ["id"])
+        task.refresh_from_db()
+        self.assertFalse(task.is_completed)
+
+    def test_outsiders_cant_save_task_batches(self):
+        outsider = get_user_model().objects.create_user(username="outsider")
+        self.client.force_login(outsider)
+        response, data = self.post_batch([
+            {"name": "New task", "deadline": "2222-02-22",
+             "task_type": "Test TaskType"},
+        ])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,102 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.handlers import publish_notification
+from task_manager.models import (
+    Team,
+    Project,
+    TaskType,
+    Task,
+    Notification,
+    NotificationType,
+)
+
+TEAM_DETAIL_URL_NAME = "task_manager:team-detail"
+TASK_DETAIL_URL_NAME = "task_manager:task-detail"
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(username="test.user")
+        self.team = Team.objects.create(name="Test team", founder=self.user)
+        self.team.members.add(self.user)
+        self.project = Project.objects.create(
+            name="Test project",
+            working_team=self.team
+        )
+        self.task = Task.objects.create(
+            name="Test task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=TaskType.objects.create(name="Test TaskType"),
+            project=self.project,
+            requester=self.user,
+        )
+        self.task_url = reverse(
+            TASK_DETAIL_URL_NAME,
+            kwargs={
+                "team_slug": self.team.slug,
+                "project_slug": self.project.slug,
+                "task_id": self.task.id,
+            }
+        )
+        self.team_url = reverse(
+            TEAM_DETAIL_URL_NAME, kwargs={"team_slug": self.team.slug}
+        )
+        self.client.force_login(self.user)
+
+    def assert_not_modified(self, url: str, etag: str, not_modified=True):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304 if not_modified else 200)
+
+    def test_unchanged_task_page_is_not_modified(self):
+        etag = self.client.get(self.task_url)["ETag"]
+        self.assert_not_modified(self.task_url, etag)
+
+    def test_task_change_modifies_task_and_team_pages(self):
+        task_etag = self.client.get(self.task_url)["ETag"]
+        team_etag = self.client.get(self.team_url)["ETag"]
+        self.task.name = "Renamed task"
+        self.task.save()
+        self.assert_not_modified(self.task_url, task_etag, False)
+        self.assert_not_modified(self.team_url, team_etag, False)
+
+    def test_task_change_updates_project_and_team(self):
+        self.task.assignees.add(self.user)
+        self.project.refresh_from_db()
+        self.team.refresh_from_db()
+        self.task.refresh_from_db()
+        self.assertGreaterEqual(self.project.updated_at, self.task.updated_at)
+        self.assertGreaterEqual(self.team.updated_at, self.task.updated_at)
+
+    def test_membership_change_modifies_team_page(self):
+        etag = self.client.get(self.team_url)["ETag"]
+        self.team.members.add(
+            get_user_model().objects.create(username="new.member")
+        )
+        self.assert_not_modified(self.team_url, etag, False)
+
+    def test_notification_changes_modify_page(self):
+        etag = self.client.get(self.task_url)["ETag"]
+        notification = Notification.objects.create(
+            user=self.user,
+            notification_type=NotificationType.objects.create(
+                name="test", message_template="Test"
+            ),
+            task=self.task
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_notification(self.user.id, notification)
+        self.assert_not_modified(self.task_url, etag, False)
+        etag = self.client.get(self.task_url)["ETag"]
+        notification.mark_as_read()
+        self.assert_not_modified(self.task_url, etag, False)
+
+    def test_etag_depends_on_user(self):
+        etag = self.client.get(self.team_url)["ETag"]
+        self.client.force_login(
+            get_user_model().objects.create(username="another.user")
+        )
+        self.assert_not_modified(self.team_url, etag, False)
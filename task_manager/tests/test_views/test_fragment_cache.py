@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.models import Team, Project
+
+TEAM_DETAIL_URL_NAME = "task_manager:team-detail"
+PROJECT_DETAIL_URL_NAME = "task_manager:project-detail"
+MEMBERS_QUERY = 'INNER JOIN "task_manager_team_members"'
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create(
+            username="test.user", first_name="Test", last_name="User"
+        )
+        self.member = get_user_model().objects.create(
+            username="member", first_name="Cached", last_name="Member"
+        )
+        self.team = Team.objects.create(name="Test team", founder=self.user)
+        self.team.members.add(self.user, self.member)
+        self.project = Project.objects.create(
+            name="Test project",
+            working_team=self.team
+        )
+        self.team_url = reverse(
+            TEAM_DETAIL_URL_NAME, kwargs={"team_slug": self.team.slug}
+        )
+        self.project_url = reverse(
+            PROJECT_DETAIL_URL_NAME,
+            kwargs={
+                "team_slug": self.team.slug,
+                "project_slug": self.project.slug,
+            }
+        )
+        self.client.force_login(self.user)
+
+    def get_queries(self, url: str) -> str:
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        return " ".join(query["sql"] for query in context.captured_queries)
+
+    def test_members_are_rendered_from_cache(self):
+        self.assertIn(MEMBERS_QUERY, self.get_queries(self.project_url))
+        queries = self.get_queries(self.project_url)
+        self.assertNotIn(MEMBERS_QUERY, queries)
+        response = self.client.get(self.project_url)
+        self.assertContains(response, "Cached")
+        self.assertContains(response, f"#project-member-{self.user.pk} ")
+
+    def test_you_badge_is_rendered_per_user(self):
+        self.client.get(self.project_url)
+        self.client.force_login(self.member)
+        response = self.client.get(self.project_url)
+        self.assertContains(response, f"#project-member-{self.member.pk} ")
+
+    def test_membership_change_refreshes_members(self):
+        self.client.get(self.project_url)
+        self.team.members.remove(self.member)
+        response = self.client.get(self.project_url)
+        self.assertNotContains(response, "Cached")
+
+    def test_worker_change_refreshes_members(self):
+        self.client.get(self.team_url)
+        self.member.first_name = "Renamed"
+        self.member.save()
+        response = self.client.get(self.team_url)
+        self.assertContains(response, "Renamed")
+
+    def test_team_lists_are_rendered_from_cache(self):
+        self.assertIn(MEMBERS_QUERY, self.get_queries(self.team_url))
+        queries = self.get_queries(self.team_url)
+        self.assertNotIn(MEMBERS_QUERY, queries)
+        self.assertNotIn('FROM "task_manager_project" WHERE', queries)
+
+    def test_project_change_refreshes_projects(self):
+        self.client.get(self.team_url)
+        self.project.name = "Renamed project"
+        self.project.save()
+        response = self.client.get(self.team_url)
+        self.assertContains(response, "Renamed project")
@@ -1,8 +1,10 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from django.urls import reverse
 
-# from task_manager.models import Team, Project, Worker
+from task_manager.models import Team, Project, Worker
 from .utils import assert_url_access
 
 
@@ -10,19 +12,42 @@ HOME_PAGE_URL = reverse("index")
 
 
 class PublicHomePageTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.founder = get_user_model().objects.create(
+            username="test.founder"
+        )
+        team = Team.objects.create(name="Test team", founder=self.founder)
+        Project.objects.create(name="Test project", working_team=team)
+
     def test_homepage_using_template(self):
         response = assert_url_access(self, HOME_PAGE_URL)
         self.assertTemplateUsed(response, "task_manager/index.html")
 
-    # def test_homepage_context_data_consists_stats(self):
-    #     response = self.client.get(HOME_PAGE_URL)
-    #     context_data = response.context
-    #     teams_count = Team.objects.count()
-    #     projects_count = Project.objects.count()
-    #     worker_count = Worker.objects.count()
-    #     self.assertIn("teams_count", context_data)
-    #     self.assertIn("projects_count", context_data)
-    #     self.assertIn("workers_count", context_data)
-    #     self.assertEquals(context_data["teams_count"], teams_count)
-    #     self.assertEquals(context_data["projects_count"], projects_count)
-    #     self.assertEquals(context_data["workers_count"], worker_count)
+    def test_homepage_context_data_consists_stats(self):
+        response = self.client.get(HOME_PAGE_URL)
+        stats = response.context["stats"]
+        self.assertEquals(stats["teams_count"], Team.objects.count())
+        self.assertEquals(stats["projects_count"], Project.objects.count())
+        self.assertEquals(stats["workers_count"], Worker.objects.count())
+
+    def test_homepage_is_cached_for_anonymous_user(self):
+        response = self.client.get(HOME_PAGE_URL)
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(HOME_PAGE_URL)
+        self.assertEquals(cached_response.content, response.content)
+        self.assertEquals(cached_response["ETag"], response["ETag"])
+        self.assertIn("public", cached_response["Cache-Control"])
+
+    def test_homepage_not_modified_for_matching_etag(self):
+        etag = self.client.get(HOME_PAGE_URL)["ETag"]
+        response = self.client.get(HOME_PAGE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+
+    @override_settings(SITE_STATS_REFRESH_INTERVAL=0)
+    def test_homepage_refreshes_stale_stats(self):
+        self.client.get(HOME_PAGE_URL)
+        Team.objects.create(name="Another team")
+        self.client.force_login(self.founder)
+        response = self.client.get(HOME_PAGE_URL)
+        self.assertEquals(response.context["stats"]["teams_count"], 2)
@@ -0,0 +1,224 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from task_manager.models import (
+    Team,
+    Project,
+    TaskType,
+    Task,
+    NotificationType,
+    Notification,
+    NotificationEvent,
+    NotificationReadState,
+)
+from task_manager.tests.test_views.utils import assert_url_access
+
+TEAM_DETAIL_URL_NAME = "task_manager:team-detail"
+NOTIFICATION_LIST_URL = reverse("task_manager:notification-list")
+NOTIFICATION_EVENT_REDIRECT_URL_NAME = (
+    "task_manager:notification-event-redirect"
+)
+
+
+class NotificationEventsTests(TransactionTestCase):
+    def setUp(self) -> None:
+        NotificationType.objects.create(
+            name="task_updated",
+            message_template="Task \"{task.name}\" was updated",
+            delivery=NotificationType.Delivery.BROADCAST,
+        )
+        self.requester = get_user_model().objects.create(
+            username="task.requester"
+        )
+        self.user = get_user_model().objects.create(username="test.user")
+        self.another_user = get_user_model().objects.create(
+            username="another.user"
+        )
+        self.team = Team.objects.create(
+            name="Test team",
+            founder=self.requester
+        )
+        self.team.members.add(self.user, self.another_user)
+        self.project = Project.objects.create(
+            name="Test project",
+            working_team=self.team
+        )
+        task_type = TaskType.objects.create(name="Test TaskType")
+        with transaction.atomic():
+            self.task = Task.objects.create(
+                name="Test task",
+                deadline=datetime.date(2222, 2, 22),
+                task_type=task_type,
+                project=self.project,
+                requester=self.requester,
+            )
+            self.task.assignees.add(self.user, self.another_user)
+        self.task.description = "Some lorem ipsum text"
+        self.task.save()
+        self.event = NotificationEvent.objects.get(task=self.task)
+        self.client.force_login(self.user)
+
+    def test_broadcast_notification_creates_single_event(self):
+        self.assertEqual(NotificationEvent.objects.count(), 1)
+        self.assertFalse(
+            Notification.objects.filter(
+                notification_type__name="task_updated"
+            )
+        )
+        self.assertEqual(self.event.team_id, self.team.id)
+        self.assertEqual(self.event.project_id, self.project.id)
+
+    def test_per_user_notifications_are_still_created(self):
+        self.assertEqual(
+            Notification.objects.filter(
+                notification_type__name="task_created"
+            ).count(),
+            2
+        )
+
+    def test_notifications_context_merges_events(self):
+        response = assert_url_access(
+            self, TEAM_DETAIL_URL_NAME, team_slug=self.team.slug
+        )
+        notifications = response.context["notifications"]
+        self.assertIn(self.event, notifications)
+        self.assertEqual(
+            len(notifications),
+            self.user.notifications.count() + 1
+        )
+
+    def test_event_redirect_marks_event_as_read_only_for_user(self):
+        response = assert_url_access(
+            self,
+            NOTIFICATION_EVENT_REDIRECT_URL_NAME,
+            302,
+            id=self.event.id
+        )
+        self.assertRedirects(
+            response,
+            self.task.get_absolute_url(),
+            fetch_redirect_response=False
+        )
+        self.assertTrue(
+            NotificationReadState.for_user(self.user).is_event_read(
+                self.event.id
+            )
+        )
+        self.assertFalse(
+            NotificationReadState.for_user(self.another_user).is_event_read(
+                self.event.id
+            )
+        )
+        response = assert_url_access(
+            self, TEAM_DETAIL_URL_NAME, team_slug=self.team.slug
+        )
+        self.assertNotIn(self.event, response.context["notifications"])
+
+    def test_event_redirect_is_not_available_for_not_assignee(self):
+        self.client.force_login(self.requester)
+        assert_url_access(
+            self,
+            NOTIFICATION_EVENT_REDIRECT_URL_NAME,
+            404,
+            id=self.event.id
+        )
+
+    def test_notification_list_merges_events(self):
+        response = assert_url_access(self, NOTIFICATION_LIST_URL)
+        notification_list = response.context["notification_list"]
+        expected = sorted(
+            list(self.user.notifications.all()) + [self.event],
+            key=lambda notification: notification.sent_at,
+            reverse=True
+        )
+        self.assertEqual(notification_list, expected)
+        self.assertFalse(notification_list[0].is_read)
+
+    def create_events(self, count: int) -> list:
+        events = NotificationEvent.objects.bulk_create(
+            NotificationEvent(
+                notification_type=self.event.notification_type,
+                task=self.task,
+                team=self.team,
+                project=self.project
+            )
+            for _ in range(count)
+        )
+        NotificationEvent.recipients.through.objects.bulk_create(
+            NotificationEvent.recipients.through(
+                notificationevent_id=event.id, worker_id=self.user.id
+            )
+            for event in events
+        )
+        return events
+
+    def test_read_state_keeps_read_set_compact(self):
+        read_set_limit = NotificationReadState.READ_SET_LIMIT
+        events = [self.event, *self.create_events(read_set_limit + 5)]
+        read_state = NotificationReadState.for_user(self.user)
+        for event in events:
+            read_state.mark_event_as_read(event.id)
+        read_state.refresh_from_db()
+        self.assertLessEqual(len(read_state.read_event_ids), read_set_limit)
+        self.assertGreaterEqual(read_state.read_until, events[-6].id)
+        self.assertTrue(
+            all(read_state.is_event_read(event.id) for event in events)
+        )
+
+    def test_read_state_keeps_skipped_events_unread(self):
+        read_set_limit = NotificationReadState.READ_SET_LIMIT
+        events = [self.event, *self.create_events(read_set_limit + 5)]
+        skipped_event = events[10]
+        read_state = NotificationReadState.for_user(self.user)
+        for event in events:
+            if event != skipped_event:
+                read_state.mark_event_as_read(event.id)
+        read_state.refresh_from_db()
+        self.assertLessEqual(len(read_state.read_event_ids), read_set_limit)
+        self.assertFalse(read_state.is_event_read(skipped_event.id))
+        self.assertTrue(
+            all(
+                read_state.is_event_read(event.id) for event in events
+                if event != skipped_event
+            )
+        )
+
+    def test_read_set_is_capped(self):
+        read_set_limit = NotificationReadState.READ_SET_LIMIT
+        events = self.create_events(read_set_limit + 5)
+        read_state = NotificationReadState.for_user(self.user)
+        for event in events:
+            read_state.mark_event_as_read(event.id)
+        read_state.refresh_from_db()
+        self.assertLessEqual(len(read_state.read_event_ids), read_set_limit)
+        self.assertTrue(
+            all(read_state.is_event_read(event.id) for event in events)
+        )
+        # skipped before the latest reads of the read-set limit
+        self.assertTrue(read_state.is_event_read(self.event.id))
+
+    def test_events_are_kept_for_their_recipients(self):
+        new_assignee = get_user_model().objects.create(
+            username="new.assignee"
+        )
+        self.team.members.add(new_assignee)
+        self.task.assignees.add(new_assignee)
+        self.task.assignees.remove(self.user)
+        self.assertFalse(NotificationEvent.objects.for_user(new_assignee))
+        self.assertEqual(
+            list(NotificationEvent.objects.for_user(self.user)), [self.event]
+        )
+
+    def test_concurrent_marks_are_kept(self):
+        events = self.create_events(1)
+        read_state = NotificationReadState.for_user(self.user)
+        stale_read_state = NotificationReadState.for_user(self.user)
+        read_state.mark_event_as_read(self.event.id)
+        stale_read_state.mark_event_as_read(events[0].id)
+        read_state.refresh_from_db()
+        self.assertTrue(read_state.is_event_read(self.event.id))
+        self.assertTrue(read_state.is_event_read(events[0].id))
@@ -0,0 +1,38 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+from task_manager.broker import get_broker, user_channel
+
+NOTIFICATION_STREAM_URL = reverse("task_manager:notification-stream")
+
+
+@override_settings(NOTIFICATION_STREAM_ENABLED=True)
+class NotificationStreamTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(username="test.user")
+        self.async_client.force_login(self.user)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=False)
+    async def test_stream_is_disabled_without_asgi(self):
+        response = await self.async_client.get(NOTIFICATION_STREAM_URL)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_login_required(self):
+        response = await AsyncClient().get(NOTIFICATION_STREAM_URL)
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_sends_published_notifications(self):
+        response = await self.async_client.get(NOTIFICATION_STREAM_URL)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        next_event = asyncio.ensure_future(anext(stream))
+        channel = user_channel(self.user.id)
+        while channel not in get_broker().subscribers:
+            await asyncio.sleep(0)
+        get_broker().publish(channel, {"id": 1})
+        event = await asyncio.wait_for(next_event, 1)
+        self.assertEqual(event, b'event: notification\ndata: {"id": 1}\n\n')
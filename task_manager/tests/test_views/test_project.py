@@ -1,7 +1,14 @@
+import datetime
+import html
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from task_manager.models import Team, Project
+from task_manager.models import Team, Project, Task, TaskType
 from .utils import assert_url_access
 
 
@@ -9,8 +16,11 @@ PROJECT_CREATE_URL_NAME = "task_manager:project-create"
 PROJECT_DETAIL_URL_NAME = "task_manager:project-detail"
 PROJECT_LANDING_URL_NAME = "task_manager:project-landing"
 PROJECT_MEMBER_TASKS_URL_NAME = "task_manager:project-member-tasks"
+PROJECT_MEMBER_TASKS_TAB_URL_NAME = "task_manager:project-member-tasks-tab"
 PROJECT_UPDATE_URL_NAME = "task_manager:project-update"
 PROJECT_DELETE_URL_NAME = "task_manager:project-delete"
+# regardless of the number of tasks on the page
+MEMBER_TASKS_PAGE_QUERIES = 15
 
 
 class PublicProjectTests(TestCase):
@@ -56,6 +66,33 @@ class PublicProjectTests(TestCase):
         )
         self.assertTemplateUsed(response, "task_manager/project_landing.html")
 
+    def get_project_landing(self):
+        return self.client.get(reverse(
+            PROJECT_LANDING_URL_NAME,
+            kwargs={
+                "team_slug": self.team.slug,
+                "project_slug": self.project.slug,
+            }
+        ))
+
+    def test_project_landing_is_cached_for_anonymous_user(self):
+        self.get_project_landing()
+        with self.assertNumQueries(0):
+            response = self.get_project_landing()
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("ETag", response)
+
+    def test_project_landing_cache_is_invalidated(self):
+        self.get_project_landing()
+        self.project.name = "Renamed project"
+        self.project.save()
+        self.assertContains(self.get_project_landing(), "Renamed project")
+        member = get_user_model().objects.create(
+            username="new.member", first_name="Newbie"
+        )
+        self.team.members.add(member)
+        self.assertContains(self.get_project_landing(), "Newbie")
+
     def test_project_member_tasks_login_required(self):
         assert_url_access(
             self,
@@ -182,6 +219,167 @@ class TeamMemberProjectTests(TestCase):
             user_slug=self.another_member.username
         )
 
+    def create_member_tasks(self, count: int) -> None:
+        created = Task.objects.count()
+        for i in range(created, created + count):
+            task = Task.objects.create(
+                name=f"Task {i}",
+                deadline=datetime.date(2222, 2, 22),
+                task_type=TaskType.objects.create(name=f"TaskType {i}"),
+                project=self.project,
+                requester=self.another_member,
+            )
+            task.assignees.add(self.another_member)
+            task.tags.add(f"tag-{i}", "common")
+
+    def get_member_tasks_url(self, tab: str = None) -> str:
+        kwargs = {
+            "team_slug": self.team.slug,
+            "project_slug": self.project.slug,
+            "user_slug": self.another_member.username,
+        }
+        if tab:
+            return reverse(PROJECT_MEMBER_TASKS_TAB_URL_NAME, kwargs={
+                **kwargs, "tab": tab
+            })
+        return reverse(PROJECT_MEMBER_TASKS_URL_NAME, kwargs=kwargs)
+
+    def test_project_member_tasks_page_queries_are_constant(self):
+        url = self.get_member_tasks_url()
+        self.create_member_tasks(1)
+        self.client.get(url)
+        for count in (1, 12):
+            cache.clear()
+            with self.assertNumQueries(MEMBER_TASKS_PAGE_QUERIES):
+                response = self.client.get(url)
+            self.assertEqual(len(response.context["tasks_page"]), count)
+            self.create_member_tasks(11)
+
+    def test_member_tasks_page_queries_only_active_tab(self):
+        self.create_member_tasks(3)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.get_member_tasks_url())
+        task_queries = [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "task_manager_task"' in query["sql"]
+        ]
+        # the counts of both tabs and the assigned tasks page
+        self.assertEqual(len(task_queries), 2)
+        self.assertEqual(
+            response.context["task_counts"], {"assigned": 3, "requested": 3}
+        )
+        self.assertEqual(response.context["tab"], "assigned")
+        self.assertContains(
+            response, self.get_member_tasks_url("requested")
+        )
+
+    def test_member_tasks_keyset_navigation(self):
+        self.create_member_tasks(13)
+        response = self.client.get(self.get_member_tasks_url())
+        first_page = response.context["tasks_page"]
+        self.assertEqual(len(first_page), 12)
+        self.assertFalse(first_page.has_previous())
+        response = self.client.get(
+            self.get_member_tasks_url(),
+            {"tab": "assigned", "at_cursor": first_page.next_cursor}
+        )
+        last_page = response.context["tasks_page"]
+        self.assertEqual(len(last_page), 1)
+        self.assertFalse(last_page.has_next())
+        response = self.client.get(
+            self.get_member_tasks_url(),
+            {"at_cursor": last_page.previous_cursor}
+        )
+        self.assertEqual(
+            response.context["tasks_page"].object_list,
+            first_page.object_list
+        )
+
+    def test_member_tasks_numbered_pages(self):
+        self.create_member_tasks(13)
+        response = self.client.get(
+            self.get_member_tasks_url(), {"rt_page": 2}
+        )
+        self.assertEqual(response.context["tab"], "requested")
+        self.assertEqual(len(response.context["tasks_page"]), 1)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                self.get_member_tasks_url(), {"rt_page": 99}
+            )
+        self.assertEqual(response.context["tasks_page"].number, 2)
+        count_queries = [
+            query for query in context.captured_queries
+            if "COUNT(" in query["sql"]
+        ]
+        self.assertEqual(len(count_queries), 1)
+
+    def test_member_tasks_filters(self):
+        self.create_member_tasks(4)
+        tasks = list(Task.objects.order_by("id"))
+        tasks[0].is_completed = True
+        tasks[1].priority = Task.Priority.URGENT
+        tasks[2].deadline = datetime.date(2000, 1, 1)
+        tasks[3].task_type = tasks[0].task_type
+        for task in tasks:
+            task.save()
+        filters = {
+            "status=completed": [tasks[0]],
+            "status=overdue": [tasks[2]],
+            "priority_from=4": [tasks[1]],
+            "deadline_to=2001-01-01": [tasks[2]],
+            f"task_type={tasks[0].task_type_id}": [tasks[3], tasks[0]],
+            "tag=tag-1": [tasks[1]],
+            "sort=deadline&status=open": [tasks[2], tasks[1], tasks[3]],
+        }
+        for query, expected_tasks in filters.items():
+            with self.subTest(query=query):
+                response = self.client.get(
+                    f"{self.get_member_tasks_url()}?{query}"
+                )
+                self.assertEqual(
+                    list(response.context["tasks_page"]), expected_tasks
+                )
+                self.assertEqual(
+                    response.context["task_counts"]["requested"],
+                    len(expected_tasks)
+                )
+
+    def test_member_tasks_pagination_keeps_filters(self):
+        self.create_member_tasks(13)
+        response = self.client.get(
+            self.get_member_tasks_url(), {"tag": "common", "sort": "name"}
+        )
+        next_url = (
+            f"{self.get_member_tasks_url()}?tag=common&sort=name&tab=assigned"
+            f"&at_cursor={response.context['tasks_page'].next_cursor}"
+        )
+        content = html.unescape(response.content.decode())
+        self.assertIn(next_url, content)
+        self.assertIn(
+            f"{self.get_member_tasks_url('requested')}?tag=common&sort=name",
+            content
+        )
+        response = self.client.get(next_url)
+        self.assertEqual(len(response.context["tasks_page"]), 1)
+        response = self.client.get(
+            self.get_member_tasks_url(),
+            {
+                "sort": "deadline",
+                "at_cursor": response.context["tasks_page"].previous_cursor,
+            }
+        )
+        self.assertFalse(response.context["tasks_page"].has_previous())
+
+    def test_member_tasks_tab_fragment(self):
+        self.create_member_tasks(2)
+        response = self.client.get(self.get_member_tasks_url("requested"))
+        self.assertTemplateUsed(response, "includes/member_tasks_tab.html")
+        self.assertTemplateNotUsed(response, "base.html")
+        self.assertEqual(response.context["tab"], "requested")
+        self.assertEqual(len(response.context["tasks_page"]), 2)
+        response = self.client.get(self.get_member_tasks_url("unknown"))
+        self.assertEqual(response.status_code, 404)
+
     def test_discard_project_member_tasks_page_for_non_existent_member(self):
         not_involved_member = get_user_model().objects.create(
             username="not.involved.user"
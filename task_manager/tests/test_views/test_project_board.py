@@ -0,0 +1,181 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager.models import Team, Project, Task, TaskType
+from task_manager.views import ProjectBoardView, ProjectBoardColumnView
+from .utils import assert_url_access
+
+PROJECT_BOARD_URL_NAME = "task_manager:project-board"
+PROJECT_BOARD_COLUMN_URL_NAME = "task_manager:project-board-column"
+# regardless of the number of tasks
+PROJECT_BOARD_QUERIES = 13
+
+
+class ProjectBoardTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(username="test.user")
+        self.team = Team.objects.create(name="Test team")
+        self.team.members.add(self.user)
+        self.project = Project.objects.create(
+            name="Test project", working_team=self.team
+        )
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+        self.url_kwargs = {
+            "team_slug": self.team.slug,
+            "project_slug": self.project.slug,
+        }
+        self.url = reverse(PROJECT_BOARD_URL_NAME, kwargs=self.url_kwargs)
+        self.client.force_login(self.user)
+
+    def create_task(self, days: int, **kwargs) -> Task:
+        task = Task.objects.create(
+            name=kwargs.pop("name", f"Task due in {days} days"),
+            deadline=timezone.localdate() + datetime.timedelta(days=days),
+            task_type=self.task_type,
+            project=self.project,
+            **kwargs
+        )
+        task.assignees.add(self.user)
+        task.tags.add("backend")
+        return task
+
+    def get_columns(self, group: str = "status") -> dict:
+        response = self.client.get(self.url, {"group": group})
+        return {
+            column["name"]: column["page"]
+            for column in response.context["columns"]
+        }
+
+    def test_board_login_required(self):
+        self.client.logout()
+        assert_url_access(self, PROJECT_BOARD_URL_NAME, 302, **self.url_kwargs)
+
+    def test_board_forbidden_for_outsiders(self):
+        self.client.force_login(
+            get_user_model().objects.create(username="outsider")
+        )
+        assert_url_access(self, PROJECT_BOARD_URL_NAME, 403, **self.url_kwargs)
+
+    def test_status_columns(self):
+        overdue = self.create_task(-1)
+        urgent = self.create_task(3, priority=Task.Priority.URGENT)
+        later = self.create_task(1, priority=Task.Priority.LOW)
+        sooner = self.create_task(1, priority=Task.Priority.HIGH)
+        completed = self.create_task(-3, is_completed=True)
+        columns = self.get_columns()
+        self.assertEqual(list(columns), ["overdue", "open", "completed"])
+        self.assertEqual(columns["overdue"].object_list, [overdue])
+        self.assertEqual(
+            columns["open"].object_list, [sooner, later, urgent]
+        )
+        self.assertEqual(columns["completed"].object_list, [completed])
+
+    def test_priority_columns(self):
+        completed = self.create_task(-1, is_completed=True)
+        later = self.create_task(2)
+        sooner = self.create_task(1)
+        critical = self.create_task(1, priority=Task.Priority.CRITICAL)
+        columns = self.get_columns("priority")
+        self.assertEqual(
+            list(columns),
+            [str(value) for value in sorted(Task.Priority.values)[::-1]]
+        )
+        self.assertEqual(
+            columns[str(Task.Priority.UNKNOWN)].object_list,
+            [sooner, later, completed]
+        )
+        self.assertEqual(
+            columns[str(Task.Priority.CRITICAL)].object_list, [critical]
+        )
+
+    def test_column_loads_more_cards(self):
+        tasks = [self.create_task(days) for days in range(5)]
+        ProjectBoardView.column_size = 2
+        self.addCleanup(setattr, ProjectBoardView, "column_size", 20)
+        first_page = self.get_columns()["open"]
+        self.assertEqual(first_page.object_list, tasks[:2])
+        column_url = reverse(
+            PROJECT_BOARD_COLUMN_URL_NAME,
+            kwargs={**self.url_kwargs, "grouping": "status", "column": "open"}
+        )
+        response = self.client.get(
+            column_url, {"cursor": first_page.next_cursor}
+        )
+        self.assertEqual(response.context["page"].object_list, tasks[2:])
+        self.assertContains(response, tasks[2].name)
+        self.assertNotContains(response, "Load more")
+
+    def test_priority_column_loads_completed_cards_after_open_ones(self):
+        open_tasks = [self.create_task(days) for days in range(3)]
+        completed = [
+            self.create_task(days, is_completed=True) for days in range(2)
+        ]
+        for view_class in (ProjectBoardView, ProjectBoardColumnView):
+            view_class.column_size = 2
+            self.addCleanup(setattr, view_class, "column_size", 20)
+        column = str(Task.Priority.UNKNOWN)
+        first_page = self.get_columns("priority")[column]
+        self.assertEqual(first_page.object_list, open_tasks[:2])
+        column_url = reverse(PROJECT_BOARD_COLUMN_URL_NAME, kwargs={
+            **self.url_kwargs, "grouping": "priority", "column": column
+        })
+        page = self.client.get(
+            column_url, {"cursor": first_page.next_cursor}
+        ).context["page"]
+        self.assertEqual(page.object_list, [open_tasks[2], completed[0]])
+        page = self.client.get(
+            column_url, {"cursor": page.next_cursor}
+        ).context["page"]
+        self.assertEqual(page.object_list, completed[1:])
+        self.assertFalse(page.has_next())
+
+    def test_exhausted_column_loads_no_cards(self):
+        tasks = [self.create_task(days) for days in range(3)]
+        ProjectBoardView.column_size = 2
+        self.addCleanup(setattr, ProjectBoardView, "column_size", 20)
+        first_page = self.get_columns()["open"]
+        Task.objects.filter(pk=tasks[2].pk).update(is_completed=True)
+        response = self.client.get(
+            reverse(PROJECT_BOARD_COLUMN_URL_NAME, kwargs={
+                **self.url_kwargs, "grouping": "status", "column": "open"
+            }),
+            {"cursor": first_page.next_cursor}
+        )
+        self.assertEqual(response.context["page"].object_list, [])
+        self.assertNotContains(response, tasks[0].name)
+
+    def test_cards_are_overdue_by_the_columns_date(self):
+        task = self.create_task(1)
+        local_date = timezone.localdate() + datetime.timedelta(days=2)
+        with patch("django.utils.timezone.localdate", return_value=local_date):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response.context["columns"][0]["page"].object_list, [task]
+        )
+        self.assertContains(response, "board__card mb-2 border-danger")
+
+    def test_unknown_column_not_found(self):
+        for grouping, column in (("status", "lost"), ("owner", "open")):
+            assert_url_access(
+                self,
+                PROJECT_BOARD_COLUMN_URL_NAME,
+                404,
+                grouping=grouping,
+                column=column,
+                **self.url_kwargs
+            )
+
+    def test_board_queries_dont_depend_on_tasks(self):
+        for count in (1, 30):
+            for days in range(count):
+                self.create_task(days - count // 2)
+            for group in ("status", "priority"):
+                cache.clear()
+                with self.assertNumQueries(PROJECT_BOARD_QUERIES):
+                    self.client.get(self.url, {"group": group})
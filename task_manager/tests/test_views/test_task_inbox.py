@@ -0,0 +1,110 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager.models import Team, Project, Task, TaskType
+from task_manager.views import TaskInboxView
+from .utils import assert_url_access
+
+TASK_INBOX_URL_NAME = "task_manager:task-inbox"
+# regardless of the number of projects
+TASK_INBOX_QUERIES = 9
+
+
+class TaskInboxTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(username="test.user")
+        self.team = Team.objects.create(name="Test team")
+        self.team.members.add(self.user)
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+        self.url = reverse(TASK_INBOX_URL_NAME)
+        self.client.force_login(self.user)
+
+    def create_project_tasks(self, name: str, count: int, **kwargs) -> list:
+        project = Project.objects.create(name=name, working_team=self.team)
+        tasks = []
+        for i in range(count):
+            task = Task.objects.create(
+                name=f"{name} task {i}",
+                deadline=kwargs.get("deadline", datetime.date(2222, 2, 22)),
+                priority=kwargs.get("priority", Task.Priority.UNKNOWN),
+                task_type=self.task_type,
+                project=project,
+            )
+            task.assignees.add(self.user)
+            tasks.append(task)
+        return tasks
+
+    def test_inbox_login_required(self):
+        self.client.logout()
+        assert_url_access(self, TASK_INBOX_URL_NAME, 302)
+
+    def test_inbox_lists_assigned_tasks_grouped_by_project(self):
+        second_tasks = self.create_project_tasks("B project", 2)
+        first_tasks = self.create_project_tasks("A project", 1)
+        Task.objects.create(
+            name="Not assigned task",
+            deadline=datetime.date(2222, 2, 22),
+            task_type=self.task_type,
+            project=first_tasks[0].project,
+        )
+        foreign_task = self.create_project_tasks("Foreign project", 1)[0]
+        foreign_task.project.working_team = Team.objects.create(
+            name="Foreign team"
+        )
+        foreign_task.project.save()
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, "task_manager/task_inbox.html")
+        self.assertEqual(
+            list(response.context["tasks_page"]), first_tasks + second_tasks
+        )
+
+    def test_inbox_filters(self):
+        today = timezone.localdate()
+        overdue_task = self.create_project_tasks(
+            "Overdue project", 1, deadline=today - datetime.timedelta(days=1)
+        )[0]
+        due_task = self.create_project_tasks(
+            "Due project", 1, deadline=today + datetime.timedelta(days=3)
+        )[0]
+        urgent_task = self.create_project_tasks(
+            "Urgent project", 1, priority=Task.Priority.URGENT
+        )[0]
+        filters = [
+            ({"status": "overdue"}, overdue_task),
+            ({"status": "due_week"}, due_task),
+            ({"priority_from": Task.Priority.HIGH}, urgent_task),
+        ]
+        for query, task in filters:
+            with self.subTest(query=query):
+                response = self.client.get(self.url, query)
+                self.assertEqual(list(response.context["tasks_page"]), [task])
+
+    def test_inbox_queries_dont_depend_on_projects(self):
+        self.create_project_tasks("First project", 2)
+        self.client.get(self.url)
+        with self.assertNumQueries(TASK_INBOX_QUERIES):
+            self.client.get(self.url)
+        for i in range(3):
+            self.create_project_tasks(f"Project {i}", 2)
+        with self.assertNumQueries(TASK_INBOX_QUERIES):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context["tasks_page"]), 8)
+
+    @patch.object(TaskInboxView, "tasks_per_page", 2)
+    def test_inbox_keyset_navigation_across_projects(self):
+        tasks = (
+            self.create_project_tasks("A project", 3)
+            + self.create_project_tasks("B project", 2)
+        )
+        pages = [self.client.get(self.url).context["tasks_page"]]
+        while pages[-1].has_next():
+            response = self.client.get(
+                self.url, {"cursor": pages[-1].next_cursor}
+            )
+            pages.append(response.context["tasks_page"])
+        self.assertEqual([task for page in pages for task in page], tasks)
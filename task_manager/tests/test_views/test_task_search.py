@@ -0,0 +1,70 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.models import Team, Project, Task, TaskType
+from task_manager.views import TaskSearchView
+from .utils import assert_url_access
+
+TASK_SEARCH_URL_NAME = "task_manager:task-search"
+
+
+class TaskSearchViewTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(username="test.user")
+        self.team = Team.objects.create(name="Test team")
+        self.team.members.add(self.user)
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+        self.url = reverse(TASK_SEARCH_URL_NAME)
+        self.client.force_login(self.user)
+
+    def create_tasks(self, team: Team, count: int) -> list:
+        project = Project.objects.create(
+            name=f"{team.name} project", working_team=team
+        )
+        return [
+            Task.objects.create(
+                name=f"Searched task {i}",
+                deadline=datetime.date(2222, 2, 22),
+                task_type=self.task_type,
+                project=project,
+            )
+            for i in range(count)
+        ]
+
+    def test_search_login_required(self):
+        self.client.logout()
+        assert_url_access(self, TASK_SEARCH_URL_NAME, 302)
+
+    def test_search_lists_tasks_of_accessible_teams(self):
+        tasks = self.create_tasks(self.team, 2)
+        foreign_task = self.create_tasks(
+            Team.objects.create(name="Foreign team"), 1
+        )[0]
+        response = self.client.get(self.url, {"q": "searched"})
+        self.assertEqual(set(response.context["tasks_page"]), set(tasks))
+        self.assertNotContains(response, foreign_task.get_absolute_url())
+
+    def test_empty_search_lists_nothing(self):
+        self.create_tasks(self.team, 1)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context["tasks_page"]), 0)
+        self.assertNotContains(response, "No tasks found")
+
+    @patch.object(TaskSearchView, "tasks_per_page", 2)
+    def test_pagination_keeps_search_text(self):
+        self.create_tasks(self.team, 3)
+        response = self.client.get(self.url, {"q": "searched"})
+        page = response.context["tasks_page"]
+        self.assertTrue(page.has_next())
+        self.assertContains(
+            response, f"?q=searched&cursor={page.next_cursor}"
+        )
+        next_page = self.client.get(
+            self.url, {"q": "searched", "cursor": page.next_cursor}
+        ).context["tasks_page"]
+        self.assertEqual(len(next_page), 1)
+        self.assertTrue(next_page.has_previous())
@@ -0,0 +1,115 @@
+import asyncio
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+from task_manager.broker import RedisBroker, get_broker, project_channel
+from task_manager.models import Team, Project
+from task_manager.tests.test_broker import LocalRedis
+from task_manager.views import TaskUpdatesStreamView
+
+TASK_UPDATES_STREAM_URL_NAME = "task_manager:task-updates-stream"
+PROJECT_BOARD_URL_NAME = "task_manager:project-board"
+
+
+@override_settings(TASK_UPDATES_STREAM_ENABLED=True)
+class TaskUpdatesStreamTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(username="test.user")
+        team = Team.objects.create(name="Test team")
+        team.members.add(self.user)
+        self.project = Project.objects.create(
+            name="Test project", working_team=team
+        )
+        self.url_kwargs = {
+            "team_slug": team.slug,
+            "project_slug": self.project.slug,
+        }
+        self.url = reverse(
+            TASK_UPDATES_STREAM_URL_NAME, kwargs=self.url_kwargs
+        )
+        self.async_client.force_login(self.user)
+        self.outsider_client = AsyncClient()
+        self.outsider_client.force_login(
+            get_user_model().objects.create_user(username="outsider")
+        )
+
+    @staticmethod
+    async def collect(stream) -> list:
+        return [event async for event in stream]
+
+    @override_settings(TASK_UPDATES_STREAM_ENABLED=False)
+    async def test_stream_is_disabled_without_asgi(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_is_forbidden_for_outsiders(self):
+        response = await AsyncClient().get(self.url)
+        self.assertEqual(response.status_code, 403)
+        response = await self.outsider_client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_sends_task_changes_of_the_project(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        next_event = asyncio.ensure_future(anext(stream))
+        channel = project_channel(self.project.id)
+        while channel not in get_broker().subscribers:
+            await asyncio.sleep(0)
+        get_broker().publish(channel, {"id": 1, "removed": True})
+        event = await asyncio.wait_for(next_event, 1)
+        self.assertEqual(
+            event, b'event: task\ndata: {"id": 1, "removed": true}\n\n'
+        )
+
+    async def test_redis_stream_sends_changes_after_a_heartbeat(self):
+        local_redis = LocalRedis()
+        broker = RedisBroker(client=local_redis, async_client=local_redis)
+        with (
+            patch("task_manager.views.get_broker", return_value=broker),
+            patch.object(TaskUpdatesStreamView, "heartbeat_interval", 0.01)
+        ):
+            response = await self.async_client.get(self.url)
+            stream = response.streaming_content
+            await anext(stream)
+            self.assertEqual(
+                await asyncio.wait_for(anext(stream), 1), b": keep-alive\n\n"
+            )
+            broker.publish(
+                project_channel(self.project.id), {"id": 1, "removed": True}
+            )
+            event = await asyncio.wait_for(anext(stream), 1)
+            while event == b": keep-alive\n\n":
+                event = await asyncio.wait_for(anext(stream), 1)
+            await stream.aclose()
+        self.assertEqual(
+            event, b'event: task\ndata: {"id": 1, "removed": true}\n\n'
+        )
+
+    async def test_stream_ends_after_max_duration(self):
+        with patch.multiple(
+                TaskUpdatesStreamView,
+                heartbeat_interval=0.01,
+                max_duration=0.05
+        ):
+            response = await self.async_client.get(self.url)
+            events = await asyncio.wait_for(
+                self.collect(response.streaming_content), 1
+            )
+        self.assertTrue(events[0].startswith(b"retry:"))
+        self.assertEqual(set(events[1:]), {b": keep-alive\n\n"})
+        self.assertNotIn(
+            project_channel(self.project.id), get_broker().subscribers
+        )
+
+    def test_board_subscribes_to_the_stream(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse(PROJECT_BOARD_URL_NAME, kwargs=self.url_kwargs)
+        )
+        self.assertEqual(response.context["task_updates_url"], self.url)
+        self.assertContains(response, f'new EventSource("{self.url}")')
@@ -1,9 +1,13 @@
+import datetime
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from .utils import assert_url_access
-from task_manager.models import Team
+from task_manager.models import Team, Project, Task, TaskType
 
 TEAM_LIST_URL = reverse("task_manager:team-list")
 TEAM_CREATE_URL = reverse("task_manager:team-create")
@@ -186,3 +190,67 @@ class FounderTeamTests(TestCase):
             team_slug=self.founded_team.slug,
             member_username=self.member.username
         )
+
+
+class TeamSummaryTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            username="test.founder",
+            password="founder_password"
+        )
+        self.task_type = TaskType.objects.create(name="Test TaskType")
+        self.team = self.create_team("Test team")
+        self.client.force_login(self.user)
+
+    def create_team(self, name: str) -> Team:
+        team = Team.objects.create(name=name, founder=self.user)
+        team.members.add(
+            get_user_model().objects.create(username=f"{team.slug}.member")
+        )
+        for project_number in range(2):
+            project = Project.objects.create(
+                name=f"{name} project {project_number}",
+                working_team=team
+            )
+            for deadline, is_completed in (
+                    (datetime.date(2222, 2, 22), False),
+                    (datetime.date(2000, 2, 22), False),
+                    (datetime.date(2000, 2, 22), True),
+            ):
+                Task.objects.create(
+                    name="Test task",
+                    deadline=deadline,
+                    is_completed=is_completed,
+                    task_type=self.task_type,
+                    project=project,
+                )
+        return team
+
+    def assert_summary(self, team: Team, projects) -> None:
+        self.assertEqual(team.project_count, 2)
+        self.assertEqual(team.member_count, 1)
+        self.assertEqual(team.open_task_count, 4)
+        self.assertEqual(team.overdue_task_count, 2)
+        for project in projects:
+            self.assertEqual(project.open_task_count, 2)
+            self.assertEqual(project.overdue_task_count, 1)
+
+    def test_team_list_summary(self):
+        response = assert_url_access(self, TEAM_LIST_URL)
+        team = response.context["founded_teams"][0]
+        self.assert_summary(team, team.projects.all())
+
+    def test_team_detail_summary(self):
+        response = assert_url_access(
+            self, TEAM_DETAIL_URL_NAME, team_slug=self.team.slug
+        )
+        self.assert_summary(
+            response.context["object"], response.context["projects"]
+        )
+
+    def test_team_list_number_of_queries_does_not_depend_on_teams(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(TEAM_LIST_URL)
+        self.create_team("Another team")
+        with self.assertNumQueries(len(queries)):
+            self.client.get(TEAM_LIST_URL)
@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
+from task_manager.models import NotificationEmailPreference
 from .utils import assert_url_access
 
 USER_REGISTER_URL = reverse("register")
@@ -9,6 +10,7 @@ USER_PROFILE_URL_NAME = "profile"
 USER_PROFILE_REDIRECT_URL = reverse("profile-redirect")
 USER_PROFILE_EDIT_URL = reverse("profile-edit")
 USER_PROFILE_DELETE_URL = reverse("profile-delete")
+USER_PROFILE_NOTIFICATIONS_URL = reverse("profile-notifications")
 
 
 class PublicUserTests(TestCase):
@@ -37,6 +39,9 @@ class PublicUserTests(TestCase):
     def test_user_profile_delete_login_required(self):
         assert_url_access(self, USER_PROFILE_DELETE_URL, 200, False)
 
+    def test_user_profile_notifications_login_required(self):
+        assert_url_access(self, USER_PROFILE_NOTIFICATIONS_URL, 200, False)
+
 
 class PrivateUserTests(TestCase):
     def setUp(self) -> None:
@@ -71,3 +76,14 @@ class PrivateUserTests(TestCase):
         context_data = response.context
         self.assertIn("object", context_data)
         self.assertEquals(context_data["object"], self.user)
+
+    def test_update_email_notifications_frequency(self):
+        assert_url_access(self, USER_PROFILE_NOTIFICATIONS_URL)
+        self.client.post(
+            USER_PROFILE_NOTIFICATIONS_URL,
+            {"frequency": NotificationEmailPreference.Frequency.DAILY}
+        )
+        self.assertEquals(
+            self.user.notification_email_preference.frequency,
+            NotificationEmailPreference.Frequency.DAILY
+        )
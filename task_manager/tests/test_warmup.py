@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.template import engines
+from django.test import TestCase
+
+from task_manager.stats import STATS_KEY
+from task_manager.warmup import get_warmup_templates, warm_up
+
+
+class WarmupTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.loader = engines["django"].engine.template_loaders[0]
+        self.loader.reset()
+
+    def test_templates_are_compiled(self):
+        templates = get_warmup_templates()
+        self.assertIn("base.html", templates["pages"])
+        self.assertIn("includes/task_card.html", templates["pages"])
+        self.assertIn("bootstrap5/field.html", templates["pages"])
+        self.assertIn("django/forms/widgets/select.html", templates["widgets"])
+        result = warm_up(queries=False)
+        self.assertEqual(
+            result["templates"],
+            len(templates["pages"]) + len(templates["widgets"])
+        )
+        self.assertIn("base.html", self.loader.get_template_cache)
+        self.assertIn("bootstrap5/field.html", self.loader.get_template_cache)
+        self.assertIsNone(cache.get(STATS_KEY))
+
+    def test_warm_queries_fill_stats_cache(self):
+        warm_up(queries=True)
+        self.assertIsNotNone(cache.get(STATS_KEY))
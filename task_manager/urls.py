@@ -10,7 +10,12 @@ from task_manager.views import (
     ProjectCreateView,
     ProjectMembersView,
     ProjectLandingView,
+    ProjectBoardView,
+    ProjectBoardColumnView,
     ProjectMemberTasksView,
+    ProjectMemberTasksTabView,
+    TaskInboxView,
+    TaskSearchView,
     ProjectUpdateView,
     ProjectDeleteView,
     TaskCreateView,
@@ -20,7 +25,11 @@ from task_manager.views import (
     TaskDeleteView,
     TaskReviewRequestView,
     TaskMarkAsCompletedView,
-    NotificationRedirectView, NotificationListView
+    NotificationRedirectView,
+    NotificationEventRedirectView,
+    NotificationListView,
+    NotificationStreamView,
+    TaskUpdatesStreamView,
 )
 
 urlpatterns = [
@@ -29,6 +38,11 @@ urlpatterns = [
         NotificationRedirectView.as_view(),
         name="notification-redirect"
     ),
+    path(
+        "notification_event_redirect/<int:id>/",
+        NotificationEventRedirectView.as_view(),
+        name="notification-event-redirect"
+    ),
     path("teams/", TeamListView.as_view(), name="team-list"),
     path("teams/create/", TeamCreateView.as_view(), name="team-create"),
     path(
@@ -36,6 +50,13 @@ urlpatterns = [
         NotificationListView.as_view(),
         name="notification-list"
     ),
+    path(
+        "notifications/stream/",
+        NotificationStreamView.as_view(),
+        name="notification-stream"
+    ),
+    path("my-tasks/", TaskInboxView.as_view(), name="task-inbox"),
+    path("search/", TaskSearchView.as_view(), name="task-search"),
     path(
         "<str:team_slug>/",
         TeamDetailView.as_view(),
@@ -71,6 +92,22 @@ urlpatterns = [
         ProjectLandingView.as_view(),
         name="project-landing"
     ),
+    path(
+        "<str:team_slug>/<str:project_slug>/board/",
+        ProjectBoardView.as_view(),
+        name="project-board"
+    ),
+    path(
+        "<str:team_slug>/<str:project_slug>/board/<str:grouping>/"
+        "<str:column>/",
+        ProjectBoardColumnView.as_view(),
+        name="project-board-column"
+    ),
+    path(
+        "<str:team_slug>/<str:project_slug>/tasks/stream/",
+        TaskUpdatesStreamView.as_view(),
+        name="task-updates-stream"
+    ),
     path(
         "<str:team_slug>/<str:project_slug>/edit/",
         ProjectUpdateView.as_view(),
@@ -118,6 +155,11 @@ urlpatterns = [
         ProjectMemberTasksView.as_view(),
         name="project-member-tasks"
     ),
+    path(
+        "<str:team_slug>/<str:project_slug>/<str:user_slug>/tasks/<str:tab>/",
+        ProjectMemberTasksTabView.as_view(),
+        name="project-member-tasks-tab"
+    ),
     path(
         "<str:team_slug>/<str:project_slug>/<str:user_slug>/assign-task/",
         TaskAssignView.as_view(),
@@ -1,12 +1,24 @@
+import asyncio
+import json
 from abc import abstractmethod
 
-from django.contrib.auth import get_user_model
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, get_user
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.db.models import Prefetch, Value
+from django.http import (
+    Http404,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
 from django.views import generic
 
+from task_manager.broker import get_broker, project_channel, user_channel
+from task_manager.caching import team_page_version, project_page_version
 from task_manager.forms import (
     UserRegistrationForm,
     TeamForm,
@@ -16,29 +28,53 @@ from task_manager.forms import (
     TaskForOneAssigneeForm,
     NotificationFilterByTeamForm,
     NotificationFilterByProjectForm,
+    MemberTasksFilterForm,
+)
+from task_manager.memberships import (
+    get_user_team_ids,
+    get_accessible_team_ids,
 )
 from task_manager.mixins import (
+    AnonymousPageCacheMixin,
+    ConditionalPageMixin,
     FounderLoginRequiredMixin,
     MemberOrFounderLoginRequiredMixin,
     TaskRequesterLoginRequiredMixin,
     NotificationContextMixin,
+    TaskUpdatesContextMixin,
     TeamGetObjectMixin,
     ViewGetProjectMixin,
     ProjectGetObjectMixin,
+    ProjectMemberTasksMixin,
+    ProjectBoardMixin,
     TaskGetObjectMixin,
 )
-from task_manager.models import Team, Project, Worker, Task, Notification
+from task_manager.models import (
+    Team,
+    Project,
+    Task,
+    Notification,
+    NotificationEvent,
+    NotificationReadState,
+    NotificationEmailPreference,
+)
+from task_manager.pagination import get_keyset_page
+from task_manager.board import BOARD_ORDERINGS, get_board, get_column_page
+from task_manager.search import search_tasks
+from task_manager.tags import get_teams_tag_counts
+from task_manager.stats import get_site_stats, STATS_VERSION
 
 
-class IndexView(generic.TemplateView):
+class IndexView(AnonymousPageCacheMixin, generic.TemplateView):
     template_name = "task_manager/index.html"
 
-    # def get_context_data(self, **kwargs):
-    #     context = super().get_context_data(**kwargs)
-    #     context["teams_count"] = Team.objects.count()
-    #     context["projects_count"] = Project.objects.count()
-    #     context["workers_count"] = Worker.objects.count()
-    #     return context
+    def get_page_cache_versions(self) -> tuple:
+        return (STATS_VERSION,)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["stats"] = get_site_stats()
+        return context
 
 
 class UserRegisterView(generic.CreateView):
@@ -73,6 +109,7 @@ class UserProfileEditView(LoginRequiredMixin, generic.UpdateView):
         "username",
         "first_name",
         "last_name",
+        "email",
         "position",
     )
     slug_field = "username"
@@ -81,6 +118,20 @@ class UserProfileEditView(LoginRequiredMixin, generic.UpdateView):
         return self.request.user
 
 
+class NotificationEmailPreferenceView(LoginRequiredMixin, generic.UpdateView):
+    model = NotificationEmailPreference
+    fields = ("frequency",)
+    success_url = reverse_lazy("profile-redirect")
+
+    def get_object(self, queryset=None):
+        preference = NotificationEmailPreference.objects.filter(
+            user=self.request.user
+        ).first()
+        if preference is None:
+            preference = NotificationEmailPreference(user=self.request.user)
+        return preference
+
+
 class UserDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = get_user_model()
     slug_field = "username"
@@ -100,13 +151,18 @@ class TeamListView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        context["involved_teams"] = user.teams.prefetch_related(
-            "projects"
-        ).all()
-        context["founded_teams"] = user.founded_teams.prefetch_related(
-            "projects"
-        ).all()
+        team_ids = get_user_team_ids(self.request.user.id)
+        teams = Team.objects.filter(
+            pk__in=team_ids["member"] | team_ids["founded"]
+        ).with_summary().prefetch_related(
+            Prefetch("projects", queryset=Project.objects.with_task_counts())
+        )
+        context["involved_teams"] = [
+            team for team in teams if team.id in team_ids["member"]
+        ]
+        context["founded_teams"] = [
+            team for team in teams if team.id in team_ids["founded"]
+        ]
         return context
 
 
@@ -122,17 +178,35 @@ class TeamCreateView(LoginRequiredMixin, generic.CreateView):
 class TeamDetailView(
     TeamGetObjectMixin,
     LoginRequiredMixin,
+    ConditionalPageMixin,
     NotificationContextMixin,
     generic.DetailView
 ):
     model = Team
 
-    def get_notifications(self):
-        notifications = super().get_notifications()
-        notifications = notifications.filter(
-            task__project__working_team_id=self.get_object().id
-        )
-        return notifications
+    def get_updated_at(self):
+        return Team.objects.filter(
+            slug=self.kwargs.get("team_slug")
+        ).values_list("updated_at", flat=True).first()
+
+    def get_team_queryset(self):
+        # members and projects are loaded only if their cached lists
+        # are missing
+        return Team.objects.with_summary().select_related("founder")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        team = self.get_object()
+        context["members"] = team.members.all()
+        context["projects"] = team.projects.with_task_counts()
+        user_id = self.request.user.id
+        is_member = team.id in get_user_team_ids(user_id)["member"]
+        context["member_id"] = user_id if is_member else None
+        context["is_founder"] = team.founder_id == user_id
+        return context
+
+    def get_notification_filters(self) -> dict:
+        return {"team_id": self.get_object().id}
 
 
 class TeamUpdateView(
@@ -146,15 +220,6 @@ class TeamUpdateView(
     def get_founder(self):
         return self.get_object().founder
 
-    def get_initial(self):
-        initial = super().get_initial()
-        initial["members_queryset"] = (
-            self.get_object().members.select_related(
-                "position"
-            ) | Worker.objects.filter(id=self.get_founder().id)
-        ).distinct()
-        return initial
-
 
 class TeamDeleteView(
     TeamGetObjectMixin,
@@ -244,87 +309,210 @@ class ProjectDetailView(generic.DetailView):
 
 class ProjectMembersView(
     MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
     NotificationContextMixin,
     ProjectDetailView
 ):
+    # members are loaded only if their cached list is missing
+    queryset = Project.objects.select_related("working_team__founder")
 
-    def get_notifications(self):
-        notifications = super().get_notifications()
-        notifications = notifications.filter(
-            task__project_id=self.get_object().id
-        )
-        return notifications
+    def get_updated_at(self):
+        updated_at = Project.objects.filter(
+            slug=self.kwargs.get("project_slug")
+        ).values_list("updated_at", "working_team__updated_at").first()
+        return max(updated_at) if updated_at else None
+
+    def get_notification_filters(self) -> dict:
+        return {"project_id": self.get_object().id}
 
     def get_team(self) -> Team:
         return self.get_object().working_team
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["members"] = self.get_team().members.select_related(
+            "position"
+        )
+        return context
+
 
-class ProjectLandingView(ProjectDetailView):
+class ProjectLandingView(AnonymousPageCacheMixin, ProjectDetailView):
     template_name = "task_manager/project_landing.html"
 
+    def get_page_cache_versions(self) -> tuple:
+        return (
+            team_page_version(self.kwargs.get("team_slug")),
+            project_page_version(self.kwargs.get("project_slug")),
+        )
+
+
+class ProjectBoardView(
+    ViewGetProjectMixin,
+    ProjectBoardMixin,
+    MemberOrFounderLoginRequiredMixin,
+    NotificationContextMixin,
+    TaskUpdatesContextMixin,
+    generic.TemplateView
+):
+    """
+    Kanban board of all project tasks. Every column shows its first cards,
+    the board is loaded in a constant number of queries
+    """
+    template_name = "task_manager/project_board.html"
+
+    def get_notification_filters(self) -> dict:
+        return {"project_id": self.get_project().id}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        grouping = self.get_grouping()
+        context["project"] = self.get_project()
+        context["grouping"] = grouping
+        context["groupings"] = list(BOARD_ORDERINGS)
+        context["columns"] = get_board(
+            self.get_tasks(), grouping, self.column_size, self.get_today()
+        )
+        return context
+
+
+class ProjectBoardColumnView(
+    ViewGetProjectMixin,
+    ProjectBoardMixin,
+    MemberOrFounderLoginRequiredMixin,
+    generic.TemplateView
+):
+    """
+    Loads more cards of a board column following the cursor
+    """
+    template_name = "includes/board_column_cards.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        grouping = self.kwargs.get("grouping")
+        column = self.kwargs.get("column")
+        tasks = self.get_tasks().filter(
+            self.get_column_filter(grouping, column)
+        )
+        context["project"] = self.get_project()
+        context["grouping"] = grouping
+        context["column"] = column
+        context["page"] = get_column_page(
+            tasks.for_board(),
+            grouping,
+            self.column_size,
+            self.request.GET.get("cursor")
+        )
+        return context
+
 
 class ProjectMemberTasksView(
     ViewGetProjectMixin,
+    ProjectMemberTasksMixin,
     MemberOrFounderLoginRequiredMixin,
     NotificationContextMixin,
+    TaskUpdatesContextMixin,
     generic.DetailView
 ):
-    model = get_user_model()
-    slug_field = "username"
-    slug_url_kwarg = "user_slug"
     template_name = "task_manager/project_member_tasks.html"
-    tasks_per_page = 12
-    object = None
 
-    def get_notifications(self):
-        notifications = super().get_notifications()
-        notifications = notifications.filter(
-            task__project_id=self.get_project().id
-        )
-        return notifications
+    def get_notification_filters(self) -> dict:
+        return {"project_id": self.get_project().id}
 
-    def get_team(self) -> Team:
-        return self.get_project().working_team
+    def get_active_tab(self) -> str:
+        tab = self.request.GET.get("tab")
+        if tab in self.task_tabs:
+            return tab
+        for tab, prefix in self.task_tabs.items():
+            params = {f"{prefix}_page", f"{prefix}_cursor"}
+            if params & self.request.GET.keys():
+                return tab
+        return "assigned"
 
-    def get_object(self, queryset=None):
-        if not self.object:
-            user_username = self.kwargs.get("user_slug")
-            self.object = get_object_or_404(
-                self.get_project().working_team.members.select_related(
-                    "position"
-                ),
-                username=user_username
-            )
-        return self.object
+    def get_context_data(self, **kwargs):
+        # the inactive tab is loaded by ProjectMemberTasksTabView
+        # when it is opened
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_tab_context(self.get_active_tab()))
+        context["task_counts"] = self.get_task_counts()
+        return context
 
-    def get_tasks_paginator(self, queryset, page: int = 1):
-        paginator = Paginator(queryset, self.tasks_per_page)
-        try:
-            paginator_page = paginator.page(page)
-        except PageNotAnInteger:
-            paginator_page = paginator.page(1)
-        except EmptyPage:
-            paginator_page = paginator.page(paginator.num_pages)
 
-        return paginator_page
+class ProjectMemberTasksTabView(
+    ViewGetProjectMixin,
+    ProjectMemberTasksMixin,
+    MemberOrFounderLoginRequiredMixin,
+    generic.DetailView
+):
+    template_name = "includes/member_tasks_tab.html"
 
     def get_context_data(self, **kwargs):
+        tab = self.kwargs.get("tab")
+        if tab not in self.task_tabs:
+            raise Http404("Unknown tab")
         context = super().get_context_data(**kwargs)
-        project = self.get_project()
-        member = self.get_object()
-        requested_tasks = member.requested_tasks.filter(project=project)
-        assigned_tasks = member.assigned_tasks.filter(project=project)
-        rt_page = self.request.GET.get("rt_page")
-        at_page = self.request.GET.get("at_page")
-        requested_tasks_page = self.get_tasks_paginator(
-            requested_tasks, rt_page
+        context.update(self.get_tab_context(tab))
+        return context
+
+
+class TaskInboxView(
+    LoginRequiredMixin,
+    NotificationContextMixin,
+    generic.TemplateView
+):
+    """
+    Lists tasks assigned to the user in all their teams, grouped by project.
+    The page is loaded by one query, regardless of the number of projects
+    """
+    template_name = "task_manager/task_inbox.html"
+    tasks_per_page = 24
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        team_ids = get_accessible_team_ids(user.id)
+        filter_form = MemberTasksFilterForm(self.request.GET)
+        filter_form.set_tag_choices(lambda: get_teams_tag_counts(team_ids))
+        tasks = filter_form.filter_tasks(
+            user.assigned_tasks.filter(project__working_team_id__in=team_ids)
+        ).for_listing()
+        context["tasks_page"] = get_keyset_page(
+            tasks,
+            self.tasks_per_page,
+            self.request.GET.get("cursor"),
+            ("project__name", *filter_form.get_ordering())
         )
-        assigned_tasks_page = self.get_tasks_paginator(
-            assigned_tasks, at_page
+        context["filter_form"] = filter_form
+        context["filter_query"] = urlencode(filter_form.get_query())
+        context["cursor_param"] = "cursor"
+        context["page_url"] = reverse("task_manager:task-inbox")
+        return context
+
+
+class TaskSearchView(
+    LoginRequiredMixin,
+    NotificationContextMixin,
+    generic.TemplateView
+):
+    """
+    Searches names, descriptions and tags of the tasks in the user's teams
+    using the full-text index, best matches first
+    """
+    template_name = "task_manager/task_search.html"
+    tasks_per_page = 24
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        search_text = self.request.GET.get("q", "").strip()
+        context["search_text"] = search_text
+        context["tasks_page"] = search_tasks(
+            search_text,
+            get_accessible_team_ids(self.request.user.id),
+            self.tasks_per_page,
+            self.request.GET.get("cursor")
         )
-        context["project"] = project
-        context["requested_tasks_page"] = requested_tasks_page
-        context["assigned_tasks_page"] = assigned_tasks_page
+        context["filter_query"] = urlencode({"q": search_text})
+        context["cursor_param"] = "cursor"
+        context["page_url"] = reverse("task_manager:task-search")
         return context
 
 
@@ -407,18 +595,26 @@ class TaskAssignView(TaskCreateView):
 
 class TaskDetailView(
     MemberOrFounderLoginRequiredMixin,
+    ConditionalPageMixin,
     NotificationContextMixin,
+    TaskUpdatesContextMixin,
     generic.DetailView
 ):
     model = Task
     object = None
 
-    def get_notifications(self):
-        notifications = super().get_notifications()
-        notifications = notifications.filter(
-            task__project_id=self.get_object().project.id
-        )
-        return notifications
+    def get_updated_at(self):
+        updated_at = Task.objects.filter(
+            id=self.kwargs.get("task_id")
+        ).values_list(
+            "updated_at",
+            "project__updated_at",
+            "project__working_team__updated_at"
+        ).first()
+        return max(updated_at) if updated_at else None
+
+    def get_notification_filters(self) -> dict:
+        return {"project_id": self.get_object().project_id}
 
     def get_object(self, queryset=None):
         if not self.object:
@@ -426,13 +622,18 @@ class TaskDetailView(
             self.object = self.model.objects.select_related(
                 "project__working_team__founder", "task_type", "requester"
             ).prefetch_related(
-                "project__working_team__members", "assignees__position"
+                "project__working_team__members",
+                "assignees__position",
+                "tags",
             ).get(id=task_id)
         return self.object
 
     def get_team(self) -> Team:
         return self.get_object().project.working_team
 
+    def get_updates_project(self) -> Project:
+        return self.get_object().project
+
 
 class TaskUpdateView(
     TaskGetObjectMixin,
@@ -546,7 +747,34 @@ class NotificationRedirectView(LoginRequiredMixin, generic.View):
         return redirect(notification.task.get_absolute_url())
 
 
+class NotificationEventRedirectView(LoginRequiredMixin, generic.View):
+    object = None
+
+    def get_object(self):
+        if not self.object:
+            event_id = self.kwargs.get("id")
+            self.object = get_object_or_404(
+                NotificationEvent.objects.for_user(
+                    self.request.user
+                ).select_related("task__project__working_team"),
+                id=event_id
+            )
+        return self.object
+
+    def get(self, request, *args, **kwargs):
+        event = self.get_object()
+        read_state = NotificationReadState.for_user(request.user)
+        read_state.mark_event_as_read(event.id)
+        return redirect(event.task.get_absolute_url())
+
+
 class NotificationListView(LoginRequiredMixin, generic.ListView):
+    """
+    Lists per-user notifications merged with broadcast notification events.
+    Only (id, sent_at, kind) rows of both tables are paginated,
+    then the current page is loaded with the related objects
+    """
+
     model = Notification
     paginate_by = 20
 
@@ -564,22 +792,157 @@ class NotificationListView(LoginRequiredMixin, generic.ListView):
             project_id = self.request.GET.get("project")
             context["project_filter_form"] = NotificationFilterByProjectForm(
                 initial={
+                    "user_id": self.request.user.id,
                     "team_id": team_id,
                     "project": project_id,
                 }
             )
         return context
 
+    def get_notification_filters(self) -> dict:
+        filters = {}
+        team_id = self.request.GET.get("team")
+        if team_id:
+            filters["team_id"] = team_id
+        project_id = self.request.GET.get("project")
+        if project_id:
+            filters["project_id"] = project_id
+        return filters
+
     def get_queryset(self):
-        queryset = self.request.user.notifications.select_related(
+        filters = self.get_notification_filters()
+        notifications = self.request.user.notifications.filter(
+            **filters
+        ).annotate(kind=Value("notification")).values_list(
+            "id", "sent_at", "kind"
+        ).order_by()
+        events = NotificationEvent.objects.for_user(
+            self.request.user
+        ).filter(**filters).annotate(kind=Value("event")).values_list(
+            "id", "sent_at", "kind"
+        ).order_by()
+        return notifications.union(events, all=True).order_by(
+            "-sent_at", "-id"
+        )
+
+    def load_notifications(self, rows) -> list:
+        related_fields = (
             "notification_type",
             "task__project__working_team",
             "task__requester",
         )
-        team_id = self.request.GET.get("team")
-        if team_id:
-            queryset = queryset.filter(task__project__working_team_id=team_id)
-        project_id = self.request.GET.get("project")
-        if project_id:
-            queryset = queryset.filter(task__project_id=project_id)
-        return queryset
+        rows = list(rows)
+        notification_ids = [
+            row_id for row_id, _, kind in rows if kind == "notification"
+        ]
+        event_ids = [row_id for row_id, _, kind in rows if kind == "event"]
+        notifications = Notification.objects.select_related(
+            *related_fields
+        ).in_bulk(notification_ids)
+        events = {}
+        if event_ids:
+            read_state = NotificationReadState.for_user(self.request.user)
+            events = NotificationEvent.objects.select_related(
+                *related_fields
+            ).in_bulk(event_ids)
+            for event in events.values():
+                event.is_read = read_state.is_event_read(event.id)
+        return [
+            notifications[row_id] if kind == "notification"
+            else events[row_id]
+            for row_id, _, kind in rows
+        ]
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = super(
+        ).paginate_queryset(queryset, page_size)
+        page.object_list = self.load_notifications(object_list)
+        return paginator, page, page.object_list, is_paginated
+
+
+class EventStreamView(generic.View):
+    """
+    Streams messages of a broker channel as Server-Sent Events.
+    Needs to be served by an ASGI server: the connection only waits
+    on the broker subscription and doesn't touch the database after
+    the access is checked.
+    The server doesn't notice disconnected clients while streaming,
+    so each stream ends after max_duration seconds, releasing its
+    subscription, and the EventSource reconnects, checking the access again
+    """
+
+    heartbeat_interval = 20
+    max_duration = 300
+    event_name = None
+    enabled_setting = None
+
+    @abstractmethod
+    def get_channel(self, user):
+        """
+        Runs in a thread, so it may query the database
+        :returns: channel of the stream or None if the access is denied
+        """
+
+    async def get(self, request, *args, **kwargs):
+        if not getattr(settings, self.enabled_setting):
+            raise Http404
+        user = await sync_to_async(get_user)(request)
+        if not user.is_authenticated:
+            return HttpResponseForbidden()
+        channel = await sync_to_async(self.get_channel)(user)
+        if channel is None:
+            return HttpResponseForbidden()
+        response = StreamingHttpResponse(
+            self.stream(channel),
+            content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, channel: str):
+        yield f"retry: {self.heartbeat_interval * 1000}\n\n"
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + self.max_duration
+        async with get_broker().subscribe(channel) as subscription:
+            while (remaining_time := end_time - loop.time()) > 0:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(),
+                        min(self.heartbeat_interval, remaining_time)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps(message)
+                yield f"event: {self.event_name}\ndata: {data}\n\n"
+
+
+class NotificationStreamView(EventStreamView):
+    """
+    Streams new notifications of the logged-in user
+    """
+
+    event_name = "notification"
+    enabled_setting = "NOTIFICATION_STREAM_ENABLED"
+
+    def get_channel(self, user):
+        return user_channel(user.id)
+
+
+class TaskUpdatesStreamView(EventStreamView):
+    """
+    Streams changes of the project tasks to the members of its team,
+    the pages patch their task cards with them
+    """
+
+    event_name = "task"
+    enabled_setting = "TASK_UPDATES_STREAM_ENABLED"
+
+    def get_channel(self, user):
+        project = get_object_or_404(
+            Project, slug=self.kwargs.get("project_slug")
+        )
+        if project.working_team_id not in get_accessible_team_ids(user.id):
+            return None
+        return project_channel(project.id)
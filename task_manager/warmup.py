@@ -0,0 +1,96 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.forms.renderers import get_default_renderer
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+
+def iter_template_names(directory: Path, subdirectory: str = ""):
+    """
+    Yields names of the html templates found in the directory,
+    relative to it, optionally limited to its subdirectory
+    """
+    for path in sorted((directory / subdirectory).rglob("*.html")):
+        yield path.relative_to(directory).as_posix()
+
+
+def get_warmup_templates() -> dict:
+    """
+    Returns names of the project templates and of the crispy template pack,
+    and names of the form widget templates used by the form renderer
+    """
+    page_templates = []
+    for directory in engines["django"].dirs:
+        page_templates += iter_template_names(Path(directory))
+    for directory in get_app_template_dirs("templates"):
+        page_templates += iter_template_names(
+            Path(directory), settings.CRISPY_TEMPLATE_PACK
+        )
+    widget_templates = []
+    for directory in get_default_renderer().engine.template_dirs:
+        widget_templates += iter_template_names(
+            Path(directory), "django/forms"
+        )
+    return {"pages": page_templates, "widgets": widget_templates}
+
+
+def warm_templates() -> int:
+    """
+    Compiles templates into the cached template loaders, so that
+    the first requests to a new worker don't compile them
+    :returns: number of compiled templates
+    """
+    templates = get_warmup_templates()
+    engine = engines["django"]
+    for name in templates["pages"]:
+        engine.get_template(name)
+    renderer = get_default_renderer()
+    for name in templates["widgets"]:
+        renderer.get_template(name)
+    return len(templates["pages"]) + len(templates["widgets"])
+
+
+def warm_urls(resolver=None) -> None:
+    """
+    Imports the URLconf with its views and fills the reverse lookups
+    of all its namespaces, which the first request would do otherwise
+    """
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    for _, namespace_resolver in resolver.namespace_dict.values():
+        warm_urls(namespace_resolver)
+
+
+def warm_database() -> None:
+    """
+    Opens the database connection and fills the landing page stats cache
+    """
+    from task_manager.stats import get_site_stats
+
+    connection.ensure_connection()
+    get_site_stats()
+
+
+def warm_up(queries: bool = None) -> dict:
+    """
+    Prepares the worker before it accepts requests
+    :param queries: whether to issue warm queries,
+    WARMUP_QUERIES setting by default
+    :returns: {"templates": number of compiled templates,
+    "seconds": warmup duration}
+    """
+    if queries is None:
+        queries = getattr(settings, "WARMUP_QUERIES", False)
+    started_at = time.perf_counter()
+    templates_count = warm_templates()
+    warm_urls()
+    if queries:
+        warm_database()
+    return {
+        "templates": templates_count,
+        "seconds": time.perf_counter() - started_at,
+    }